@@ -1,10 +1,17 @@
 import streamlit as st
+import threading
 import time
-import pandas as pd
 from utils import extract_text_from_file
-from scraper import detect_job_cards_with_description
-from resume_matcher import ResumeMatcher
-from ui_components import apply_custom_styles, render_job_card
+from scraper import SCRAPE_BACKEND, cached_job_search, search_cache, search_cache_key
+from job_queue import CANCELLED, FAILED, FINISHED, QUEUED, get_default_queue
+from job_store import get_default_store
+from browser_pool import get_default_pool
+from resume_matcher import BatchResumeMatcher, IncrementalMatcher, get_resume_profile, iter_match_results
+from job_search import search_job_history
+from dedupe import DuplicateGrouper, dedupe_jobs, dedupe_text, group_jobs
+from skill_analytics import SKILL_NAMES, get_skill_matrix, keyword_job_ids
+from ui_components import apply_custom_styles, build_results_table, render_job_list, render_job_list_fragment
+from tracing import tracer
 
 # Page configuration
 st.set_page_config(
@@ -142,6 +149,34 @@ def apply_custom_styles():
             color: #721c24;
         }
         
+        .skill-columns {
+            display: flex;
+            gap: 1rem;
+        }
+        
+        .skill-column {
+            flex: 1;
+        }
+        
+        .skill-note {
+            font-style: italic;
+        }
+        
+        .job-variants {
+            font-size: 0.9rem;
+        }
+        
+        .apply-link {
+            display: inline-block;
+            margin-top: 0.75rem;
+            padding: 0.5rem 1.25rem;
+            border-radius: 8px;
+            background-color: var(--primary);
+            color: white;
+            font-weight: 600;
+            text-decoration: none;
+        }
+        
         .stExpander .stExpanderHeader {
             background-color: var(--accent);
             color: white;
@@ -188,6 +223,16 @@ def apply_custom_styles():
 
 apply_custom_styles()
 
+@st.cache_resource
+def warm_browser_pool():
+    """Start one Chrome session in the background, once per server process"""
+    pool = get_default_pool()
+    threading.Thread(target=pool.warm, args=(1,), daemon=True).start()
+    return pool
+
+if SCRAPE_BACKEND == "selenium":
+    warm_browser_pool()
+
 # Header with new title and logo
 st.markdown("""
 <div style="text-align: center; margin-bottom: 2rem;">
@@ -207,15 +252,48 @@ with col1:
     # Additional filters in an expander
     with st.expander("🔧 Advanced Search Options", expanded=False):
         location = st.text_input("Location:", placeholder="e.g., New York, Remote")
+        # Saved jobs don't record their experience level or job type, so those filters can't apply to them
+        saved_only = st.session_state.get("use_saved_jobs", False)
+        saved_help = "Not available when searching previously scraped jobs" if saved_only else None
         experience_level = st.multiselect(
             "Experience Level:",
             ["Entry level", "Associate", "Mid-Senior level", "Director", "Executive"],
-            default=None
+            default=None,
+            disabled=saved_only,
+            help=saved_help
         )
         job_type = st.multiselect(
             "Job Type:",
             ["Full-time", "Part-time", "Contract", "Temporary", "Internship"],
-            default=["Full-time"]
+            default=["Full-time"],
+            disabled=saved_only,
+            help=saved_help
+        )
+        num_jobs = st.number_input("Number of jobs:", min_value=1, max_value=200, value=5, step=5)
+        pool_size = get_default_pool().size
+        if pool_size > 1:
+            scrape_workers = st.slider(
+                "Parallel browsers:",
+                min_value=1, max_value=pool_size, value=1,
+                help="Spread result pages and job descriptions across several browsers"
+            )
+        else:
+            # A slider needs max_value > min_value, so a one-browser pool gets a fixed count
+            scrape_workers = 1
+            st.caption("Parallel browsers: 1 (raise SAGE_BROWSER_POOL_SIZE to scrape in parallel)")
+        refresh_results = st.checkbox(
+            "Refresh results",
+            help="Scrape LinkedIn again even if this search was run recently"
+        )
+        group_duplicates = st.checkbox(
+            "Group near-duplicate postings", value=True,
+            help="Show reposted or syndicated copies of a job once, with the copies listed on its card"
+        )
+        use_saved_jobs = st.checkbox(
+            "Search previously scraped jobs (no scraping)",
+            key="use_saved_jobs",
+            help="Read matching postings from the local job database instead of LinkedIn "
+                 "(filtered by keyword and location only)"
         )
 
 with col2:
@@ -239,6 +317,58 @@ with col2:
     else:
         resume_text = st.text_area("Paste your resume text:", height=200, placeholder="Copy and paste your resume here...")
 
+@tracer.traced("app.show_results")
+def show_results(job_listings, resume_text, ranked=False, group_duplicates=True):
+    """Rank a finished result set against the resume and render it (ranked: already scored and ordered)"""
+    if job_listings and group_duplicates and not ranked:
+        job_listings = dedupe_jobs(job_listings)
+    if job_listings:
+        # Resume matcher: one shared vocabulary for the whole result set
+        if ranked:
+            match_results = job_listings
+        elif resume_text:
+            matcher = BatchResumeMatcher([job.get("description") or "" for job in job_listings])
+            match_results = matcher.match_resume(get_resume_profile(resume_text))
+        else:
+            match_results = [{}] * len(job_listings)
+
+        for job, match_result in zip(job_listings, match_results):
+            job["similarity_score"] = match_result.get("similarity_score", 0)
+            job["missing_skills"] = match_result.get("missing_skills", [])
+            job["matched_skills"] = match_result.get("matched_skills", [])
+        
+        # Sorting by % match
+        if resume_text and not ranked:
+            job_listings.sort(key=lambda x: x["similarity_score"], reverse=True)
+        
+        st.markdown(f"<div class='section-header'>📊 Results: Found {len(job_listings)} Job Listings</div>", unsafe_allow_html=True)
+        grouped = sum(len(job.get("variants") or []) for job in job_listings)
+        if grouped:
+            noun = "posting is" if grouped == 1 else "postings are"
+            st.caption(f"🔁 {grouped} near-duplicate {noun} grouped under the jobs they repeat.")
+        tab1, tab2 = st.tabs(["Card View", "Table View"])
+        
+        with tab1, tracer.span("app.render_cards", jobs=len(job_listings)):
+            render_job_list_fragment(job_listings, resume_text, key="results")
+        
+        with tab2, tracer.span("app.render_table"):
+            st.dataframe(
+                build_results_table(job_listings, show_match=bool(resume_text)),
+                use_container_width=True,
+                column_config={
+                    "title": "Job Title",
+                    "company": "Company",
+                    "match_percentage": st.column_config.ProgressColumn(
+                        "Match Score",
+                        format="%f",
+                        min_value=0,
+                        max_value=1
+                    )
+                }
+            )
+    else:
+        st.warning("⚠️ No jobs found matching your search criteria. Try broadening your search.")
+
 # Fixed search button alignment
 search_col1, search_col2 = st.columns([2, 1])
 with search_col1:
@@ -246,66 +376,222 @@ with search_col1:
         st.session_state.search_clicked = True
     else:
         st.session_state.search_clicked = False
+with search_col2:
+    history_clicked = st.button(
+        "📚 Search My Job History", use_container_width=True,
+        help="Match your resume against every job scraped so far, without scraping"
+    )
+
+@st.fragment(run_every=2)
+@tracer.traced("app.live_results")
+def show_task_progress(task_id, resume_text, group_duplicates=True):
+    """Poll a background scrape, showing jobs as they come in with provisional scores"""
+    scrape_queue = get_default_queue()
+    task = scrape_queue.status(task_id)
+    if task is None or task["status"] in FINISHED:
+        # Full rerun to draw the final ranking
+        st.rerun()
+
+    progress = task["progress"] / max(task["total"], 1)
+    label = "⏳ Queued behind other searches..." if task["status"] == QUEUED else \
+        f"🔍 Scraped {task['progress']} of {task['total']} jobs for '{task['keyword']}'..."
+    progress_col, cancel_col = st.columns([3, 1])
+    with progress_col:
+        st.progress(min(progress, 1.0), text=label)
+    with cancel_col:
+        st.button("✖ Cancel search", key=f"cancel_{task_id}", on_click=scrape_queue.cancel, args=(task_id,))
+
+    st.markdown("<div class='section-header'>⏳ Live Results</div>", unsafe_allow_html=True)
+    # The resume is analysed once per content hash, not once per job and poll
+    resume_profile = get_resume_profile(resume_text)
+    # Only jobs that arrived since the last poll are copied, scored and hashed
+    live = st.session_state.get("live_results")
+    if live is None or live["task_id"] != task_id or live["resume"] != resume_profile.digest:
+        live = st.session_state.live_results = {
+            "task_id": task_id,
+            "resume": resume_profile.digest,
+            "jobs": [],
+            "matcher": IncrementalMatcher(resume_profile),
+            "grouper": DuplicateGrouper(),
+        }
+    new_jobs = scrape_queue.result(task_id, start=len(live["jobs"]))
+    for job, match_result in iter_match_results(new_jobs, resume_profile, live["matcher"]):
+        job["similarity_score"] = match_result["similarity_score"]
+        job["missing_skills"] = match_result["missing_skills"]
+        job["matched_skills"] = match_result["matched_skills"]
+        live["jobs"].append(job)
+    live["grouper"].add(dedupe_text(job) for job in new_jobs)
+
+    live_jobs = group_jobs(live["jobs"], live["grouper"].clusters()) if group_duplicates else live["jobs"]
+    render_job_list(live_jobs, resume_text, key="live")
 
 if st.session_state.get('search_clicked', False):
     if keyword.strip():
-        with st.spinner("🔍 Fetching and analyzing job listings... This may take a moment."):
-            # Calling scraper
-            job_listings = detect_job_cards_with_description(keyword)
-            
-            if job_listings:
-                # Resume matcher
-                for job in job_listings:
-                    if resume_text:
-                        matcher = ResumeMatcher(job["description"])
-                        match_result = matcher.match_resume(resume_text)
-                        job["similarity_score"] = match_result["similarity_score"]
-                        job["missing_skills"] = match_result["missing_skills"]
-                        job["matched_skills"] = match_result.get("matched_skills", [])
-                    else:
-                        job["similarity_score"] = 0
-                        job["missing_skills"] = []
-                        job["matched_skills"] = []
-                
-                # Sorting by % match
-                if resume_text:
-                    job_listings.sort(key=lambda x: x["similarity_score"], reverse=True)
-                
-                st.markdown(f"<div class='section-header'>📊 Results: Found {len(job_listings)} Job Listings</div>", unsafe_allow_html=True)
-                tab1, tab2 = st.tabs(["Card View", "Table View"])
-                
-                with tab1:
-                    for idx, job in enumerate(job_listings):
-                        render_job_card(job, idx, resume_text)
-                
-                with tab2:
-                    job_df = pd.DataFrame(job_listings)
-                    if "similarity_score" in job_df.columns:
-                        job_df["match_percentage"] = job_df["similarity_score"].apply(lambda x: f"{x:.0%}")
-                    
-                    display_cols = ["title", "company"]
-                    if resume_text:
-                        display_cols.append("match_percentage")
-                    
-                    st.dataframe(
-                        job_df[display_cols],
-                        use_container_width=True,
-                        column_config={
-                            "title": "Job Title",
-                            "company": "Company",
-                            "match_percentage": st.column_config.ProgressColumn(
-                                "Match Score",
-                                format="%f",
-                                min_value=0,
-                                max_value=1
-                            )
-                        }
-                    )
-            else:
-                st.warning("⚠️ No jobs found matching your search criteria. Try broadening your search.")
+        filters = {"location": location, "experience_level": experience_level, "job_type": job_type}
+        cache_age = None if refresh_results else search_cache.age(search_cache_key(keyword, num_jobs, **filters))
+
+        if use_saved_jobs:
+            st.session_state.pop("scrape_task", None)
+            show_results(
+                get_default_store().query(keyword=keyword, location=location.strip() or None, limit=200),
+                resume_text,
+                group_duplicates=group_duplicates
+            )
+        elif cache_age is not None:
+            # Recent identical search: answer straight from the cache
+            st.session_state.pop("scrape_task", None)
+            st.caption(f"⚡ Showing cached results from {cache_age / 60:.0f} min ago. Tick 'Refresh results' to scrape again.")
+            show_results(cached_job_search(keyword, num_jobs, **filters), resume_text, group_duplicates=group_duplicates)
+        else:
+            # Scrape in the background so the work survives reruns and closed tabs
+            st.session_state.scrape_task = get_default_queue().submit(
+                keyword, num_jobs, refresh=refresh_results, workers=scrape_workers, **filters
+            )
     else:
         st.error("⚠️ Please enter a valid job keyword to start your search.")
 
+if history_clicked:
+    if resume_text:
+        st.session_state.pop("scrape_task", None)
+        with st.spinner("Searching your job history..."):
+            history = search_job_history(
+                get_resume_profile(resume_text), top_k=num_jobs, group_duplicates=group_duplicates
+            )
+        show_results(history, resume_text, ranked=True)
+    else:
+        st.error("⚠️ Add your resume to search your job history.")
+
+if st.session_state.get("scrape_task"):
+    task_id = st.session_state.scrape_task
+    task = get_default_queue().status(task_id)
+    if task is None:
+        st.session_state.pop("scrape_task")
+    elif task["status"] not in FINISHED:
+        show_task_progress(task_id, resume_text, group_duplicates)
+    else:
+        st.session_state.pop("live_results", None)
+        if task["status"] == FAILED:
+            st.error(f"❌ Search for '{task['keyword']}' failed: {task['error']}")
+        elif task["status"] == CANCELLED:
+            st.info(f"Search for '{task['keyword']}' was cancelled. Showing the jobs scraped before it stopped.")
+        show_results(get_default_queue().result(task_id), resume_text, group_duplicates=group_duplicates)
+
+@st.fragment
+@tracer.traced("app.skill_analytics")
+def show_skill_analytics(resume_text, keyword=""):
+    """Skill demand across every stored job, and the resume's gaps weighted by that demand"""
+    st.markdown("<div class='section-header'>📈 Skill Market Analytics</div>", unsafe_allow_html=True)
+    if not st.toggle("Analyse skill demand across all saved jobs", key="show_analytics"):
+        return
+
+    store = get_default_store()
+    with st.spinner("Updating skill statistics..."):
+        skill_matrix = get_skill_matrix(store)
+    if not len(skill_matrix):
+        st.info("No saved jobs yet. Run a search to start building the statistics.")
+        return
+
+    only_keyword = st.checkbox(
+        f"Only jobs found for '{keyword.strip()}'" if keyword.strip() else "Only jobs found for the current keyword",
+        disabled=not keyword.strip(), key="analytics_keyword"
+    )
+    rows = skill_matrix.rows_for(keyword_job_ids(store, keyword)) if only_keyword and keyword.strip() else None
+    n_jobs = len(skill_matrix) if rows is None else len(rows)
+    share_column = st.column_config.ProgressColumn("Share of jobs", format="%.0f%%", min_value=0, max_value=100)
+
+    demand = skill_matrix.demand(rows)
+    ranked = [i for i in demand.argsort(kind="stable")[::-1] if demand[i]]
+    demand_col, gap_col = st.columns(2)
+    with demand_col:
+        st.markdown(f"**Most demanded skills** across {n_jobs} jobs")
+        st.dataframe(
+            [{"skill": SKILL_NAMES[i], "jobs": int(demand[i]), "share": 100 * demand[i] / n_jobs} for i in ranked[:15]],
+            use_container_width=True, hide_index=True, column_config={"share": share_column}
+        )
+    with gap_col:
+        if resume_text:
+            n_matching, gaps = skill_matrix.skill_gaps(get_resume_profile(resume_text), rows)
+            st.markdown(f"**Your skill gaps**, by demand in the {n_matching} jobs sharing a skill with your resume")
+            if gaps:
+                st.dataframe(
+                    [dict(gap, share=100 * gap["share"]) for gap in gaps],
+                    use_container_width=True, hide_index=True, column_config={"share": share_column}
+                )
+            else:
+                st.caption("No gaps found: you have every skill these jobs ask for.")
+        else:
+            st.caption("Add your resume to see which missing skills the most jobs ask for.")
+
+    if ranked:
+        skill = st.selectbox("Skills often required together with:", [SKILL_NAMES[i] for i in ranked], key="analytics_skill")
+        related = skill_matrix.related_skills(skill, rows)
+        if related:
+            st.dataframe(
+                [{"skill": name, "jobs needing both": count} for name, count in related],
+                use_container_width=True, hide_index=True
+            )
+
+show_skill_analytics(resume_text, keyword)
+
+def show_performance_panel():
+    """Sidebar breakdown of where time has gone, from the tracing spans and counters"""
+    with st.sidebar.expander("⏱️ Performance", expanded=False):
+        summary = tracer.summary()
+        if not summary:
+            st.caption("No timings recorded yet. Run a search to see them.")
+            return
+
+        st.markdown("**Stages** (since start or last reset)")
+        st.dataframe(
+            [
+                {
+                    "stage": name,
+                    "calls": stats["count"],
+                    "total_s": round(stats["total"], 3),
+                    "mean_ms": round(stats["mean"] * 1000, 1),
+                    "p50_ms": round(stats["p50"] * 1000, 1),
+                    "max_ms": round(stats["max"] * 1000, 1),
+                }
+                for name, stats in sorted(summary.items(), key=lambda item: -item[1]["total"])
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+
+        counters = tracer.counters()
+        if counters:
+            st.markdown("**Counters**")
+            st.dataframe(
+                [{"counter": name, "value": value} for name, value in sorted(counters.items())],
+                use_container_width=True,
+                hide_index=True
+            )
+
+        # Span tree of the most recent top-level operation
+        spans = tracer.recent_spans()
+        roots = [span for span in spans if span["parent_id"] is None]
+        if roots:
+            latest = roots[-1]
+            trace = tracer.recent_spans(latest["trace_id"])
+            children = {}
+            for span in trace:
+                children.setdefault(span["parent_id"], []).append(span)
+
+            lines = []
+            def walk(span, depth):
+                lines.append(f"{'  ' * depth}{span['name']}: {span['duration'] * 1000:.1f} ms")
+                for child in sorted(children.get(span["span_id"], []), key=lambda s: s["start"]):
+                    walk(child, depth + 1)
+            walk(latest, 0)
+            st.markdown("**Latest trace**")
+            st.code("\n".join(lines[:200]), language=None)
+
+        if tracer.log_path:
+            st.caption(f"Spans are also written to {tracer.log_path}")
+        st.button("Reset timings", on_click=tracer.reset)
+
+show_performance_panel()
+
 # Enhanced Footer
 st.markdown("""
 <footer>
@@ -0,0 +1,239 @@
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from job_store import JobStore, get_default_store, job_key
+from resume_matcher import BatchResumeMatcher, ResumeProfile
+
+RESUME_EXTENSIONS = (".pdf", ".docx", ".txt")
+OUTPUT_FORMATS = ("csv", "jsonl", "parquet")
+OUTPUT_FIELDS = [
+    "resume", "rank", "job_id", "title", "company", "location", "url",
+    "similarity_score", "matched_skills", "missing_skills",
+]
+
+JOB_OUTPUT_FIELDS = ["job_id", "title", "company", "location", "url", "description"]
+
+BATCH_WORKERS = int(os.environ.get("SAGE_BATCH_WORKERS", os.cpu_count() or 1))
+
+# Resumes handed to a worker process at a time
+RESUMES_PER_TASK = 8
+
+# Set in each worker process by _init_worker
+_matcher = None
+_jobs = None
+
+
+def find_resumes(directory):
+    """Return the PDF, DOCX and TXT files under a directory, sorted by path"""
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(RESUME_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def load_jobs(jobs_path=None, store_path=None, keyword=None):
+    """
+    Load the jobs to score against
+
+    Args:
+        jobs_path (str): JSON file of job listings (e.g. linkedin_jobs.json)
+        store_path (str): Job database to read instead (default: the local job database)
+        keyword (str): With a store, only jobs found with this search keyword
+
+    Returns:
+        list: Job listing dicts
+    """
+    if jobs_path:
+        with open(jobs_path, encoding="utf-8") as f:
+            return json.load(f)
+    store = JobStore(store_path) if store_path else get_default_store()
+    return store.query(keyword=keyword)
+
+
+def _init_worker(jobs):
+    global _matcher, _jobs
+    _jobs = jobs
+    _matcher = BatchResumeMatcher([job.get("description") or "" for job in jobs])
+    # Fit the job side once, before the first resume arrives
+    _matcher.job_counts
+    _matcher.job_skills
+
+
+def _init_worker_process(jobs):
+    import utils
+    # The worker processes are the parallelism; don't nest a PDF pool in each
+    utils.PDF_WORKERS = 1
+    _init_worker(jobs)
+
+
+def _score_resumes(paths, top_k):
+    """Score a few resumes against every job (runs in a worker process)"""
+    from utils import extract_text_from_file
+
+    rows = []
+    errors = []
+    for path in paths:
+        try:
+            profile = ResumeProfile(extract_text_from_file(path))
+        except Exception as e:
+            errors.append((path, str(e)))
+            continue
+
+        scores = _matcher.similarity_matrix([profile])[:, 0] if profile else np.zeros(len(_jobs))
+        ranked = np.argsort(-scores, kind="stable")
+        if top_k:
+            ranked = ranked[:top_k]
+
+        for rank, i in enumerate(ranked.tolist(), start=1):
+            job = _jobs[i]
+            job_skills = _matcher.job_skills[i]
+            rows.append({
+                "resume": path,
+                "rank": rank,
+                "job_id": job_key(job),
+                "title": job.get("title"),
+                "company": job.get("company"),
+                "location": job.get("location"),
+                "url": job.get("url"),
+                "similarity_score": float(scores[i]),
+                "matched_skills": sorted(job_skills & profile.skills),
+                "missing_skills": sorted(job_skills - profile.skills),
+            })
+    return rows, errors
+
+
+def iter_batch_results(resume_paths, jobs, workers=BATCH_WORKERS, top_k=20):
+    """
+    Score every resume against every job across worker processes
+
+    Each resume is scored exactly as the app scores it against a result set
+    (see BatchResumeMatcher.match_resume); every worker fits the job side once.
+
+    Args:
+        resume_paths (list): Resume files (PDF, DOCX or TXT)
+        jobs (list): Job listing dicts
+        workers (int): Worker processes (1 scores in this process)
+        top_k (int): Best jobs kept per resume (0 keeps every job)
+
+    Yields:
+        tuple: (rows, errors) per group of resumes, in resume order. rows are
+            dicts with OUTPUT_FIELDS, ranked per resume; errors are
+            (path, message) for resumes whose text could not be extracted
+    """
+    # Only what scoring and the output need is sent to each worker
+    jobs = [{field: job.get(field) for field in JOB_OUTPUT_FIELDS} for job in jobs]
+    tasks = [resume_paths[i:i + RESUMES_PER_TASK] for i in range(0, len(resume_paths), RESUMES_PER_TASK)]
+    if workers <= 1 or len(tasks) <= 1:
+        _init_worker(jobs)
+        for paths in tasks:
+            yield _score_resumes(paths, top_k)
+        return
+
+    # spawn, like the PDF pool: safe even when called from a threaded process
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker_process,
+        initargs=(jobs,)
+    ) as executor:
+        yield from executor.map(_score_resumes, tasks, [top_k] * len(tasks))
+
+
+class ResultWriter:
+    """
+    Write scored rows to CSV, JSON Lines or Parquet as they are produced
+
+    Skill lists are "; "-joined in CSV and kept as lists otherwise. Use as a
+    context manager so the file is closed (and the Parquet footer written).
+    """
+    def __init__(self, path, fmt=None):
+        self.path = path
+        self.format = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+        if self.format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format {self.format!r}; use one of {', '.join(OUTPUT_FORMATS)}")
+        self.rows_written = 0
+        self._file = None
+        self._csv = None
+        self._parquet = None
+
+        if self.format == "parquet":
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow")
+            self._pa = pa
+            self._schema = pa.schema([
+                ("resume", pa.string()), ("rank", pa.int32()), ("job_id", pa.string()),
+                ("title", pa.string()), ("company", pa.string()), ("location", pa.string()),
+                ("url", pa.string()), ("similarity_score", pa.float64()),
+                ("matched_skills", pa.list_(pa.string())), ("missing_skills", pa.list_(pa.string())),
+            ])
+            self._parquet = pq.ParquetWriter(path, self._schema)
+        else:
+            self._file = open(path, "w", encoding="utf-8", newline="")
+            if self.format == "csv":
+                self._csv = csv.DictWriter(self._file, fieldnames=OUTPUT_FIELDS)
+                self._csv.writeheader()
+
+    def write(self, rows):
+        if not rows:
+            return
+        if self.format == "parquet":
+            self._parquet.write_table(self._pa.Table.from_pylist(rows, schema=self._schema))
+        elif self.format == "csv":
+            self._csv.writerows(
+                dict(row, matched_skills="; ".join(row["matched_skills"]),
+                     missing_skills="; ".join(row["missing_skills"]))
+                for row in rows
+            )
+        else:
+            self._file.writelines(json.dumps(row) + "\n" for row in rows)
+        self.rows_written += len(rows)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_batch(resume_dir, output, jobs_path=None, store_path=None, keyword=None,
+              fmt=None, workers=BATCH_WORKERS, top_k=20):
+    """
+    Score a directory of resumes against a jobs file or the job store
+
+    Returns:
+        dict: Counts of resumes, jobs, rows written and failed resumes
+    """
+    resume_paths = find_resumes(resume_dir)
+    jobs = load_jobs(jobs_path, store_path, keyword)
+    print(f"Scoring {len(resume_paths)} resumes against {len(jobs)} jobs with {workers} workers", file=sys.stderr)
+
+    failed = 0
+    done = 0
+    with ResultWriter(output, fmt) as writer:
+        if resume_paths and jobs:
+            for rows, errors in iter_batch_results(resume_paths, jobs, workers, top_k):
+                writer.write(rows)
+                for path, message in errors:
+                    print(f"Skipped {path}: {message}", file=sys.stderr)
+                failed += len(errors)
+                done = min(done + RESUMES_PER_TASK, len(resume_paths))
+                print(f"Scored {done}/{len(resume_paths)} resumes", file=sys.stderr)
+
+    return {"resumes": len(resume_paths), "jobs": len(jobs), "rows": writer.rows_written, "failed": failed}
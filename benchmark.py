@@ -0,0 +1,289 @@
+"""
+Benchmarks for matching, skill extraction, description cleaning and table
+preparation, run on linkedin_jobs.json and synthetic scale-ups of it.
+
+    python benchmark.py                            # 1k, 10k and 100k postings
+    python benchmark.py --sizes 1000 10000 --save baseline.json
+    python benchmark.py --sizes 1000 10000 --compare baseline.json
+
+Each benchmark reports throughput in postings per second, p50/p99 latency per
+call and the peak Python memory (tracemalloc) of one run.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from dedupe import dedupe_jobs
+from description_cleaner import clean_description
+from hashed_index import HashedIndex
+from job_search import JobSearchIndex
+from resume_matcher import SKILL_SET, BatchResumeMatcher, ResumeMatcher, ResumeProfile, get_resume_profile
+from skill_analytics import SkillMatrix
+from tracing import tracer
+from ui_components import build_results_table
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "linkedin_jobs.json")
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# Per-posting benchmarks time at most this many calls; corpus-wide ones run on every posting
+DEFAULT_SAMPLE = 2000
+DEFAULT_REPEAT = 3
+
+# A slower run than the baseline by more than this fraction is flagged
+REGRESSION_THRESHOLD = 0.10
+
+SAMPLE_RESUME = """
+Software engineer with 5 years of experience building web applications in Python,
+JavaScript and React. Designed REST APIs with Django and Flask, deployed services
+with Docker and Kubernetes on AWS, and maintained CI/CD pipelines in Jenkins.
+Comfortable with SQL and PostgreSQL, data analysis with pandas, and machine
+learning basics. Strong communication and teamwork; led agile sprints.
+"""
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def scale_corpus(jobs, size, seed=0):
+    """
+    Build `size` synthetic postings from real ones
+
+    Each posting takes a real job's title, company and location and a shuffled
+    mix of sentences from the whole corpus, plus a few random skills and a
+    unique token, so the vocabulary keeps growing with the corpus as it
+    would with real postings.
+    """
+    rng = random.Random(seed)
+    sentences = [
+        sentence for job in jobs
+        for sentence in re.split(r"(?<=[.!?])\s+|\n+", job.get("description") or "")
+        if sentence.strip()
+    ]
+    per_job = max(1, len(sentences) // max(1, len(jobs)))
+
+    postings = []
+    for i in range(size):
+        base = jobs[i % len(jobs)]
+        body = rng.sample(sentences, min(len(sentences), rng.randint(per_job // 2, per_job)))
+        skills = rng.sample(SKILL_SET, 5)
+        body.append(f"Requirements: {', '.join(skills)}. Reference posting{i}.")
+        postings.append({
+            "title": base.get("title"),
+            "company": base.get("company"),
+            "location": base.get("location"),
+            "date_posted": base.get("date_posted"),
+            "description": "\n".join(body),
+        })
+    return postings
+
+
+def to_markup(description):
+    """Render a plain description as the kind of markup the scrapers read"""
+    parts = []
+    for line in description.split("\n"):
+        if line.startswith("• "):
+            parts.append(f"<ul><li>{line[2:].replace('&', '&amp;')}</li></ul>")
+        else:
+            parts.append(f"<p><span>{line.replace('&', '&amp;')}</span><br></p>")
+    return "".join(parts)
+
+
+def time_calls(fn, args):
+    """Call fn once per argument; return the latency of each call in seconds"""
+    latencies = []
+    for arg in args:
+        start = time.perf_counter()
+        fn(arg)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def peak_memory(fn, args):
+    """Peak bytes allocated by Python while calling fn once per argument"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        for arg in args:
+            fn(arg)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmark(fn, args, postings_per_call, measure_memory=True):
+    """
+    Time fn over args and summarise
+
+    Returns:
+        dict: calls, postings_per_sec, p50_ms, p99_ms and peak_mb
+    """
+    args = list(args)
+    latencies = time_calls(fn, args)
+    total = sum(latencies)
+    result = {
+        "calls": len(latencies),
+        "postings_per_sec": postings_per_call * len(latencies) / total if total else float("inf"),
+        "p50_ms": float(np.percentile(latencies, 50)) * 1000,
+        "p99_ms": float(np.percentile(latencies, 99)) * 1000,
+        "peak_mb": None,
+    }
+    if measure_memory:
+        # A separate pass, since tracing slows every allocation down
+        result["peak_mb"] = peak_memory(fn, args[:max(1, min(len(args), 200))]) / 2**20
+    return result
+
+
+def benchmark_size(postings, resume_text, sample=DEFAULT_SAMPLE, repeat=DEFAULT_REPEAT, measure_memory=True):
+    """
+    Run every benchmark on one corpus
+
+    Returns:
+        dict: Benchmark name -> summary (see run_benchmark)
+    """
+    descriptions = [job["description"] for job in postings]
+    sampled = descriptions[:sample]
+    markup = [to_markup(description) for description in sampled]
+    profile = get_resume_profile(resume_text)
+    matchers = [ResumeMatcher(description) for description in sampled]
+
+    def batch_match(_):
+        BatchResumeMatcher(descriptions).match_resume(profile)
+
+    index_dir = tempfile.TemporaryDirectory()
+    indexed = [dict(job, job_id=str(i)) for i, job in enumerate(postings)]
+    index = HashedIndex(index_dir.name)
+    search_index = JobSearchIndex(index)
+    skill_matrix = SkillMatrix()
+    skill_matrix.add_jobs(indexed[:sample])
+
+    def index_jobs(_):
+        HashedIndex(tempfile.mkdtemp(dir=index_dir.name)).add_jobs(indexed)
+
+    scored = [dict(job, similarity_score=0.5, matched_skills=[], missing_skills=[]) for job in postings]
+
+    benchmarks = {
+        "ResumeMatcher.__init__": (ResumeMatcher, sampled, 1),
+        "ResumeMatcher.match_resume": (lambda matcher: matcher.match_resume(profile), matchers, 1),
+        "ResumeMatcher.match_resume (text)": (lambda matcher: matcher.match_resume(resume_text), matchers, 1),
+        "BatchResumeMatcher.match_resume": (batch_match, range(repeat), len(descriptions)),
+        "HashedIndex.add_jobs": (index_jobs, range(1), len(descriptions)),
+        "HashedIndex.search": (lambda _: index.search(profile), range(repeat), len(descriptions)),
+        "JobSearchIndex.search": (lambda _: search_index.search(profile), range(repeat * 10), len(descriptions)),
+        "ResumeProfile": (lambda _: ResumeProfile(resume_text), range(repeat * 10), 1),
+        "extract_skills": (ResumeMatcher.extract_skills, sampled, 1),
+        "SkillMatrix.skill_gaps": (lambda _: skill_matrix.skill_gaps(profile), range(repeat * 10), len(skill_matrix)),
+        "dedupe_jobs": (lambda _: dedupe_jobs(postings[:sample]), range(repeat), len(sampled)),
+        "clean_description": (clean_description, markup, 1),
+        "build_results_table": (lambda _: build_results_table(scored, show_match=True), range(repeat), len(scored)),
+    }
+
+    index.add_jobs(indexed)
+    search_index.refresh()
+    results = {}
+    # Spans and the trace log would otherwise be timed along with the code
+    with index_dir, tracer.disabled():
+        for name, (fn, args, postings_per_call) in benchmarks.items():
+            results[name] = run_benchmark(fn, args, postings_per_call, measure_memory)
+            print(format_row(name, results[name]))
+    return results
+
+
+def format_row(name, result, baseline=None, threshold=REGRESSION_THRESHOLD):
+    peak = "-" if result["peak_mb"] is None else f"{result['peak_mb']:.1f}"
+    row = (f"  {name:<36} {result['postings_per_sec']:>12,.0f}/s  p50 {result['p50_ms']:>9.3f} ms"
+           f"  p99 {result['p99_ms']:>9.3f} ms  peak {peak:>7} MB")
+    if baseline:
+        change = baseline["postings_per_sec"] / result["postings_per_sec"] - 1
+        flag = "  REGRESSION" if change > threshold else ""
+        row += f"  {change:+.0%} time vs baseline{flag}"
+    return row
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Print each benchmark next to its baseline run
+
+    Returns:
+        list: (size, name) of benchmarks slower than the baseline by more
+            than `threshold` (a fraction of the baseline time)
+    """
+    regressions = []
+    for size, benchmarks in results.items():
+        print(f"\n{size} postings vs baseline")
+        for name, result in benchmarks.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if base is None:
+                print(format_row(name, result) + "  (no baseline)")
+                continue
+            print(format_row(name, result, base, threshold))
+            if base["postings_per_sec"] / result["postings_per_sec"] - 1 > threshold:
+                regressions.append((size, name))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark SAGE's matching and text processing")
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="Job listings JSON to scale up")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Synthetic corpus sizes (0 = the corpus as it is)")
+    parser.add_argument("--resume", help="Resume file (PDF, DOCX or TXT) to match with")
+    parser.add_argument("--sample", type=int, default=DEFAULT_SAMPLE,
+                        help="Maximum calls timed for per-posting benchmarks")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="Runs of each corpus-wide benchmark")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak memory pass")
+    parser.add_argument("--save", help="Write the results to this JSON file as a baseline")
+    parser.add_argument("--compare", help="Baseline JSON file to compare the results with")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Slowdown vs the baseline, as a fraction, that counts as a regression")
+    args = parser.parse_args(argv)
+
+    if args.resume:
+        from utils import extract_text_from_file
+        resume_text = extract_text_from_file(args.resume)
+    else:
+        resume_text = SAMPLE_RESUME
+
+    jobs = load_corpus(args.corpus)
+    results = {}
+    for size in args.sizes:
+        postings = jobs if size == 0 else scale_corpus(jobs, size)
+        print(f"\n{len(postings)} postings")
+        results[str(len(postings))] = benchmark_size(
+            postings, resume_text, args.sample, args.repeat, not args.no_memory
+        )
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
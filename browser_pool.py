@@ -0,0 +1,192 @@
+import atexit
+import os
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from tracing import tracer
+
+BROWSER_POOL_SIZE = int(os.environ.get("SAGE_BROWSER_POOL_SIZE", 2))
+BROWSER_MAX_USES = int(os.environ.get("SAGE_BROWSER_MAX_USES", 20))
+
+
+@lru_cache(maxsize=None)
+def resolve_driver_path():
+    """
+    Locate chromedriver once per process
+
+    Uses CHROMEDRIVER_PATH when set, otherwise asks webdriver-manager (which
+    may hit the network) and remembers the answer.
+    """
+    return os.environ.get("CHROMEDRIVER_PATH") or ChromeDriverManager().install()
+
+
+def launch_browser():
+    """Start a new headless Chrome session"""
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--window-size=1920,1080")
+
+    service = Service(resolve_driver_path())
+    return webdriver.Chrome(service=service, options=options)
+
+
+def is_healthy(browser):
+    """Return True if the WebDriver session still responds"""
+    try:
+        return browser.execute_script("return 1;") == 1
+    except Exception:
+        return False
+
+
+def _quit(browser):
+    try:
+        browser.quit()
+    except Exception as e:
+        print(f"Error closing browser: {e}")
+
+
+class BrowserPool:
+    """
+    Pool of warm, reusable headless Chrome sessions.
+
+    At most `size` sessions are checked out at once; callers beyond that wait.
+    Sessions are health-checked before being handed out and are recycled after
+    `max_uses` checkouts so a long-lived Chrome does not keep growing.
+    """
+    def __init__(self, size=BROWSER_POOL_SIZE, max_uses=BROWSER_MAX_USES, factory=launch_browser):
+        self.size = size
+        self.max_uses = max_uses
+        self._factory = factory
+        self._idle = []
+        self._uses = {}
+        self._live = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _create(self):
+        with self._lock:
+            self._live += 1
+        try:
+            with tracer.span("browser.launch"):
+                browser = self._factory()
+            tracer.count("browser_launches")
+        except Exception:
+            with self._lock:
+                self._live -= 1
+            raise
+        with self._lock:
+            self._uses[id(browser)] = 0
+        return browser
+
+    def _retire(self, browser):
+        with self._lock:
+            self._live -= 1
+            self._uses.pop(id(browser), None)
+        _quit(browser)
+
+    def warm(self, count=None):
+        """Launch idle sessions ahead of time so the first searches skip Chrome startup"""
+        count = self.size if count is None else min(count, self.size)
+        while True:
+            with self._lock:
+                if self._closed or self._live >= count:
+                    return
+            browser = self._create()
+            with self._lock:
+                self._idle.append(browser)
+
+    @tracer.traced("browser.acquire")
+    def acquire(self, timeout=None):
+        """
+        Check a session out of the pool
+
+        Args:
+            timeout (float): Seconds to wait for a free session (default: forever)
+
+        Returns:
+            WebDriver: A healthy browser session
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No browser available after {timeout}s (pool size {self.size})")
+
+        try:
+            while True:
+                with self._lock:
+                    if self._closed:
+                        raise RuntimeError("Browser pool is closed")
+                    browser = self._idle.pop() if self._idle else None
+                if browser is None:
+                    return self._create()
+                if is_healthy(browser):
+                    return browser
+                print("Discarding unresponsive browser session")
+                tracer.count("browser_recycles")
+                self._retire(browser)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, browser):
+        """Return a session to the pool, recycling it if it is worn out or broken"""
+        try:
+            with self._lock:
+                self._uses[id(browser)] = self._uses.get(id(browser), 0) + 1
+                worn_out = self._uses[id(browser)] >= self.max_uses
+                keep = not (self._closed or worn_out or self._live > self.size)
+
+            if keep and is_healthy(browser):
+                try:
+                    browser.delete_all_cookies()
+                    browser.get("about:blank")
+                except Exception:
+                    keep = False
+            else:
+                keep = False
+
+            if keep:
+                with self._lock:
+                    self._idle.append(browser)
+            else:
+                self._retire(browser)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def browser(self, timeout=None):
+        """Context manager that checks a session out and always returns it"""
+        browser = self.acquire(timeout=timeout)
+        try:
+            yield browser
+        finally:
+            self.release(browser)
+
+    def close(self):
+        """Quit every idle session; checked-out sessions are quit on release"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for browser in idle:
+            self._retire(browser)
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool():
+    """Return the process-wide BrowserPool, creating it on first use"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = BrowserPool()
+            atexit.register(_default_pool.close)
+        return _default_pool
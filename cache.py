@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded LRU cache whose entries expire after a TTL.
+
+    Expired entries are dropped lazily when they are looked up; when the cache
+    is full the least recently used entry is evicted.
+    """
+    def __init__(self, maxsize=32, ttl=900, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expired(self, stored_at):
+        return self.ttl is not None and self._timer() - stored_at > self.ttl
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if it is missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            if self._expired(entry[0]):
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (self._timer(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def age(self, key):
+        """Return how many seconds ago key was stored, or None if it is not cached"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or self._expired(entry[0]):
+                return None
+            return self._timer() - entry[0]
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        return self.age(key) is not None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
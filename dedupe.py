@@ -0,0 +1,206 @@
+import os
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from description_cleaner import NO_DESCRIPTION
+from tracing import tracer
+
+NUM_PERM = 128
+
+# 32 bands of 4 rows: pairs above ~0.6 Jaccard similarity almost always share a band
+LSH_BANDS = 32
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+# Estimated Jaccard similarity of shingles at which two postings count as the same role
+DUPLICATE_THRESHOLD = float(os.environ.get("SAGE_DUPLICATE_THRESHOLD", 0.7))
+
+# Fields kept for each variant attached to a representative posting
+VARIANT_FIELDS = ["job_id", "title", "company", "location", "date_posted", "url"]
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# Fixed seed, so signatures computed in different runs can be compared
+_rng = np.random.default_rng(20240601)
+_MULTIPLIERS = _rng.integers(1, 2**63, size=(NUM_PERM, 1), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_OFFSETS = _rng.integers(0, 2**63, size=(NUM_PERM, 1), dtype=np.uint64)
+_SHINGLE_WEIGHTS = _rng.integers(1, 2**63, size=SHINGLE_SIZE, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+
+def shingle_hashes(text, size=SHINGLE_SIZE):
+    """
+    Hash every overlapping `size`-word sequence of a text, lower-cased
+
+    Words are hashed once (CRC32) and each shingle's hash combines its
+    words' hashes positionally, so no shingle strings are built.
+
+    Returns:
+        numpy.ndarray: uint64 shingle hashes (a text shorter than `size`
+            words is one shingle; a text with no words has none)
+    """
+    words = np.fromiter(
+        (zlib.crc32(word.encode("utf-8")) for word in WORD_PATTERN.findall(text.lower())), dtype=np.uint64
+    )
+    if len(words) <= size:
+        return (words * _SHINGLE_WEIGHTS[:len(words)]).sum(keepdims=True) if len(words) else words
+    windows = len(words) - size + 1
+    hashes = np.zeros(windows, dtype=np.uint64)
+    for offset in range(size):
+        hashes += words[offset:offset + windows] * _SHINGLE_WEIGHTS[offset]
+    return hashes
+
+
+def minhash(text):
+    """
+    MinHash signature of a text's shingles
+
+    Each of the NUM_PERM hash functions is a multiply-shift hash of the
+    shingle hash; the signature keeps the minimum of each.
+
+    Returns:
+        numpy.ndarray: NUM_PERM uint32 values, or None for a text with no words
+    """
+    hashes = shingle_hashes(text)
+    if not len(hashes):
+        return None
+    # uint64 arithmetic wraps, which is what multiply-shift hashing relies on
+    return ((hashes * _MULTIPLIERS + _OFFSETS) >> np.uint64(32)).min(axis=1).astype(np.uint32)
+
+
+class DuplicateGrouper:
+    """
+    Near-duplicate grouping that grows as texts arrive.
+
+    Each text is MinHashed once when added and checked against the LSH
+    buckets of the texts before it, so grouping a stream (e.g. a running
+    scrape polled by the app) never re-hashes what it has already seen.
+    find_duplicate_clusters() is one grouper over a whole list.
+    """
+    def __init__(self, threshold=DUPLICATE_THRESHOLD, bands=LSH_BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.parent = []
+        self.signatures = {}
+        self.buckets = defaultdict(list)
+
+    def __len__(self):
+        return len(self.parent)
+
+    def _find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def add(self, texts):
+        """Add texts (None or empty texts are never grouped), numbered after those already added"""
+        rows = self.rows
+        for text in texts:
+            i = len(self.parent)
+            self.parent.append(i)
+            signature = minhash(text) if text else None
+            if signature is None:
+                continue
+            self.signatures[i] = signature
+            checked = set()
+            for band in range(self.bands):
+                key = (band, signature[band * rows:(band + 1) * rows].tobytes())
+                for j in self.buckets[key]:
+                    # A pair sharing several bands is only compared once
+                    if j not in checked and self._find(i) != self._find(j):
+                        checked.add(j)
+                        if np.count_nonzero(signature == self.signatures[j]) >= self.threshold * NUM_PERM:
+                            self.parent[self._find(i)] = self._find(j)
+                self.buckets[key].append(i)
+
+    def clusters(self):
+        """
+        Returns:
+            list: Clusters as lists of indices of the added texts, each in
+                input order, ordered by their first index; singletons included
+        """
+        clusters = defaultdict(list)
+        for i in range(len(self.parent)):
+            clusters[self._find(i)].append(i)
+        return sorted(clusters.values(), key=lambda cluster: cluster[0])
+
+
+def find_duplicate_clusters(texts, threshold=DUPLICATE_THRESHOLD, bands=LSH_BANDS):
+    """
+    Group near-duplicate texts with MinHash and locality-sensitive hashing
+
+    Texts whose signatures agree on every row of some band become candidate
+    pairs; a pair is linked when its estimated Jaccard similarity (the share
+    of agreeing signature values) reaches `threshold`. Linked texts form
+    clusters transitively.
+
+    Args:
+        texts (list): Texts to compare; None or empty texts are never grouped
+        threshold (float): Minimum estimated Jaccard similarity
+        bands (int): LSH bands (NUM_PERM must be divisible by it)
+
+    Returns:
+        list: Clusters as lists of indices into `texts`, each in input order,
+            ordered by their first index; singletons included
+    """
+    grouper = DuplicateGrouper(threshold, bands)
+    grouper.add(texts)
+    return grouper.clusters()
+
+
+def dedupe_text(job):
+    """The text a job is grouped by: its description, or None without one"""
+    description = job.get("description")
+    return description if description != NO_DESCRIPTION else None
+
+
+def group_jobs(jobs, clusters):
+    """
+    Build one representative per cluster of jobs (see dedupe_jobs)
+
+    Args:
+        jobs (list): Job listing dicts
+        clusters (list): Clusters of indices into `jobs`, e.g. from
+            find_duplicate_clusters or DuplicateGrouper.clusters
+
+    Returns:
+        list: Representative job dicts (copies), each with a "variants" list
+    """
+    representatives = []
+    for cluster in clusters:
+        job = dict(jobs[cluster[0]])
+        job["variants"] = [
+            {field: jobs[i].get(field) for field in VARIANT_FIELDS} for i in cluster[1:]
+        ]
+        representatives.append(job)
+    return representatives
+
+
+def dedupe_jobs(jobs, threshold=DUPLICATE_THRESHOLD):
+    """
+    Keep one posting per group of near-duplicate descriptions
+
+    The first posting of each group represents it; the others are attached to
+    it as "variants" (their VARIANT_FIELDS only), so reposts and syndicated
+    copies are matched and rendered once. Postings without a description are
+    never grouped.
+
+    Args:
+        jobs (list): Job listing dicts
+        threshold (float): Minimum estimated Jaccard similarity of descriptions
+
+    Returns:
+        list: Representative job dicts (copies) in their original order, each
+            with a "variants" list
+    """
+    with tracer.span("dedupe", jobs=len(jobs)):
+        clusters = find_duplicate_clusters([dedupe_text(job) for job in jobs], threshold)
+        representatives = group_jobs(jobs, clusters)
+        tracer.count("duplicates_grouped", len(jobs) - len(representatives))
+    return representatives
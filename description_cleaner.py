@@ -0,0 +1,170 @@
+import html
+import re
+from datetime import datetime
+
+NO_DESCRIPTION = "No Description Found"
+
+# LinkedIn wraps the description body in this div, on job pages and in the detail pane
+CONTAINER_CLASS = "show-more-less-html__markup"
+
+LINE_BREAK_AFTER = {"p", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6"}
+
+# One alternation covers every token, so the markup is scanned exactly once
+TOKEN_PATTERN = re.compile(
+    r"(?P<skip><(script|style)\b[^>]*>.*?</\2\s*>|<!--.*?-->|<[!?][^>]*>)"
+    r"|<(?P<close>/?)(?P<tag>[a-zA-Z][a-zA-Z0-9]*)(?P<attrs>[^>]*)>"
+    r"|(?P<text>[^<]+|<)",
+    re.DOTALL | re.IGNORECASE
+)
+CLASS_PATTERN = re.compile(r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE)
+
+
+def _has_class(attrs, css_class):
+    match = CLASS_PATTERN.search(attrs)
+    return bool(match) and css_class in (match.group(1) or match.group(2) or match.group(3) or "").split()
+
+
+class DescriptionCleaner:
+    """
+    Turn job description markup into plain text with list bullets in one pass.
+
+    The markup is tokenized by a single precompiled pattern. Entities are
+    decoded, script and style content is dropped, <br> and block ends become
+    line breaks and <li> becomes "• ". With a `container_class`, only the
+    content of the first <div> carrying that class is used (e.g. the
+    description on a full job posting page), and its inner markup is kept in
+    `markup` so it can be stored and re-cleaned later.
+    """
+    def __init__(self, container_class=None):
+        self.container_class = container_class
+        self.markup = None
+        self.parts = []
+
+    def parse(self, markup):
+        """Scan a whole document and return its text"""
+        parts = self.parts
+        container_class = self.container_class
+        depth = 0 if container_class else 1
+        markup_start = None
+
+        for match in TOKEN_PATTERN.finditer(markup):
+            kind = match.lastgroup
+            if kind == "text":
+                if depth:
+                    text = match.group("text")
+                    parts.append(html.unescape(text) if "&" in text else text)
+                continue
+            if kind == "skip":
+                continue
+
+            tag = match.group("tag").lower()
+            closing = match.group("close")
+            if container_class and tag == "div" and not match.group("attrs").endswith("/"):
+                if not depth:
+                    if not closing and _has_class(match.group("attrs"), container_class):
+                        depth = 1
+                        markup_start = match.end()
+                    continue
+                depth += -1 if closing else 1
+                if not depth:
+                    # Only the first container counts
+                    self.markup = markup[markup_start:match.start()]
+                    break
+                continue
+            if not depth:
+                continue
+
+            if closing:
+                if tag in LINE_BREAK_AFTER:
+                    parts.append("\n")
+            elif tag == "br":
+                parts.append("\n")
+            elif tag == "li":
+                parts.append("• ")
+            elif tag in ("ul", "ol"):
+                parts.append("\n")
+
+        if depth and container_class and self.markup is None:
+            # Unclosed container: it runs to the end of the document
+            self.markup = markup[markup_start:]
+        return self.text()
+
+    def text(self):
+        """Return the collected text: spaces collapsed, at most one blank line in a row"""
+        lines = []
+        blank = True
+        for line in "".join(self.parts).split("\n"):
+            line = " ".join(line.split())
+            if line:
+                lines.append(line)
+                blank = False
+            elif not blank:
+                lines.append("")
+                blank = True
+        while lines and not lines[-1]:
+            lines.pop()
+        return "\n".join(lines)
+
+
+def clean_description(description):
+    """Strip markup from description HTML, keeping line breaks and list bullets"""
+    if not isinstance(description, str):
+        return description
+    return DescriptionCleaner().parse(description)
+
+
+def extract_description(html, container_class=CONTAINER_CLASS):
+    """
+    Pull the description out of a full job posting page
+
+    Args:
+        html (str): Job posting HTML
+        container_class (str): Class of the div holding the description
+
+    Returns:
+        tuple: (markup, text) - the container's inner HTML (None if there is
+            no container) and its cleaned text
+    """
+    cleaner = DescriptionCleaner(container_class)
+    text = cleaner.parse(html)
+    return cleaner.markup, text
+
+
+def clean_descriptions(htmls):
+    """Clean many descriptions, e.g. a whole stored corpus (see renormalize_store)"""
+    return [clean_description(html) or NO_DESCRIPTION for html in htmls]
+
+
+def renormalize_store(store, batch_size=500):
+    """
+    Re-clean every stored description from the markup it was scraped from
+
+    Run after the cleaning rules change. Jobs stored without their markup
+    (e.g. imported from JSON) are left as they are. Changed jobs get a new
+    updated_at, so indexes over the store pick them up.
+
+    Args:
+        store (JobStore): Store to update in place
+        batch_size (int): Jobs read and written per transaction
+
+    Returns:
+        int: Number of descriptions that changed
+    """
+    changed = 0
+    last_id = ""
+    while True:
+        rows = store.execute(
+            "SELECT job_id, description, description_html FROM jobs "
+            "WHERE description_html IS NOT NULL AND job_id > ? ORDER BY job_id LIMIT ?",
+            (last_id, batch_size)
+        )
+        if not rows:
+            return changed
+        last_id = rows[-1]["job_id"]
+
+        texts = clean_descriptions(row["description_html"] for row in rows)
+        now = datetime.now().isoformat(timespec="seconds")
+        updates = [(text, now, row["job_id"]) for row, text in zip(rows, texts) if text != row["description"]]
+        if updates:
+            store.executemany("UPDATE jobs SET description = ?, updated_at = ? WHERE job_id = ?", updates)
+            changed += len(updates)
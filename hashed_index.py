@@ -0,0 +1,401 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import scipy.sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from job_store import job_key
+from resume_matcher import SKILL_EXTRACTOR, as_resume_profile
+from tracing import tracer
+
+# Width of the hashed feature space: 2**20 columns keeps collisions rare for job text
+HASH_FEATURES = int(os.environ.get("SAGE_HASH_FEATURES", 2**20))
+
+DEFAULT_INDEX_DIR = os.environ.get(
+    "SAGE_INDEX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "sage_index")
+)
+
+# Jobs per chunk file; a search holds one chunk in memory at a time
+INDEX_CHUNK_SIZE = int(os.environ.get("SAGE_INDEX_CHUNK_SIZE", 5000))
+
+
+def description_digest(description):
+    """Short hash of a job description, to tell when an indexed job has changed"""
+    return hashlib.blake2b((description or "").encode("utf-8"), digest_size=8).hexdigest()
+
+
+def make_hasher(n_features=HASH_FEATURES):
+    """
+    Stateless vectorizer producing raw term counts in a fixed-width space
+
+    Tokenization matches the fitted vectorizers (English stop words, default
+    token pattern), so hashed and vocabulary-based scores are close.
+    """
+    return HashingVectorizer(
+        n_features=n_features,
+        stop_words="english",
+        alternate_sign=False,
+        norm=None,
+        dtype=np.float32
+    )
+
+
+class DocumentFrequencies:
+    """
+    Per-feature document frequencies for a hashed feature space.
+
+    A single uint32 array, updated incrementally as documents are added, so
+    IDF weights never need the documents themselves again.
+    """
+    def __init__(self, n_features=HASH_FEATURES):
+        self.counts = np.zeros(n_features, dtype=np.uint32)
+        self.n_docs = 0
+
+    def update(self, term_counts):
+        """Add the documents (rows of a hashed count matrix) to the statistics"""
+        term_counts = scipy.sparse.csr_matrix(term_counts)
+        self.counts += np.bincount(term_counts.indices, minlength=len(self.counts)).astype(np.uint32)
+        self.n_docs += term_counts.shape[0]
+
+    def remove(self, term_counts):
+        """Take documents added earlier out of the statistics"""
+        term_counts = scipy.sparse.csr_matrix(term_counts)
+        self.counts -= np.bincount(term_counts.indices, minlength=len(self.counts)).astype(np.uint32)
+        self.n_docs -= term_counts.shape[0]
+
+    def idf(self, extra=None):
+        """
+        Smoothed IDF weights, as TfidfVectorizer computes them
+
+        Args:
+            extra: Hashed count rows of documents to include without adding
+                them permanently (e.g. the resume being matched)
+        """
+        df = self.counts.astype(np.float64)
+        n_docs = self.n_docs
+        if extra is not None:
+            extra = scipy.sparse.csr_matrix(extra)
+            df += np.bincount(extra.indices, minlength=len(df))
+            n_docs += extra.shape[0]
+        return np.log((1 + n_docs) / (1 + df)) + 1
+
+    def save(self, path):
+        np.savez_compressed(path, counts=self.counts, n_docs=self.n_docs)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        frequencies = cls(len(data["counts"]))
+        frequencies.counts = data["counts"]
+        frequencies.n_docs = int(data["n_docs"])
+        return frequencies
+
+
+class HashedIndex:
+    """
+    On-disk index of job term counts in a hashed feature space.
+
+    Jobs are vectorized once when added and stored in chunk files with their
+    job keys; document frequencies are kept alongside. A search streams the
+    chunks through memory one at a time, weighting them with the current IDF,
+    so the corpus can be much larger than RAM and no vocabulary is ever fitted.
+
+    A job added again with a different description is re-indexed: its old row
+    is marked deleted and taken out of the document frequencies. Chunks left
+    at most half full are merged into full ones. `generation` goes up
+    whenever existing chunks change, rather than new ones being appended.
+    """
+    MANIFEST = "manifest.json"
+    FREQUENCIES = "frequencies.npz"
+
+    def __init__(self, directory=DEFAULT_INDEX_DIR, n_features=HASH_FEATURES, chunk_size=INDEX_CHUNK_SIZE):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        manifest_path = os.path.join(directory, self.MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            n_features = manifest["n_features"]
+            self.chunks = manifest["chunks"]
+            self.frequencies = DocumentFrequencies.load(os.path.join(directory, self.FREQUENCIES))
+        else:
+            manifest = {}
+            self.chunks = []
+            self.frequencies = DocumentFrequencies(n_features)
+
+        self.n_features = n_features
+        self.hasher = make_hasher(n_features)
+        self.generation = manifest.get("generation", 0)
+        # updated_at of the last stored job indexed by index_store
+        self.synced_through = manifest.get("synced_through")
+        self._next_chunk = manifest.get("next_chunk", len(self.chunks))
+        # Files of merged chunks, deleted at the next merge so running searches can finish reading them
+        self._obsolete = manifest.get("obsolete", [])
+        self._entries = None
+
+    def __len__(self):
+        return self.frequencies.n_docs
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_ids(self, chunk):
+        with open(self._path(chunk["ids"]), encoding="utf-8") as f:
+            ids = json.load(f)
+        # Chunks written before digests were kept hold just the keys
+        if isinstance(ids, list):
+            return ids, [None] * len(ids)
+        return ids["ids"], ids["digests"]
+
+    def _read_chunk(self, chunk):
+        """Keys, digests and counts of a chunk's rows, without the deleted ones"""
+        job_ids, digests = self._read_ids(chunk)
+        counts = scipy.sparse.load_npz(self._path(chunk["counts"])).tocsr()
+        deleted = chunk.get("deleted")
+        if deleted:
+            keep = np.setdiff1d(np.arange(len(job_ids)), deleted)
+            job_ids = [job_ids[i] for i in keep]
+            digests = [digests[i] for i in keep]
+            counts = counts[keep]
+        return job_ids, digests, counts
+
+    @property
+    def entries(self):
+        """Indexed job key -> (chunk ids file, row, description digest), loaded lazily"""
+        if self._entries is None:
+            entries = {}
+            for chunk in self.chunks:
+                job_ids, digests = self._read_ids(chunk)
+                deleted = set(chunk.get("deleted", ()))
+                for row, (key, digest) in enumerate(zip(job_ids, digests)):
+                    if row not in deleted:
+                        entries[key] = (chunk["ids"], row, digest)
+            self._entries = entries
+        return self._entries
+
+    @property
+    def job_ids(self):
+        """Every indexed job key"""
+        return self.entries.keys()
+
+    def _save_manifest(self):
+        self.frequencies.save(self._path(self.FREQUENCIES + ".tmp.npz"))
+        os.replace(self._path(self.FREQUENCIES + ".tmp.npz"), self._path(self.FREQUENCIES))
+        tmp_path = self._path(self.MANIFEST + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "n_features": self.n_features,
+                "chunks": self.chunks,
+                "generation": self.generation,
+                "synced_through": self.synced_through,
+                "next_chunk": self._next_chunk,
+                "obsolete": self._obsolete,
+            }, f)
+        os.replace(tmp_path, self._path(self.MANIFEST))
+
+    def add_jobs(self, jobs):
+        """
+        Vectorize and store jobs that are new or whose description changed
+
+        Args:
+            jobs (iterable): Job listing dicts with a "description"
+
+        Returns:
+            int: Number of jobs added or re-indexed
+        """
+        added = 0
+        with self._lock:
+            entries = self.entries
+            batch = {}
+            stale = []
+            for job in jobs:
+                key = job_key(job)
+                description = job.get("description") or ""
+                digest = description_digest(description)
+                entry = entries.get(key)
+                if key not in batch and entry is not None:
+                    if entry[2] == digest:
+                        continue
+                    stale.append(entry)
+                batch[key] = (description, digest)
+                if len(batch) == self.chunk_size:
+                    added += self._write_chunk(batch)
+                    batch = {}
+            if batch:
+                added += self._write_chunk(batch)
+            if stale:
+                self._delete_rows(stale)
+            if added:
+                self._merge_small_chunks()
+                self._save_manifest()
+        return added
+
+    def _write_chunk(self, batch):
+        with tracer.span("index.add_chunk", jobs=len(batch)):
+            counts = self.hasher.transform([description for description, _ in batch.values()]).tocsr()
+            self.frequencies.update(counts)
+            self._store_chunk(list(batch), [digest for _, digest in batch.values()], counts)
+        return len(batch)
+
+    def _store_chunk(self, job_ids, digests, counts):
+        name = f"chunk-{self._next_chunk:06d}"
+        self._next_chunk += 1
+        scipy.sparse.save_npz(self._path(name + ".npz"), counts)
+        with open(self._path(name + ".json"), "w", encoding="utf-8") as f:
+            json.dump({"ids": job_ids, "digests": digests}, f)
+        self.chunks.append({"counts": name + ".npz", "ids": name + ".json", "size": len(job_ids)})
+        for row, (key, digest) in enumerate(zip(job_ids, digests)):
+            self.entries[key] = (name + ".json", row, digest)
+
+    def _delete_rows(self, stale):
+        """Mark superseded rows deleted and take them out of the document frequencies"""
+        rows_by_chunk = {}
+        for ids_file, row, _ in stale:
+            rows_by_chunk.setdefault(ids_file, set()).add(row)
+        for chunk in self.chunks:
+            rows = rows_by_chunk.get(chunk["ids"])
+            if rows:
+                counts = scipy.sparse.load_npz(self._path(chunk["counts"])).tocsr()
+                self.frequencies.remove(counts[sorted(rows)])
+                chunk["deleted"] = sorted(set(chunk.get("deleted", ())) | rows)
+        self.generation += 1
+
+    def _merge_small_chunks(self):
+        """Rewrite chunks at most half full (e.g. after re-indexing) as full ones"""
+        small = [chunk for chunk in self.chunks
+                 if 2 * (chunk["size"] - len(chunk.get("deleted", ()))) <= self.chunk_size]
+        if len(small) < 2 and not any(chunk.get("deleted") for chunk in small):
+            return
+        with tracer.span("index.merge_chunks", chunks=len(small)):
+            for name in self._obsolete:
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+            self._obsolete = []
+
+            job_ids, digests, blocks = [], [], []
+            for chunk in small:
+                chunk_ids, chunk_digests, counts = self._read_chunk(chunk)
+                job_ids += chunk_ids
+                digests += chunk_digests
+                blocks.append(counts)
+                self._obsolete += [chunk["counts"], chunk["ids"]]
+            merged = set(map(id, small))
+            self.chunks = [chunk for chunk in self.chunks if id(chunk) not in merged]
+
+            counts = scipy.sparse.vstack(blocks, format="csr", dtype=np.float32)
+            for start in range(0, len(job_ids), self.chunk_size):
+                end = start + self.chunk_size
+                self._store_chunk(job_ids[start:end], digests[start:end], counts[start:end])
+        self.generation += 1
+
+    def mark_synced(self, updated_at):
+        """Record the updated_at of the last stored job indexed (see index_store)"""
+        with self._lock:
+            if updated_at != self.synced_through:
+                self.synced_through = updated_at
+                self._save_manifest()
+
+    def iter_chunks(self, start=0):
+        """Yield (job_keys, hashed count matrix) for each chunk from `start` on, without deleted rows"""
+        for chunk in self.chunks[start:]:
+            job_ids, _, counts = self._read_chunk(chunk)
+            yield job_ids, counts
+
+    def search(self, resume, top_k=20):
+        """
+        Find the jobs most similar to a resume
+
+        Args:
+            resume (str or ResumeProfile): Resume text or its precomputed profile
+            top_k (int): Number of jobs to return
+
+        Returns:
+            list: (job_key, similarity_score) pairs, best first
+        """
+        profile = as_resume_profile(resume)
+        if not profile or not len(self):
+            return []
+
+        with tracer.span("index.search", jobs=len(self)):
+            resume_counts = self.hasher.transform([profile.text]).tocsr()
+            idf = self.frequencies.idf(extra=resume_counts)
+            resume_vector = normalize(resume_counts.multiply(idf).tocsr()).T.tocsc()
+
+            best_ids, best_scores = [], np.empty(0)
+            for job_ids, counts in self.iter_chunks():
+                scores = (normalize(counts.multiply(idf).tocsr()) @ resume_vector).toarray().ravel()
+                if len(scores) > top_k:
+                    keep = np.argpartition(-scores, top_k - 1)[:top_k]
+                else:
+                    keep = np.arange(len(scores))
+                best_ids += [job_ids[i] for i in keep]
+                best_scores = np.concatenate([best_scores, scores[keep]])
+                if len(best_ids) > top_k:
+                    keep = np.argsort(-best_scores, kind="stable")[:top_k]
+                    best_ids = [best_ids[i] for i in keep]
+                    best_scores = best_scores[keep]
+
+        order = np.argsort(-best_scores, kind="stable")
+        return [(best_ids[i], float(best_scores[i])) for i in order]
+
+    def match_resume(self, resume, store, top_k=20):
+        """
+        Search the index and describe the best jobs like the other matchers do
+
+        Args:
+            resume (str or ResumeProfile): Resume text or its precomputed profile
+            store (JobStore): Store holding the indexed jobs
+            top_k (int): Number of jobs to return
+
+        Returns:
+            list: Stored job dicts, best first, with similarity_score,
+                matched_skills and missing_skills added
+        """
+        profile = as_resume_profile(resume)
+        hits = self.search(profile, top_k)
+        jobs = {job["job_id"]: job for job in store.get_jobs([job_id for job_id, _ in hits])}
+
+        results = []
+        for job_id, score in hits:
+            job = jobs.get(job_id)
+            if job is None:
+                continue
+            job_skills = SKILL_EXTRACTOR.extract(job.get("description") or "")
+            job["similarity_score"] = score
+            job["matched_skills"] = list(job_skills & profile.skills)
+            job["missing_skills"] = list(job_skills - profile.skills)
+            results.append(job)
+        return results
+
+
+def index_store(store, index=None, batch_size=INDEX_CHUNK_SIZE):
+    """
+    Bring the index up to date with a store
+
+    Only jobs inserted or given a new description since the last sync (by
+    their updated_at) are read; of those, add_jobs re-indexes the ones whose
+    description differs from the indexed one.
+
+    Args:
+        store (JobStore): Store to read the jobs from
+        index (HashedIndex): Index to add them to (default: the local index)
+        batch_size (int): Jobs read from the store at a time
+
+    Returns:
+        int: Number of jobs added or re-indexed
+    """
+    if index is None:
+        index = HashedIndex()
+    added = 0
+    # Jobs updated in the same second as the last one synced are read again, in case they came after it
+    for jobs in store.iter_updated(index.synced_through, batch_size):
+        added += index.add_jobs(jobs)
+        index.mark_synced(jobs[-1]["updated_at"])
+    return added
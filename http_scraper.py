@@ -0,0 +1,345 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urlencode
+
+import urllib3
+from urllib3.util.retry import Retry
+
+from description_cleaner import NO_DESCRIPTION, extract_description
+from job_store import UNKNOWN_POSTED_DATE, parse_job_id
+from search_filters import card_matches, search_params
+from tracing import propagate, tracer
+
+LINKEDIN_URL = "https://www.linkedin.com"
+SEARCH_PATH = "/jobs-guest/jobs/api/seeMoreJobPostings/search"
+JOB_POSTING_PATH = "/jobs-guest/jobs/api/jobPosting/{job_id}"
+
+HTTP_CONCURRENCY = int(os.environ.get("SAGE_HTTP_CONCURRENCY", 4))
+HTTP_TIMEOUT = float(os.environ.get("SAGE_HTTP_TIMEOUT", 10))
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+class HTTPStatusError(urllib3.exceptions.HTTPError):
+    """LinkedIn answered a request with an error status (not retried, or retried to no avail)"""
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+def _classes(attrs):
+    return (dict(attrs).get("class") or "").split()
+
+
+class JobCardParser(HTMLParser):
+    """
+    Collect job cards from a guest search results page or fragment.
+
+    Produces the same card fields as scraper.parse_card_metadata.
+    """
+    FIELDS = {
+        "base-search-card__title": "title",
+        "base-search-card__subtitle": "company",
+        "job-search-card__location": "location",
+    }
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.cards = []
+        self._field = None
+        self._field_tag = None
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        classes = _classes(attrs)
+        attributes = dict(attrs)
+
+        if "base-card" in classes:
+            # Cards are never nested, so a new one closes the previous one
+            self.cards.append({"urn": attributes.get("data-entity-urn")})
+            if tag == "a":
+                self.cards[-1]["url"] = attributes.get("href")
+        if not self.cards:
+            return
+        card = self.cards[-1]
+
+        if tag == "a" and "base-card__full-link" in classes:
+            card["url"] = attributes.get("href")
+        elif tag == "time" and "datetime" in attributes:
+            card["date_posted"] = attributes["datetime"]
+
+        if self._field is None:
+            for css_class, field in self.FIELDS.items():
+                if css_class in classes:
+                    self._field, self._field_tag, self._text = field, tag, []
+                    break
+
+    def handle_endtag(self, tag):
+        if self._field is not None and tag == self._field_tag:
+            self.cards[-1][self._field] = " ".join("".join(self._text).split())
+            self._field = None
+
+    def handle_data(self, data):
+        if self._field is not None:
+            self._text.append(data)
+
+
+def parse_job_cards(html):
+    """
+    Parse job cards out of search results HTML
+
+    Args:
+        html (str): Search results page or guest API fragment
+
+    Returns:
+        list: Job dicts with title, company, location, date_posted, url and
+            job_id; cards without a title or company are skipped
+    """
+    parser = JobCardParser()
+    parser.feed(html)
+    parser.close()
+
+    jobs = []
+    for card in parser.cards:
+        if not card.get("title") or not card.get("company"):
+            continue
+        jobs.append({
+            "title": card["title"],
+            "company": card["company"],
+            "url": card.get("url"),
+            "job_id": parse_job_id(card.get("urn")) or parse_job_id(card.get("url")),
+            "location": card.get("location") or "Location not specified",
+            "date_posted": card.get("date_posted") or UNKNOWN_POSTED_DATE,
+        })
+    return jobs
+
+
+def parse_job_description(html):
+    """
+    Extract the cleaned description text from a job posting page
+
+    Args:
+        html (str): Job posting HTML
+
+    Returns:
+        str: Description text, or "No Description Found"
+    """
+    return extract_description(html)[1] or NO_DESCRIPTION
+
+
+class LinkedInGuestClient:
+    """
+    Scrape LinkedIn's server-rendered guest job pages without a browser.
+
+    Requests share a keep-alive connection pool and are retried with backoff
+    on rate limiting and server errors. `base_url` can point at a local
+    fixture server for testing.
+    """
+    def __init__(self, base_url=LINKEDIN_URL, concurrency=HTTP_CONCURRENCY, timeout=HTTP_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.http = urllib3.PoolManager(
+            num_pools=4,
+            maxsize=concurrency,
+            headers=HEADERS,
+            timeout=urllib3.Timeout(total=timeout),
+            retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        )
+
+    def get(self, url):
+        """GET a page and return its body as text, raising on an error status"""
+        if url.startswith("/"):
+            url = self.base_url + url
+        tracer.count("http_requests")
+        response = self.http.request("GET", url)
+        if response.retries is not None and response.retries.history:
+            tracer.count("http_retries", len(response.retries.history))
+        if response.status != 200:
+            raise HTTPStatusError(f"GET {url} returned HTTP {response.status}", response.status)
+        return response.data.decode("utf-8", errors="replace")
+
+    @tracer.traced("http.search_page")
+    def search_page(self, keyword, start=0, params=None):
+        """Return the job cards of one results page, starting at result `start`"""
+        query = urlencode({"keywords": keyword, **(params or {}), "start": start})
+        return parse_job_cards(self.get(f"{SEARCH_PATH}?{query}"))
+
+    def search_cards(self, keyword, n, filters=None, start=0, exclude=()):
+        """
+        Page through the results until n distinct cards are found or results run out
+
+        Filters LinkedIn supports are sent with the search; cards failing the
+        rest (see search_filters.card_matches) are dropped here, before any
+        description is fetched. Each card gets its 1-based "search_rank".
+
+        A search whose first page can't be read (the request fails, or no job
+        card is parsed from it) raises, so the caller can scrape another way.
+        Running out of results, including a resumed search starting past the
+        last page, just ends the list - which may be empty when every card
+        was excluded or filtered out.
+
+        Args:
+            start (int): Result offset to start paging from (e.g. a checkpoint)
+            exclude (set): Job IDs to skip, e.g. already written by an earlier run
+        """
+        params, card_filters = search_params(**(filters or {}))
+        jobs = []
+        seen = set()
+        first_start = start
+        while len(jobs) < n:
+            try:
+                page = self.search_page(keyword, start, params)
+            except HTTPStatusError as e:
+                # Past the last page LinkedIn answers with an error status, but offset 0 is never past it
+                if not seen and not first_start:
+                    raise
+                print(f"Stopped paging at result {start}: {e}")
+                break
+            if not page and not seen and not first_start:
+                raise ValueError(f"No job cards found in the results for {keyword!r}")
+            for offset, job in enumerate(page, start=start + 1):
+                job["search_rank"] = offset
+            start += len(page)
+
+            new_cards = 0
+            for job in page:
+                key = job["job_id"] or job["url"]
+                if key and key in seen:
+                    continue
+                seen.add(key)
+                new_cards += 1
+                if job["job_id"] in exclude:
+                    continue
+                if not card_matches(job, card_filters):
+                    tracer.count("cards_filtered")
+                    continue
+                jobs.append(job)
+            if not new_cards:
+                break
+        return jobs[:n]
+
+    @tracer.traced("http.job_page")
+    def fetch_description_markup(self, job):
+        """
+        Fetch a job card's posting, by job ID or by its link
+
+        Returns:
+            tuple: (markup, text) - the description's HTML (None if missing)
+                and its cleaned text
+        """
+        try:
+            if job.get("job_id"):
+                html = self.get(JOB_POSTING_PATH.format(job_id=job["job_id"]))
+            elif job.get("url"):
+                html = self.get(job["url"])
+            else:
+                return None, NO_DESCRIPTION
+            markup, text = extract_description(html)
+            return markup, text or NO_DESCRIPTION
+        except Exception as e:
+            print(f"Error extracting job description: {e}")
+            return None, NO_DESCRIPTION
+
+    def fetch_description(self, job):
+        """Fetch the description for a job card, by job ID or by its link"""
+        return self.fetch_description_markup(job)[1]
+
+    def iter_search(self, keyword, n=5, store=None, filters=None, start=0, exclude=()):
+        """
+        Scrape up to n jobs, fetching their descriptions concurrently
+
+        Args:
+            keyword (str): Job keyword or title to search for
+            n (int): Number of jobs to scrape
+            store (JobStore): If given, unchanged postings already in it reuse
+                their stored description instead of being fetched
+            filters (dict): Search filters (location, experience_level, job_type)
+            start (int): Result offset to start from
+            exclude (set): Job IDs to skip
+
+        Yields:
+            dict: Each job, in search-result order, as soon as its description is in
+        """
+        jobs = self.search_cards(keyword, n, filters, start, exclude)
+        known = store.known_descriptions(jobs) if store is not None else {}
+        if known:
+            print(f"Reusing {len(known)} stored job descriptions")
+            tracer.count("descriptions_reused", len(known))
+
+        def description(job):
+            if job["job_id"] in known:
+                return None, known[job["job_id"]]
+            return self.fetch_description_markup(job)
+
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            for i, (markup, description) in enumerate(executor.map(propagate(description), jobs)):
+                job = jobs[i]
+                # Let the caller drop each job once it is handled, so long scrapes stay bounded
+                jobs[i] = None
+                job["description"] = description
+                if markup is not None:
+                    job["description_html"] = markup
+                yield job
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def search(self, keyword, n=5, store=None, filters=None):
+        """Scrape up to n jobs and return them as a list (see iter_search)"""
+        return list(self.iter_search(keyword, n, store, filters))
+
+    async def search_async(self, keyword, n=5, filters=None):
+        """asyncio variant of search() for callers already running an event loop"""
+        jobs = await asyncio.to_thread(self.search_cards, keyword, n, filters)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(job):
+            async with semaphore:
+                job["description"] = await asyncio.to_thread(self.fetch_description, job)
+
+        await asyncio.gather(*(fetch(job) for job in jobs))
+        return jobs
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """Return the process-wide LinkedInGuestClient, creating it on first use"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = LinkedInGuestClient()
+        return _default_client
+
+
+def iter_jobs_http(keyword, n=5, client=None, store=None, filters=None, start=0, exclude=()):
+    """Yield LinkedIn job listings over plain HTTP as each one is scraped"""
+    return (client or get_default_client()).iter_search(keyword, n, store, filters, start, exclude)
+
+
+def scrape_jobs_http(keyword, n=5, client=None, **filters):
+    """
+    Scrape LinkedIn job listings over plain HTTP
+
+    Args:
+        keyword (str): Job keyword or title to search for
+        n (int): Number of jobs to scrape (default: 5)
+        client (LinkedInGuestClient): Client to use (default: the shared client)
+        **filters: Search filters (location, experience_level, job_type)
+
+    Returns:
+        list: List of job listings with details
+    """
+    return (client or get_default_client()).search(keyword, n, filters=filters)
@@ -0,0 +1,217 @@
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from job_store import get_default_store, job_key
+from scraper import search_cache_key, stream_cached_job_search
+from tracing import tracer
+
+QUEUE_WORKERS = int(os.environ.get("SAGE_QUEUE_WORKERS", 2))
+
+# Finished tasks whose job dicts stay in memory; older ones are read back from the store
+MAX_RESULTS_IN_MEMORY = 50
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+TASK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrape_tasks (
+    task_id TEXT PRIMARY KEY,
+    keyword TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL,
+    result_ids TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_scrape_tasks_status ON scrape_tasks(status);
+"""
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class ScrapeQueue:
+    """
+    Background queue of scrape tasks, independent of any Streamlit session.
+
+    Tasks run on a fixed pool of worker threads, so concurrent searches wait
+    their turn instead of each starting browsers. Task state lives in the job
+    store's database, so the UI can poll it from any rerun or session.
+    An identical search that is already queued or running is joined rather
+    than scraped twice.
+    """
+    def __init__(self, store=None, max_workers=QUEUE_WORKERS):
+        self.store = store or get_default_store()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape-queue")
+        self._lock = threading.Lock()
+        self._cancel_events = {}
+        self._active = {}
+        self._results = OrderedDict()
+
+        self.store.executescript(TASK_SCHEMA)
+        # Tasks cut off by a restart will never finish
+        self.store.execute(
+            "UPDATE scrape_tasks SET status = ?, error = ?, finished_at = ? WHERE status IN (?, ?)",
+            (FAILED, "Interrupted by a restart", _now(), QUEUED, RUNNING)
+        )
+
+    def _update(self, task_id, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self.store.execute(
+            f"UPDATE scrape_tasks SET {assignments} WHERE task_id = ?",
+            list(fields.values()) + [task_id]
+        )
+
+    def submit(self, keyword, n=5, refresh=False, workers=None, **filters):
+        """
+        Queue a scrape
+
+        Args:
+            keyword (str): Job keyword or title to search for
+            n (int): Number of jobs to scrape
+            refresh (bool): Ignore cached results
+            workers (int): Browsers the task may scrape with in parallel
+            **filters: Search filters (location, experience_level, job_type)
+
+        Returns:
+            str: Task ID to pass to status(), result() and cancel()
+        """
+        key = search_cache_key(keyword, n, **filters)
+        with self._lock:
+            if not refresh and key in self._active:
+                return self._active[key]
+
+            task_id = uuid.uuid4().hex
+            self._active[key] = task_id
+            self._cancel_events[task_id] = threading.Event()
+            self._results[task_id] = []
+
+        params = {"n": n, "refresh": refresh, "workers": workers, "filters": filters}
+        self.store.execute(
+            "INSERT INTO scrape_tasks (task_id, keyword, params, status, total, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (task_id, keyword, json.dumps(params), QUEUED, n, _now())
+        )
+        self._executor.submit(self._run, task_id, key, keyword, n, refresh, workers, filters)
+        return task_id
+
+    def _run(self, task_id, key, keyword, n, refresh, workers, filters):
+        cancel_event = self._cancel_events[task_id]
+        jobs = self._results[task_id]
+        try:
+            if cancel_event.is_set():
+                return
+            self._update(task_id, status=RUNNING, started_at=_now())
+
+            with tracer.span("scrape.task", task_id=task_id, keyword=keyword, n=n):
+                stream = stream_cached_job_search(keyword, n, refresh=refresh, workers=workers, **filters)
+                try:
+                    for job in stream:
+                        jobs.append(job)
+                        self._update(task_id, progress=len(jobs))
+                        if cancel_event.is_set():
+                            break
+                finally:
+                    # Closing the generator releases its browser straight away
+                    stream.close()
+
+            self._update(
+                task_id,
+                status=CANCELLED if cancel_event.is_set() else DONE,
+                result_ids=json.dumps([job_key(job) for job in jobs]),
+                finished_at=_now()
+            )
+        except Exception as e:
+            print(f"Scrape task {task_id} failed: {e}")
+            self._update(task_id, status=FAILED, error=str(e), finished_at=_now())
+        finally:
+            with self._lock:
+                if self._active.get(key) == task_id:
+                    del self._active[key]
+                self._cancel_events.pop(task_id, None)
+                while len(self._results) > MAX_RESULTS_IN_MEMORY:
+                    oldest = next(iter(self._results))
+                    if oldest in self._cancel_events:
+                        break
+                    del self._results[oldest]
+
+    def status(self, task_id):
+        """
+        Return a task's state
+
+        Returns:
+            dict: keyword, params, status, progress, total, error and
+                timestamps, or None for an unknown task
+        """
+        rows = self.store.execute("SELECT * FROM scrape_tasks WHERE task_id = ?", (task_id,))
+        if not rows:
+            return None
+        task = rows[0]
+        task["params"] = json.loads(task["params"])
+        task["result_ids"] = json.loads(task["result_ids"]) if task["result_ids"] else None
+        return task
+
+    def result(self, task_id, start=0):
+        """
+        Return the jobs a task has scraped so far, in result order
+
+        Works for running tasks (partial results) and for tasks finished
+        before a restart (read back from the store). A poller passes `start`
+        (the number of jobs it already has) to get only the new ones.
+        """
+        with self._lock:
+            jobs = self._results.get(task_id)
+            if jobs is not None:
+                return [dict(job) for job in jobs[start:]]
+
+        task = self.status(task_id)
+        if not task or not task["result_ids"]:
+            return []
+        return self.store.get_jobs(task["result_ids"][start:])
+
+    def cancel(self, task_id):
+        """
+        Cancel a queued or running task
+
+        A running task stops after the job it is currently scraping.
+
+        Returns:
+            bool: False if the task had already finished
+        """
+        with self._lock:
+            event = self._cancel_events.get(task_id)
+            if event is None:
+                return False
+            event.set()
+        task = self.status(task_id)
+        if task and task["status"] == QUEUED:
+            self._update(task_id, status=CANCELLED, finished_at=_now())
+        return True
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            for event in self._cancel_events.values():
+                event.set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+
+def get_default_queue():
+    """Return the process-wide ScrapeQueue, creating it on first use"""
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = ScrapeQueue()
+        return _default_queue
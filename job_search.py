@@ -0,0 +1,171 @@
+import os
+import threading
+
+import numpy as np
+import scipy.sparse
+
+from dedupe import dedupe_jobs
+from hashed_index import HashedIndex, index_store
+from job_store import get_default_store
+from resume_matcher import SKILL_EXTRACTOR, as_resume_profile
+from tracing import tracer
+
+# Jobs retrieved per job returned, to be re-ranked by skill coverage
+RERANK_FACTOR = int(os.environ.get("SAGE_RERANK_FACTOR", 3))
+
+# How much full skill coverage can raise a job's rank over its similarity alone
+SKILL_BOOST = 1.0
+
+
+class JobSearchIndex:
+    """
+    In-memory inverted index over a HashedIndex for top-k resume search.
+
+    The job term counts are held column-major, so each hashed term's column is
+    its posting list: a search only touches the postings of the resume's terms
+    and scales them by precomputed per-job TF-IDF norms, then takes the top k
+    with a partial sort. New chunks of the underlying index are picked up on
+    the next search; when existing chunks change (re-indexed jobs or merged
+    chunks) everything is loaded again.
+    """
+    def __init__(self, index=None):
+        self.index = index if index is not None else HashedIndex()
+        self._lock = threading.Lock()
+        self._postings = None
+        self._job_ids = []
+        self._n_chunks = 0
+        self._generation = None
+        self._idf = None
+        self._norms = None
+
+    def __len__(self):
+        return len(self._job_ids)
+
+    def refresh(self):
+        """Load chunks added to the index since the last refresh and reweight"""
+        with self._lock:
+            generation = self.index.generation
+            if generation == self._generation and len(self.index.chunks) == self._n_chunks:
+                return
+            # Re-indexed jobs or merged chunks change rows already loaded, so everything is read again
+            n_loaded = self._n_chunks if generation == self._generation else 0
+            with tracer.span("search.refresh", chunks=len(self.index.chunks) - n_loaded, reload=not n_loaded):
+                blocks = [self._postings] if n_loaded else []
+                job_ids = list(self._job_ids) if n_loaded else []
+                n_chunks = n_loaded
+                for chunk_ids, counts in self.index.iter_chunks(n_loaded):
+                    blocks.append(counts)
+                    job_ids.extend(chunk_ids)
+                    n_chunks += 1
+                if not blocks:
+                    blocks = [scipy.sparse.csr_matrix((0, self.index.n_features), dtype=np.float32)]
+                postings = scipy.sparse.vstack(blocks, format="csc", dtype=np.float32)
+
+                # IDF and norms change with every new document, so both are recomputed
+                idf = self.index.frequencies.idf()
+                norms = np.sqrt(postings.power(2) @ idf ** 2)
+                norms[norms == 0] = 1
+                self._postings, self._job_ids, self._idf, self._norms = postings, job_ids, idf, norms
+                self._n_chunks, self._generation = n_chunks, generation
+
+    def search(self, resume, top_k=20):
+        """
+        Find the indexed jobs most similar to a resume
+
+        Scores are cosine similarities of TF-IDF vectors weighted with the
+        index's IDF (the resume itself is not counted as a document).
+
+        Args:
+            resume (str or ResumeProfile): Resume text or its precomputed profile
+            top_k (int): Number of jobs to return
+
+        Returns:
+            list: (job_key, similarity_score) pairs, best first
+        """
+        self.refresh()
+        profile = as_resume_profile(resume)
+        if not profile or not len(self):
+            return []
+
+        with tracer.span("search.top_k", jobs=len(self), top_k=top_k):
+            postings, idf, norms = self._postings, self._idf, self._norms
+            resume_counts = self.index.hasher.transform([profile.text]).tocsr()
+            terms = resume_counts.indices
+            weights = resume_counts.data * idf[terms]
+            if not weights.any():
+                return []
+            weights /= np.linalg.norm(weights)
+
+            scores = (postings[:, terms] @ (weights * idf[terms])) / norms
+            top_k = min(top_k, len(scores))
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+            best = best[np.argsort(-scores[best], kind="stable")]
+            tracer.count("jobs_scored", len(scores))
+        return [(self._job_ids[i], float(scores[i])) for i in best if scores[i] > 0]
+
+
+def skill_coverage(job):
+    """Fraction of a matched job's skills that the resume has (0 if it names none)"""
+    total = len(job["matched_skills"]) + len(job["missing_skills"])
+    return len(job["matched_skills"]) / total if total else 0.0
+
+
+@tracer.traced("search.history")
+def search_job_history(resume, store=None, search_index=None, top_k=20, group_duplicates=True):
+    """
+    Search every stored job for the best matches to a resume, with no scraping
+
+    Stored jobs not yet indexed (or changed since) are indexed first. The
+    index retrieves RERANK_FACTOR * top_k candidates by their similarity,
+    which is IDF-weighted over the whole store and kept as similarity_score.
+    The candidates are then re-ranked by that similarity boosted by the share
+    of each job's skills the resume covers. With `group_duplicates`,
+    near-duplicate candidates are grouped (see dedupe_jobs) first.
+
+    Args:
+        resume (str or ResumeProfile): Resume text or its precomputed profile
+        store (JobStore): Store to search (default: the local job database)
+        search_index (JobSearchIndex): Index over that store's jobs
+        top_k (int): Number of jobs to return
+        group_duplicates (bool): Keep one job per group of near-duplicates
+
+    Returns:
+        list: Stored job dicts, best first, with similarity_score,
+            matched_skills and missing_skills added
+    """
+    profile = as_resume_profile(resume)
+    if not profile:
+        return []
+    store = store or get_default_store()
+    if search_index is None:
+        search_index = get_default_search_index()
+
+    index_store(store, search_index.index)
+    hits = search_index.search(profile, top_k * RERANK_FACTOR)
+    scores = dict(hits)
+
+    with tracer.span("search.rerank", candidates=len(hits)):
+        # get_jobs keeps the hits' order, best first, so dedupe_jobs keeps the best of each group
+        jobs = store.get_jobs(scores)
+        if group_duplicates:
+            jobs = dedupe_jobs(jobs)
+        for job in jobs:
+            job_skills = SKILL_EXTRACTOR.extract(job.get("description") or "")
+            job["similarity_score"] = scores[job["job_id"]]
+            job["matched_skills"] = list(job_skills & profile.skills)
+            job["missing_skills"] = list(job_skills - profile.skills)
+        jobs.sort(key=lambda job: job["similarity_score"] * (1 + SKILL_BOOST * skill_coverage(job)), reverse=True)
+    return jobs[:top_k]
+
+
+_default_search_index = None
+_default_search_index_lock = threading.Lock()
+
+
+def get_default_search_index():
+    """Return the process-wide JobSearchIndex over the local index, creating it on first use"""
+    global _default_search_index
+    with _default_search_index_lock:
+        if _default_search_index is None:
+            _default_search_index = JobSearchIndex()
+        return _default_search_index
@@ -0,0 +1,360 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+from description_cleaner import NO_DESCRIPTION
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sage_jobs.db")
+
+# date_posted of cards that show no posting date; such jobs sort after dated ones
+UNKNOWN_POSTED_DATE = "Recently posted"
+
+JOB_FIELDS = ["job_id", "title", "company", "location", "date_posted", "description", "url", "description_html"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    title TEXT,
+    company TEXT COLLATE NOCASE,
+    location TEXT COLLATE NOCASE,
+    date_posted TEXT,
+    description TEXT,
+    url TEXT,
+    description_html TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS job_keywords (
+    keyword TEXT NOT NULL,
+    job_id TEXT NOT NULL REFERENCES jobs(job_id) ON DELETE CASCADE,
+    PRIMARY KEY (keyword, job_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company);
+CREATE INDEX IF NOT EXISTS idx_jobs_location ON jobs(location);
+CREATE INDEX IF NOT EXISTS idx_jobs_date_posted ON jobs(date_posted);
+CREATE INDEX IF NOT EXISTS idx_job_keywords_job_id ON job_keywords(job_id);
+"""
+
+# Columns added after the first release, with their types, for databases created before them
+MIGRATIONS = {"jobs": [("description_html", "TEXT"), ("updated_at", "TEXT")]}
+
+# Run after MIGRATIONS, since they use the migrated columns
+POST_MIGRATION_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs(updated_at, job_id);
+"""
+
+
+def normalize_keyword(keyword):
+    """Lower-case a search keyword and collapse its whitespace"""
+    return " ".join((keyword or "").lower().split())
+
+
+def parse_job_id(value):
+    """
+    Pull the numeric LinkedIn job ID out of a job URN or job view URL
+
+    Args:
+        value (str): e.g. "urn:li:jobPosting:3912345678" or
+            "https://www.linkedin.com/jobs/view/web-developer-at-acme-3912345678?..."
+
+    Returns:
+        str: The job ID, or None if it cannot be found
+    """
+    if not value:
+        return None
+    match = re.search(r"jobPosting:(\d+)", value) or re.search(r"(?:-|/|currentJobId=)(\d{6,})(?:[/?&]|$)", value)
+    return match.group(1) if match else None
+
+
+def job_key(job):
+    """
+    Return the storage key for a job record
+
+    Args:
+        job (dict): Job listing information
+
+    Returns:
+        str: The LinkedIn job ID, or a content hash for records scraped
+            before job IDs were captured
+    """
+    if job.get("job_id"):
+        return str(job["job_id"])
+    content = "\x1f".join(job.get(field) or "" for field in ("title", "company", "location", "description"))
+    return "sha1:" + hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class JobStore:
+    """
+    SQLite-backed store of scraped job postings keyed by LinkedIn job ID.
+
+    Re-scraping a posting updates it in place, so results accumulate across
+    runs. The connection is shared between threads behind a lock, which is what
+    Streamlit's script threads need.
+    """
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+            self._migrate()
+
+    def _migrate(self):
+        for table, columns in MIGRATIONS.items():
+            existing = {row["name"] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            for name, column_type in columns:
+                if name not in existing:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+        self._conn.executescript(POST_MIGRATION_SCHEMA)
+        # Jobs stored before updated_at existed changed last when they were last seen, at the latest
+        with self._conn:
+            self._conn.execute("UPDATE jobs SET updated_at = last_seen WHERE updated_at IS NULL")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def upsert_jobs(self, jobs, keyword=None):
+        """
+        Insert new jobs and update the ones already stored
+
+        A job's updated_at is set when it is inserted and whenever its
+        description changes, so indexes can pick up just the changed jobs.
+
+        Args:
+            jobs (list): Job listing dicts as returned by the scraper
+            keyword (str): Search keyword the jobs were found with
+
+        Returns:
+            int: Number of jobs written
+        """
+        now = datetime.now().isoformat(timespec="seconds")
+        keyword = normalize_keyword(keyword)
+        rows = []
+        for job in jobs:
+            row = {field: job.get(field) for field in JOB_FIELDS}
+            row["job_id"] = job_key(job)
+            row["now"] = now
+            row["no_description"] = NO_DESCRIPTION
+            rows.append(row)
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO jobs (job_id, title, company, location, date_posted, description, url, description_html,
+                                  first_seen, last_seen, updated_at)
+                VALUES (:job_id, :title, :company, :location, :date_posted, :description, :url, :description_html,
+                        :now, :now, :now)
+                ON CONFLICT(job_id) DO UPDATE SET
+                    title = excluded.title,
+                    company = excluded.company,
+                    location = excluded.location,
+                    date_posted = excluded.date_posted,
+                    -- A missing description or the placeholder never replaces a stored one
+                    description = CASE
+                        WHEN excluded.description IS NULL
+                            OR (excluded.description = :no_description AND jobs.description IS NOT NULL)
+                        THEN jobs.description
+                        ELSE excluded.description
+                    END,
+                    url = COALESCE(excluded.url, jobs.url),
+                    description_html = COALESCE(excluded.description_html, jobs.description_html),
+                    last_seen = excluded.last_seen,
+                    updated_at = CASE
+                        WHEN excluded.description IS NULL
+                            OR excluded.description IS jobs.description
+                            OR (excluded.description = :no_description AND jobs.description IS NOT NULL)
+                        THEN jobs.updated_at
+                        ELSE excluded.updated_at
+                    END
+                """,
+                rows
+            )
+            if keyword:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO job_keywords (keyword, job_id) VALUES (?, ?)",
+                    [(keyword, row["job_id"]) for row in rows]
+                )
+        return len(rows)
+
+    def get_job(self, job_id):
+        """Return a stored job by ID, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (str(job_id),)).fetchone()
+        return dict(row) if row else None
+
+    def get_jobs(self, job_ids):
+        """Return the stored jobs with the given IDs, in the order given (missing IDs are skipped)"""
+        job_ids = [str(job_id) for job_id in job_ids]
+        rows = {}
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(job_ids), 500):
+            batch = job_ids[i:i + 500]
+            placeholders = ", ".join("?" * len(batch))
+            with self._lock:
+                for row in self._conn.execute(f"SELECT * FROM jobs WHERE job_id IN ({placeholders})", batch):
+                    rows[row["job_id"]] = dict(row)
+        return [rows[job_id] for job_id in job_ids if job_id in rows]
+
+    def iter_updated(self, since=None, batch_size=1000):
+        """
+        Yield the jobs inserted or given a new description at or after a time
+
+        Args:
+            since (str): updated_at to start from (default: every job)
+            batch_size (int): Jobs read at a time
+
+        Yields:
+            list: Batches of job dicts, in updated_at then job_id order
+        """
+        last = (since or "", "")
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT * FROM jobs WHERE (updated_at, job_id) > (?, ?) ORDER BY updated_at, job_id LIMIT ?",
+                    (*last, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            yield [dict(row) for row in rows]
+            last = (rows[-1]["updated_at"], rows[-1]["job_id"])
+
+    def known_descriptions(self, jobs):
+        """
+        Look up stored descriptions for jobs that have not changed
+
+        A job counts as unchanged when a stored posting with the same job ID
+        has the same title, company, location and date_posted, and a real
+        description.
+
+        Args:
+            jobs (list): Job dicts with at least a job_id (e.g. card metadata)
+
+        Returns:
+            dict: job_id -> stored description
+        """
+        jobs = [job for job in jobs if job and job.get("job_id")]
+        stored = {row["job_id"]: row for row in self.get_jobs(job["job_id"] for job in jobs)}
+
+        known = {}
+        for job in jobs:
+            row = stored.get(str(job["job_id"]))
+            if not row or not row["description"] or row["description"] == NO_DESCRIPTION:
+                continue
+            if all(row[field] == job.get(field) for field in ("title", "company", "location", "date_posted")):
+                known[str(job["job_id"])] = row["description"]
+        return known
+
+    def query(self, keyword=None, company=None, location=None, posted_since=None, limit=None, offset=0):
+        """
+        Query stored jobs, newest first (jobs without a posting date last)
+
+        Args:
+            keyword (str): Only jobs found with this search keyword
+            company (str): Exact company name (case-insensitive)
+            location (str): Location prefix, e.g. "New York"
+            posted_since (str): ISO date; only jobs known to be posted on or after it
+            limit (int): Maximum number of jobs to return
+            offset (int): Number of jobs to skip
+
+        Returns:
+            list: Job listing dicts
+        """
+        sql = "SELECT jobs.* FROM jobs"
+        clauses = []
+        params = []
+        if keyword:
+            sql += " JOIN job_keywords ON job_keywords.job_id = jobs.job_id"
+            clauses.append("job_keywords.keyword = ?")
+            params.append(normalize_keyword(keyword))
+        if company:
+            clauses.append("jobs.company = ?")
+            params.append(company)
+        if location:
+            clauses.append("jobs.location LIKE ? ESCAPE '\\'")
+            escaped = location.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(escaped + "%")
+        if posted_since:
+            clauses.append("jobs.date_posted >= ? AND jobs.date_posted != ?")
+            params.extend([posted_since, UNKNOWN_POSTED_DATE])
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        # Undated jobs go last; the placeholder would otherwise sort above every ISO date
+        sql += (" ORDER BY (jobs.date_posted IS NULL OR jobs.date_posted = ?), jobs.date_posted DESC,"
+                " jobs.last_seen DESC")
+        params.append(UNKNOWN_POSTED_DATE)
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([int(limit), int(offset)])
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def execute(self, sql, params=()):
+        """
+        Run a statement on the store's connection and commit it
+
+        Lets other components (e.g. the scrape queue) keep their own tables in
+        the same database.
+
+        Returns:
+            list: Result rows as dicts
+        """
+        with self._lock, self._conn:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def executemany(self, sql, rows):
+        """Run a statement once per parameter row in a single transaction"""
+        with self._lock, self._conn:
+            self._conn.executemany(sql, rows)
+
+    def executescript(self, sql):
+        with self._lock, self._conn:
+            self._conn.executescript(sql)
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def import_json(self, path, keyword=None):
+        """
+        Load a JSON file of job listings (e.g. linkedin_jobs.json) into the store
+
+        Args:
+            path (str): Path to the JSON file
+            keyword (str): Search keyword to associate the jobs with
+
+        Returns:
+            int: Number of jobs written
+        """
+        with open(path, encoding="utf-8") as f:
+            return self.upsert_jobs(json.load(f), keyword)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_store():
+    """Return the process-wide JobStore at DEFAULT_DB_PATH, opening it on first use"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = JobStore()
+        return _default_store
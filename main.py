@@ -1,6 +1,95 @@
-import streamlit.web.cli as stcli
+import argparse
+import os
 import sys
 
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def run_ui(port=8501):
+    import streamlit.web.cli as stcli
+    sys.argv = ["streamlit", "run", APP_PATH, f"--server.port={port}"]
+    return stcli.main()
+
+
+def run_batch_command(args):
+    from batch import run_batch
+    summary = run_batch(
+        args.resumes,
+        args.output,
+        jobs_path=args.jobs,
+        store_path=args.store,
+        keyword=args.keyword,
+        fmt=args.format,
+        workers=args.workers,
+        top_k=args.top
+    )
+    print(
+        f"Wrote {summary['rows']} rows for {summary['resumes'] - summary['failed']} resumes "
+        f"x {summary['jobs']} jobs to {args.output}"
+        + (f" ({summary['failed']} resumes skipped)" if summary["failed"] else "")
+    )
+    return 0
+
+
+def run_scrape_command(args):
+    from scrape_checkpoint import scrape_to_ndjson
+    try:
+        summary = scrape_to_ndjson(
+            args.keyword,
+            args.n,
+            args.output,
+            resume=args.resume,
+            workers=args.workers,
+            backend=args.backend,
+            location=args.location,
+            experience_level=args.experience_level,
+            job_type=args.job_type
+        )
+    except FileExistsError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"Wrote {summary['new']} jobs to {args.output} ({summary['jobs']} in total)")
+    return 0
+
+
+def main(argv=None):
+    from batch import BATCH_WORKERS, OUTPUT_FORMATS
+
+    parser = argparse.ArgumentParser(description="SAGE: Skill Analysis and Gap Evaluation")
+    commands = parser.add_subparsers(dest="command")
+
+    ui = commands.add_parser("ui", help="Start the Streamlit app (the default)")
+    ui.add_argument("--port", type=int, default=8501)
+
+    batch = commands.add_parser("batch", help="Score a directory of resumes against many jobs")
+    batch.add_argument("resumes", help="Directory of resumes (PDF, DOCX or TXT), searched recursively")
+    batch.add_argument("output", help="Results file (.csv, .jsonl or .parquet)")
+    source = batch.add_mutually_exclusive_group()
+    source.add_argument("--jobs", help="JSON file of job listings, e.g. linkedin_jobs.json")
+    source.add_argument("--store", help="Job database to read (default: the local job database)")
+    batch.add_argument("--keyword", help="Only stored jobs found with this search keyword")
+    batch.add_argument("--format", choices=OUTPUT_FORMATS, help="Output format (default: from the file extension)")
+    batch.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Worker processes")
+    batch.add_argument("--top", type=int, default=20, help="Best jobs kept per resume (0 = all)")
+
+    scrape = commands.add_parser("scrape", help="Scrape jobs to an NDJSON file, resumable after a crash")
+    scrape.add_argument("keyword", help="Job keyword or title to search for")
+    scrape.add_argument("output", help="NDJSON file to append jobs to")
+    scrape.add_argument("-n", type=int, default=100, help="Number of jobs wanted in the file")
+    scrape.add_argument("--resume", action="store_true", help="Carry on from the file's checkpoint")
+    scrape.add_argument("--location", help="Place name, or Remote")
+    scrape.add_argument("--experience-level", action="append", help="e.g. \"Entry level\" (repeatable)")
+    scrape.add_argument("--job-type", action="append", help="e.g. Full-time (repeatable)")
+    scrape.add_argument("--workers", type=int, help="Parallel scraping workers")
+    scrape.add_argument("--backend", choices=["http", "selenium"], help="Scraping backend")
+
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        return run_batch_command(args)
+    if args.command == "scrape":
+        return run_scrape_command(args)
+    return run_ui(getattr(args, "port", 8501))
+
+
 if __name__ == "__main__":
-    sys.argv = ["streamlit", "run", "frontend/app.py", "--server.port=8501"]
-    sys.exit(stcli.main())
\ No newline at end of file
+    sys.exit(main())
@@ -1,6 +1,16 @@
+import hashlib
+import math
+import os
 import re
-from sklearn.feature_extraction.text import TfidfVectorizer
+from collections import Counter
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+
+from cache import TTLCache
+from tracing import tracer
 
 
 SKILL_SET = [
@@ -51,24 +61,163 @@ SKILL_SET = [
     "International Relations", "Journalism", "Technical Writing", "Translation"
 ]
 
+def _trie_pattern(trie):
+    """Render a character trie as a regex so shared prefixes are matched once"""
+    if "" in trie and len(trie) == 1:
+        return ""
+
+    alternatives = []
+    optional = False
+    for char in sorted(trie):
+        if char == "":
+            optional = True
+            continue
+        token = r"\s+" if char == " " else re.escape(char)
+        alternatives.append(token + _trie_pattern(trie[char]))
+
+    if len(alternatives) == 1 and not optional:
+        return alternatives[0]
+    pattern = "(?:" + "|".join(alternatives) + ")"
+    return pattern + "?" if optional else pattern
+
+
+class SkillExtractor:
+    """
+    Find every skill from a taxonomy in a single pass over the text.
+
+    The skills are compiled once into a trie-shaped regex, so the cost of a scan
+    grows with the length of the text rather than with the number of skills.
+    Matches must sit on word boundaries (so "Go" does not match inside "Google")
+    and whitespace inside multi-word skills is matched flexibly. Where one
+    skill is a whole-word prefix of another ("Data" and "Data Science"), only
+    the longer one is reported at that position.
+    """
+    def __init__(self, skills):
+        self.skills = {" ".join(skill.lower().split()): skill for skill in skills}
+
+        trie = {}
+        for key in self.skills:
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        # The lookahead lets overlapping skills ("HIPAA Compliance" and
+        # "Compliance") both be reported from the same scan.
+        self.pattern = re.compile(
+            r"(?<!\w)(?=(" + _trie_pattern(trie) + r")(?!\w))",
+            re.IGNORECASE
+        )
+
+    def find(self, text):
+        """
+        Locate every skill mention in the text
+
+        Args:
+            text (str): Text to scan
+
+        Returns:
+            list: (skill, start, end) tuples in order of appearance, where
+                skill is the lower-cased taxonomy entry
+        """
+        matches = []
+        for match in self.pattern.finditer(text):
+            key = " ".join(match.group(1).lower().split())
+            matches.append((key, match.start(1), match.end(1)))
+        return matches
+
+    def extract(self, text):
+        """Return the set of lower-cased skills mentioned in the text"""
+        return {" ".join(match.lower().split()) for match in self.pattern.findall(text)}
+
+
+SKILL_EXTRACTOR = SkillExtractor(SKILL_SET)
+
+# Same tokenization as the matchers' vectorizers
+ANALYZER = CountVectorizer(stop_words="english").build_analyzer()
+
+PROFILE_CACHE_SIZE = int(os.environ.get("SAGE_PROFILE_CACHE_SIZE", 32))
+_profile_cache = TTLCache(maxsize=PROFILE_CACHE_SIZE, ttl=None)
+
+
+class ResumeProfile:
+    """
+    Everything matching needs from one resume, computed once.
+
+    Holds the whitespace-normalised text, its token counts and its skill set,
+    keyed by a hash of the text. Matchers read these instead of re-analysing
+    the resume for every job; get_resume_profile() caches profiles so the
+    same resume is analysed once across searches and sessions.
+    """
+    def __init__(self, text):
+        self.text = " ".join(text.split())
+        self.digest = hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+        self.term_counts = Counter(ANALYZER(self.text))
+        self.skills = frozenset(SKILL_EXTRACTOR.extract(self.text))
+
+    def __bool__(self):
+        return bool(self.text)
+
+    def vector(self, vocabulary, idf=None):
+        """
+        Return the resume as an L2-normalised sparse row over a vectorizer's vocabulary
+
+        Args:
+            vocabulary (dict): Term -> column index, e.g. vectorizer.vocabulary_
+            idf (numpy.ndarray): Optional IDF weight per column
+
+        Returns:
+            scipy.sparse.csr_matrix: Matrix of shape (1, len(vocabulary))
+        """
+        cols, counts = [], []
+        for term, count in self.term_counts.items():
+            col = vocabulary.get(term)
+            if col is not None:
+                cols.append(col)
+                counts.append(count * (idf[col] if idf is not None else 1.0))
+        row = csr_matrix((counts, ([0] * len(cols), cols)), shape=(1, len(vocabulary)), dtype=np.float64)
+        return normalize(row)
+
+
+def get_resume_profile(resume_text):
+    """Return the ResumeProfile for a resume text, analysing it only on a cache miss"""
+    normalized = " ".join(resume_text.split())
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    profile = _profile_cache.get(digest)
+    if profile is None:
+        with tracer.span("match.resume_profile", chars=len(normalized)):
+            profile = ResumeProfile(normalized)
+        _profile_cache.set(digest, profile)
+    else:
+        tracer.count("profile_cache_hits")
+    return profile
+
+
+def as_resume_profile(resume):
+    """Accept either a ResumeProfile or raw resume text"""
+    return resume if isinstance(resume, ResumeProfile) else get_resume_profile(resume)
+
+
 class ResumeMatcher:
     def __init__(self, job_description):
         self.job_description = job_description
         self.vectorizer = TfidfVectorizer(stop_words="english")
         self.job_tfidf = self.vectorizer.fit_transform([job_description])
+        self.job_skills = self.extract_skills(job_description)
     
     def match_resume(self, resume_text):
-        if not resume_text.strip():
+        # resume_text may also be a precomputed ResumeProfile
+        profile = as_resume_profile(resume_text)
+        if not profile:
             return {"similarity_score": 0.0, "missing_skills": [], "matched_skills": []}
         
-        resume_tfidf = self.vectorizer.transform([resume_text])
+        resume_tfidf = profile.vector(self.vectorizer.vocabulary_, self.vectorizer.idf_)
         similarity = cosine_similarity(self.job_tfidf, resume_tfidf)[0][0]
         
-        job_skills = self.extract_skills(self.job_description)
-        resume_skills = self.extract_skills(resume_text)
+        resume_skills = profile.skills
         
-        missing_skills = job_skills - resume_skills
-        matched_skills = job_skills.intersection(resume_skills)
+        missing_skills = self.job_skills - resume_skills
+        matched_skills = self.job_skills.intersection(resume_skills)
         
         return {
             "similarity_score": similarity,
@@ -78,5 +227,201 @@ class ResumeMatcher:
     
     @staticmethod
     def extract_skills(text):
-        text = text.lower()
-        return {skill.lower() for skill in SKILL_SET if skill.lower() in text}
\ No newline at end of file
+        return SKILL_EXTRACTOR.extract(text)
+
+
+class BatchResumeMatcher:
+    """
+    Match a resume against a whole corpus of job descriptions in one pass.
+
+    IDF weights are shared across every job description plus the resume(s),
+    so scores are comparable across jobs, exactly as if one TF-IDF vectorizer
+    had been fitted on all of them. The job term counts are computed once per
+    matcher and the resume side comes from its cached ResumeProfile, so
+    scoring another resume only costs its own IDF weighting and one sparse
+    matrix product.
+    """
+    def __init__(self, job_descriptions):
+        self.job_descriptions = list(job_descriptions)
+        self.vectorizer = CountVectorizer(stop_words="english")
+        self._job_counts = None
+        self._job_skills = None
+
+    @property
+    def job_counts(self):
+        """Sparse job x term count matrix over the jobs' own vocabulary"""
+        if self._job_counts is None:
+            try:
+                self._job_counts = self.vectorizer.fit_transform(self.job_descriptions).tocsr()
+                self.vocabulary = self.vectorizer.vocabulary_
+            except ValueError:
+                # Empty vocabulary (e.g. only stop words): nothing can match
+                self._job_counts = csr_matrix((len(self.job_descriptions), 0))
+                self.vocabulary = {}
+        return self._job_counts
+
+    def similarity_matrix(self, resumes):
+        """
+        Compute cosine similarity between every job and every resume
+
+        Args:
+            resumes (list): Resume texts or ResumeProfiles to score
+
+        Returns:
+            numpy.ndarray: Matrix of shape (n_jobs, n_resumes)
+        """
+        n_jobs = len(self.job_descriptions)
+        profiles = [as_resume_profile(resume) for resume in resumes]
+        if not n_jobs or not profiles:
+            return np.zeros((n_jobs, len(profiles)))
+
+        job_counts = self.job_counts
+        n_terms = len(self.vocabulary)
+        if not n_terms:
+            return np.zeros((n_jobs, len(profiles)))
+
+        # Resume terms the jobs never use still count towards the resume's norm
+        extra_terms = {}
+        rows, cols, counts = [], [], []
+        for row, profile in enumerate(profiles):
+            for term, count in profile.term_counts.items():
+                col = self.vocabulary.get(term)
+                if col is None:
+                    col = extra_terms.setdefault(term, n_terms + len(extra_terms))
+                rows.append(row)
+                cols.append(col)
+                counts.append(count)
+        width = n_terms + len(extra_terms)
+        resume_counts = csr_matrix((counts, (rows, cols)), shape=(len(profiles), width), dtype=np.float64)
+
+        # Smoothed IDF over jobs + resumes, as TfidfVectorizer computes it
+        doc_freq = np.bincount(resume_counts.indices, minlength=width).astype(np.float64)
+        doc_freq[:n_terms] += np.bincount(job_counts.indices, minlength=n_terms)
+        idf = np.log((1 + n_jobs + len(profiles)) / (1 + doc_freq)) + 1
+
+        job_tfidf = normalize(job_counts.multiply(idf[:n_terms]).tocsr())
+        resume_tfidf = normalize(resume_counts.multiply(idf).tocsr())
+        # Blank resumes have no terms, so they score zero like in ResumeMatcher.match_resume
+        return (job_tfidf @ resume_tfidf[:, :n_terms].T).toarray()
+
+    @property
+    def job_skills(self):
+        if self._job_skills is None:
+            self._job_skills = [ResumeMatcher.extract_skills(d) for d in self.job_descriptions]
+        return self._job_skills
+
+    def match_resume(self, resume_text):
+        """
+        Score a resume against every job description
+
+        Args:
+            resume_text (str or ResumeProfile): Resume text or its precomputed profile
+
+        Returns:
+            list: One result dict per job, in job order, with the same keys as
+                ResumeMatcher.match_resume
+        """
+        profile = as_resume_profile(resume_text)
+        if not profile:
+            return [{"similarity_score": 0.0, "missing_skills": [], "matched_skills": []}
+                    for _ in self.job_descriptions]
+
+        with tracer.span("match.batch", jobs=len(self.job_descriptions)):
+            with tracer.span("match.similarity"):
+                scores = self.similarity_matrix([profile])[:, 0]
+            resume_skills = profile.skills
+
+            results = []
+            with tracer.span("match.skills"):
+                for score, job_skills in zip(scores, self.job_skills):
+                    results.append({
+                        "similarity_score": float(score),
+                        "missing_skills": list(job_skills - resume_skills),
+                        "matched_skills": list(job_skills & resume_skills)
+                    })
+        tracer.count("jobs_matched", len(results))
+        return results
+
+
+class IncrementalMatcher:
+    """
+    Score jobs against one resume as they arrive, with IDF shared across them.
+
+    Document frequencies are running counts over the resume and every job
+    matched so far, so each job is scored with the smoothed IDF that
+    BatchResumeMatcher would compute over the jobs seen up to it. The jobs
+    of the latest call get exactly the batch scores; earlier ones only drift
+    as the IDF settles. Each job is analysed once.
+    """
+    def __init__(self, resume_text):
+        self.profile = as_resume_profile(resume_text)
+        self.doc_freq = Counter(self.profile.term_counts.keys())
+        self.n_docs = 1
+
+    def match_jobs(self, jobs):
+        """
+        Add jobs to the document frequencies and score them
+
+        Args:
+            jobs (iterable): Job listing dicts with a "description"
+
+        Returns:
+            list: One result dict per job, with the same keys as
+                ResumeMatcher.match_resume
+        """
+        descriptions = [job.get("description") or "" for job in jobs]
+        if not self.profile:
+            return [{"similarity_score": 0.0, "missing_skills": [], "matched_skills": []} for _ in descriptions]
+
+        job_counts = [Counter(ANALYZER(description)) for description in descriptions]
+        for counts in job_counts:
+            self.doc_freq.update(counts.keys())
+        self.n_docs += len(job_counts)
+
+        def weights(term_counts):
+            return {
+                term: count * (math.log((1 + self.n_docs) / (1 + self.doc_freq[term])) + 1)
+                for term, count in term_counts.items()
+            }
+
+        resume_weights = weights(self.profile.term_counts)
+        resume_norm = math.sqrt(sum(weight * weight for weight in resume_weights.values()))
+        resume_skills = self.profile.skills
+
+        results = []
+        for description, counts in zip(descriptions, job_counts):
+            job_weights = weights(counts)
+            norm = math.sqrt(sum(weight * weight for weight in job_weights.values())) * resume_norm
+            dot = sum(weight * resume_weights[term] for term, weight in job_weights.items() if term in resume_weights)
+            job_skills = SKILL_EXTRACTOR.extract(description)
+            results.append({
+                "similarity_score": dot / norm if norm else 0.0,
+                "missing_skills": list(job_skills - resume_skills),
+                "matched_skills": list(job_skills & resume_skills)
+            })
+        return results
+
+
+def iter_match_results(jobs, resume_text, matcher=None):
+    """
+    Score jobs one at a time as they arrive, e.g. straight from the scraper
+
+    Each job is scored with IDF over every job seen so far (see
+    IncrementalMatcher), so scores are comparable as they stream in; re-rank
+    the finished set with BatchResumeMatcher for the final scores.
+
+    Args:
+        jobs (iterable): Job listing dicts with a "description"
+        resume_text (str or ResumeProfile): Resume text or its precomputed profile
+        matcher (IncrementalMatcher): Matcher to carry on with, e.g. across
+            polls of the same scrape (default: a new one)
+
+    Yields:
+        tuple: (job, match_result) with the same keys as ResumeMatcher.match_resume
+    """
+    if matcher is None:
+        matcher = IncrementalMatcher(resume_text)
+    for job in jobs:
+        with tracer.span("match.provisional"):
+            match_result = matcher.match_jobs([job])[0]
+        yield job, match_result
@@ -0,0 +1,181 @@
+import json
+import os
+
+from job_store import job_key
+from scraper import RESULTS_PAGE_SIZE, search_cache_key, stream_job_listings
+from tracing import tracer
+
+# Fields written for each job; the markup is left in the job store
+NDJSON_FIELDS = ["job_id", "title", "company", "location", "date_posted", "url", "description", "search_rank"]
+
+
+class ScrapeCheckpoint:
+    """
+    Append-only NDJSON output of a scrape, with a checkpoint file beside it.
+
+    Every job is written as one line and flushed to disk as soon as it is
+    scraped; the checkpoint (`<path>.checkpoint`) then records the search,
+    how many jobs are written and the results page and card of the last one.
+    A run cut off partway leaves both consistent up to its last job, so it
+    can be resumed (see scrape_to_ndjson).
+    """
+    def __init__(self, path):
+        self.path = path
+        self.checkpoint_path = path + ".checkpoint"
+        self.state = None
+        self._file = None
+
+    def load(self):
+        """Read the checkpoint, or return None if there is none"""
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def completed_ids(self):
+        """
+        Job IDs already in the output, read line by line
+
+        A line cut off by a crash is removed, so appending can carry on.
+
+        Returns:
+            set: Job IDs (or content keys) of the written jobs
+        """
+        job_ids = set()
+        good_bytes = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    job_ids.add(job_key(json.loads(line)))
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                good_bytes += len(line)
+        if good_bytes < os.path.getsize(self.path):
+            print(f"Dropping an incomplete last line from {self.path}")
+            with open(self.path, "r+b") as f:
+                f.truncate(good_bytes)
+        return job_ids
+
+    def open(self, state, append=False):
+        """Start writing: a fresh file, or the existing one to carry on after its last job"""
+        self.state = state
+        self._file = open(self.path, "a" if append else "w", encoding="utf-8")
+        self._save_state()
+
+    def append(self, job):
+        """Write one job and move the checkpoint past it"""
+        self._file.write(json.dumps({field: job.get(field) for field in NDJSON_FIELDS}) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self.state["written"] += 1
+        if job.get("search_rank"):
+            self.state["page"], self.state["card"] = divmod(job["search_rank"] - 1, RESULTS_PAGE_SIZE)
+        self._save_state()
+
+    def finish(self):
+        """Mark the scrape complete"""
+        self.state["complete"] = True
+        self._save_state()
+
+    def _save_state(self):
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def scrape_to_ndjson(keyword, n, path, resume=False, store=None, pool=None, workers=None, backend=None,
+                     **filters):
+    """
+    Scrape jobs straight to an NDJSON file, checkpointing after each one
+
+    Jobs are not kept in memory once written. With `resume`, a previous run
+    of the same search into the same file carries on from its checkpoint:
+    results pages before the last written card are not loaded again, jobs
+    already written are skipped, and only the remaining jobs are scraped. A
+    file already holding n jobs (counted in the file, not taken from the
+    checkpoint) is left as it is. Resuming never overwrites a file that
+    has no checkpoint for the same search.
+
+    Args:
+        keyword (str): Job keyword or title to search for
+        n (int): Total number of jobs wanted in the file
+        path (str): Output file, one JSON job per line
+        resume (bool): Carry on from the checkpoint instead of starting over
+        store, pool, workers, backend: As for detect_job_cards_with_description
+        **filters: Search filters (location, experience_level, job_type)
+
+    Returns:
+        dict: jobs written in total, jobs written by this run, and whether
+            it resumed an earlier run
+
+    Raises:
+        FileExistsError: With `resume`, if the file holds jobs but has no
+            checkpoint for this search
+    """
+    checkpoint = ScrapeCheckpoint(path)
+    # The same keyword and filters, however many jobs are asked for
+    keyword_key, _, filter_key = search_cache_key(keyword, n, **filters)
+    search = json.loads(json.dumps([keyword_key, filter_key]))
+    state = checkpoint.load() if resume and os.path.exists(path) else None
+
+    if state is not None and state.get("search") == search:
+        exclude = checkpoint.completed_ids()
+        if len(exclude) >= n:
+            print(f"{path} already holds {len(exclude)} jobs for this search")
+            return {"jobs": len(exclude), "new": 0, "resumed": True}
+        if len(exclude) >= state["written"] > 0:
+            # A job written after the last checkpoint save is skipped through exclude
+            start = state["page"] * RESULTS_PAGE_SIZE + state["card"] + 1
+            print(f"Resuming after results page {state['page']}, card {state['card']} ({len(exclude)} jobs written)")
+        else:
+            # Lines the checkpoint counted are missing, so its position may be past jobs never kept
+            start = 0
+            if len(exclude) < state["written"]:
+                print(f"{path} holds {len(exclude)} of the {state['written']} jobs its checkpoint records; "
+                      "searching again from the first result")
+        state["written"] = len(exclude)
+    else:
+        if resume and os.path.exists(path) and os.path.getsize(path):
+            raise FileExistsError(
+                f"{path} has no checkpoint for this search; move it away or run without resuming to overwrite it"
+            )
+        if resume:
+            print(f"No checkpoint for this search in {path}; starting over")
+        exclude = set()
+        start = 0
+        state = {"search": search, "written": 0, "page": 0, "card": -1, "complete": False}
+    state["n"] = n
+    state["complete"] = False
+
+    new = 0
+    with checkpoint, tracer.span("scrape.ndjson", keyword=keyword, n=n, start=start):
+        checkpoint.open(state, append=bool(exclude))
+        stream = stream_job_listings(
+            keyword, n - state["written"], store, pool, workers, backend, filters=filters, start=start, exclude=exclude
+        )
+        try:
+            for job in stream:
+                checkpoint.append(job)
+                new += 1
+        finally:
+            stream.close()
+        # A short run may have been cut off, so only a full one is marked complete
+        if state["written"] >= n:
+            checkpoint.finish()
+    return {"jobs": state["written"], "new": new, "resumed": bool(exclude)}
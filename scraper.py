@@ -1,192 +1,672 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import math
+import os
+import queue
+import threading
 import time
-import re
-import json
-from datetime import datetime
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlencode
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from browser_pool import get_default_pool, launch_browser
+from cache import TTLCache
+from description_cleaner import NO_DESCRIPTION, clean_description
+from http_scraper import iter_jobs_http
+from job_store import UNKNOWN_POSTED_DATE, get_default_store, normalize_keyword, parse_job_id
+from search_filters import card_matches, search_params
+from tracing import propagate, tracer
+
+SEARCH_CACHE_TTL = int(os.environ.get("SAGE_SEARCH_CACHE_TTL", 900))
+SEARCH_CACHE_SIZE = int(os.environ.get("SAGE_SEARCH_CACHE_SIZE", 32))
+
+SCRAPE_WORKERS = int(os.environ.get("SAGE_SCRAPE_WORKERS", 1))
+
+# "http" scrapes the guest pages directly and falls back to the browser;
+# "selenium" always uses the browser
+SCRAPE_BACKEND = os.environ.get("SAGE_SCRAPE_BACKEND", "http")
+
+# LinkedIn's guest search shows 25 cards per results page
+RESULTS_PAGE_SIZE = 25
+
+# Shared by every Streamlit session in this process
+search_cache = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+
+# Upper bounds (seconds) for each kind of wait; waits return as soon as their
+# condition holds. Override with e.g. SAGE_WAIT_CARD_DETAIL=5.
+WAIT_TIMEOUTS = {
+    name: float(os.environ.get(f"SAGE_WAIT_{name.upper()}", default))
+    for name, default in {
+        "results": 10,
+        "card_detail": 10,
+        "description": 10,
+        "modal": 3,
+    }.items()
+}
+WAIT_POLL_INTERVAL = 0.1
+
+# Optional politeness delay between card clicks (none by default)
+CARD_DELAY = float(os.environ.get("SAGE_CARD_DELAY", 0))
+
+# How often (seconds) the parallel scraper checks that its description workers are still alive
+WORKER_POLL_INTERVAL = 1.0
+
+# Each script below replaces several WebDriver round-trips with one call.
+
+# Metadata of every result card on the page
+JS_CARD_METADATA = """
+function text(root, selector) {
+    var element = root.querySelector(selector);
+    return element ? element.textContent.replace(/\\s+/g, ' ').trim() : null;
+}
+return Array.prototype.map.call(document.querySelectorAll('.base-card'), function (card) {
+    var link = card.querySelector('a.base-card__full-link') || (card.tagName === 'A' ? card : null);
+    var posted = card.querySelector('time[class*="job-search-card__listdate"]');
+    return {
+        title: text(card, '.base-search-card__title'),
+        company: text(card, '.base-search-card__subtitle a') || text(card, '.base-search-card__subtitle'),
+        url: link ? link.href : null,
+        urn: card.getAttribute('data-entity-urn'),
+        location: text(card, '.job-search-card__location'),
+        date_posted: posted ? posted.getAttribute('datetime') : null
+    };
+});
+"""
+
+# Click card arguments[0] and return the description pane's content before the click
+JS_CLICK_CARD = """
+var element = document.querySelector('div.show-more-less-html__markup');
+var previous = element ? element.innerHTML : null;
+var card = document.querySelectorAll('.base-card')[arguments[0]];
+if (!card) { throw new Error('No job card at index ' + arguments[0]); }
+card.click();
+return previous;
+"""
+
+# Expand and read the description, or null while the pane is missing or
+# still shows arguments[0] (the previous card's content)
+JS_READ_DESCRIPTION = """
+var element = document.querySelector('div.show-more-less-html__markup');
+if (!element || element.innerHTML === arguments[0]) { return null; }
+document.querySelectorAll(
+    'button.show-more-less-html__button--more, button.show-more-less-html__button'
+).forEach(function (button) {
+    if (button.offsetParent !== null && button.getAttribute('aria-expanded') === 'false') {
+        button.click();
+    }
+});
+var parent = element.parentElement;
+parent.style.maxHeight = 'none';
+parent.style.overflow = 'visible';
+element.style.maxHeight = 'none';
+element.style.overflow = 'visible';
+return {html: element.innerHTML};
+"""
+
+# Click every visible modal/toast dismiss button and return how many there were
+JS_DISMISS_MODALS = """
+var buttons = Array.prototype.filter.call(
+    document.querySelectorAll('button.artdeco-modal__dismiss, button.artdeco-toast-item__dismiss'),
+    function (button) { return button.offsetParent !== null; }
+);
+buttons.forEach(function (button) { button.click(); });
+return buttons.length;
+"""
+
+JS_MODALS_GONE = """
+return !Array.prototype.some.call(
+    document.querySelectorAll('button.artdeco-modal__dismiss, button.artdeco-toast-item__dismiss'),
+    function (button) { return button.offsetParent !== null; }
+);
+"""
+
+
+def run_script(browser, script, *args):
+    """execute_script, counted as a WebDriver call"""
+    tracer.count("webdriver_calls")
+    return browser.execute_script(script, *args)
+
+def open_page(browser, url):
+    """browser.get, counted as a WebDriver call"""
+    tracer.count("webdriver_calls")
+    browser.get(url)
+
+
+class WaitTimings:
+    """Thread-safe record of how long each named wait actually took"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits = defaultdict(list)
+
+    def record(self, name, seconds, timed_out=False):
+        with self._lock:
+            self._waits[name].append((seconds, timed_out))
+
+    def summary(self):
+        """
+        Summarise the recorded waits
+
+        Returns:
+            dict: {name: {"count", "total", "mean", "max", "timeouts"}}
+        """
+        with self._lock:
+            waits = {name: list(records) for name, records in self._waits.items()}
+        summary = {}
+        for name, records in waits.items():
+            durations = [seconds for seconds, _ in records]
+            summary[name] = {
+                "count": len(durations),
+                "total": sum(durations),
+                "mean": sum(durations) / len(durations),
+                "max": max(durations),
+                "timeouts": sum(1 for _, timed_out in records if timed_out)
+            }
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._waits.clear()
+
+
+wait_timings = WaitTimings()
+
+def wait_for(browser, name, condition, required=True):
+    """
+    Wait until condition(browser) is truthy, recording how long it took
+
+    Args:
+        browser: WebDriver session
+        name (str): Key into WAIT_TIMEOUTS, also used to label the timing
+        condition (callable): Selenium-style expected condition
+        required (bool): Re-raise on timeout; otherwise return None
+
+    Returns:
+        The condition's truthy result
+    """
+    start = time.perf_counter()
+    with tracer.span(f"scrape.wait.{name}"):
+        try:
+            result = WebDriverWait(browser, WAIT_TIMEOUTS[name], poll_frequency=WAIT_POLL_INTERVAL).until(condition)
+        except TimeoutException:
+            wait_timings.record(name, time.perf_counter() - start, timed_out=True)
+            tracer.count("wait_timeouts")
+            if required:
+                raise
+            print(f"Timed out waiting for {name} after {WAIT_TIMEOUTS[name]}s")
+            return None
+    wait_timings.record(name, time.perf_counter() - start)
+    return result
+
+def description_ready(previous_html=None):
+    """Condition: the description pane shows new content; returns {"html"}"""
+    def condition(browser):
+        return run_script(browser, JS_READ_DESCRIPTION, previous_html)
+    return condition
+
+def cards_loaded(browser):
+    """Condition: result cards are on the page; returns their metadata"""
+    return run_script(browser, JS_CARD_METADATA) or None
 
 def setup_browser():
-    options = Options()
-    #add a piece of code to run this program without opening the browser
-    options.add_argument("--headless")  # Adding headless mode
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--window-size=1920,1080")
-
-    # Fix: Use Service object with ChromeDriverManager
-    service = Service(ChromeDriverManager().install())
-    browser = webdriver.Chrome(service=service, options=options)
-    return browser
+    """Start a standalone headless Chrome session outside the browser pool"""
+    return launch_browser()
 
+@tracer.traced("scrape.modals")
 def close_modal_if_present(browser):
     try:
-        #add the class of the button to close the popup inside the find_elements()
-        dismiss_buttons = browser.find_elements(
-            By.CSS_SELECTOR, 
-            "button.artdeco-modal__dismiss, button.artdeco-toast-item__dismiss"
-        )
-        
-        for button in dismiss_buttons:
-            if button.is_displayed():
-                browser.execute_script("arguments[0].click();", button)
-                print("Clicked modal dismiss button")
-                time.sleep(1)
+        dismissed = run_script(browser, JS_DISMISS_MODALS)
+        if dismissed:
+            print("Clicked modal dismiss button")
+            wait_for(browser, "modal", lambda b: run_script(b, JS_MODALS_GONE), required=False)
     except Exception as e:
         print("No modal found or error handling modal")
 
-def extract_job_description(browser, card):
-    try:
-        browser.execute_script("arguments[0].click();", card)
-        time.sleep(2)
-        #add the class of the job description container inside the presence_of_element_located(())
-        
-        description_container = WebDriverWait(browser, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.show-more-less-html__markup"))
-        )
-
-        js_remove_restrictions = """
-        var element = arguments[0];
-        element.className = '';
-        element.style.maxHeight = 'none';
-        element.style.overflow = 'visible';
-        return element.innerHTML;
-        """
+def read_job_description(browser, previous_html=None, wait_name="description"):
+    """
+    Read the description markup shown in the job detail pane or page
 
-        try:
-            #add the class of the show more button inside the find_elements()
-           
-            show_more_buttons = browser.find_elements(
-                By.CSS_SELECTOR, 
-                "button.show-more-less-html__button--more, button.show-more-less-html__button"
-            )
-
-            
-            for button in show_more_buttons:
-                if button.is_displayed() and button.get_attribute("aria-expanded") == "false":
-                    browser.execute_script("arguments[0].click();", button)
-                    print("Clicked 'Show More' button")
-                    time.sleep(2)
-        except Exception as e:
-            print(f"Show More button handling: {e}")
-
-        description = browser.execute_script(js_remove_restrictions, description_container)
-
-        js_get_full_content = """
-        var element = arguments[0];
-        var parent = element.parentElement;
-        parent.style.maxHeight = 'none';
-        parent.style.overflow = 'visible';
-        element.style.maxHeight = 'none';
-        element.style.overflow = 'visible';
-        return element.innerText;
-        """
+    Only the raw HTML crosses the WebDriver connection; it is cleaned later by
+    finish_description, so the browser is not held while text is processed.
 
-        full_text = browser.execute_script(js_get_full_content, description_container)
+    Args:
+        browser: WebDriver session
+        previous_html (str): Pane content to wait to be replaced (after a card click)
+        wait_name (str): WAIT_TIMEOUTS entry bounding the wait
 
-        if full_text and len(full_text) > len(description):
-            description = full_text
+    Returns:
+        str: Description HTML, or None if there is none
+    """
+    try:
+        content = wait_for(browser, wait_name, description_ready(previous_html), required=previous_html is None)
+        if content is None:
+            # The pane never changed (e.g. two identical postings): read what is there
+            content = run_script(browser, JS_READ_DESCRIPTION, None)
+        return content["html"] if content else None
 
-        if isinstance(description, str):
-            description = re.sub(r'<script[^>]*>.*?</script>', '', description, flags=re.DOTALL)
-            description = re.sub(r'<style[^>]*>.*?</style>', '', description, flags=re.DOTALL)
-            description = description.replace('<br>', '\n')
-            description = description.replace('<li>', '• ')
-            description = description.replace('</li>', '\n')
-            description = description.replace('<ul>', '\n').replace('</ul>', '\n')
-            description = description.replace('<p>', '').replace('</p>', '\n')
-            description = re.sub('<[^<]+?>', '', description)
-            description = re.sub(r'\n\s*\n', '\n\n', description)
-            description = re.sub(r' +', ' ', description)
-            description = description.strip()
+    except Exception as e:
+        print(f"Error extracting job description: {e}")
+        return None
 
-        return description if description else "No Description Found"
+@tracer.traced("scrape.card")
+def extract_job_description(browser, card_index):
+    """Click the result card at card_index and read the description markup it opens"""
+    tracer.count("cards")
+    try:
+        previous_html = run_script(browser, JS_CLICK_CARD, card_index)
+    except Exception as e:
+        print(f"Error extracting job description: {e}")
+        return None
+    return read_job_description(browser, previous_html, wait_name="card_detail")
 
+@tracer.traced("scrape.job_page")
+def fetch_job_description(browser, url):
+    """Open a job's own page and read its description markup"""
+    tracer.count("cards")
+    try:
+        open_page(browser, url)
+        close_modal_if_present(browser)
     except Exception as e:
         print(f"Error extracting job description: {e}")
-        return "No Description Found"
+        return None
+    return read_job_description(browser)
 
-def detect_job_cards_with_description(keyword, n=5):
+def finish_description(job):
     """
-    Scrape LinkedIn for job listings based on search parameters.
-    
+    Turn the description markup a browser read into the job's description text
+
+    Runs on the thread consuming the scrape rather than on the browser's.
+    Jobs that already have a description (e.g. reused from the store) are
+    left alone.
+    """
+    if "description" not in job:
+        with tracer.span("scrape.clean_description"):
+            job["description"] = clean_description(job.get("description_html") or "") or NO_DESCRIPTION
+    return job
+
+def build_search_url(keyword, page=0, params=None):
+    """
+    Return the URL of a LinkedIn guest search results page (RESULTS_PAGE_SIZE cards per page)
+
     Args:
         keyword (str): Job keyword or title to search for
-        n (int): Number of jobs to scrape (default: 5)
-        
-    Returns:
-        list: List of job listings with details
+        page (int): Results page, from 0
+        params (dict): Extra query parameters, e.g. filters from search_filters.search_params
     """
     base_url = "https://www.linkedin.com/jobs/search"
-    formatted_keyword = keyword.replace(" ", "%20")
-    url = f"{base_url}?keywords={formatted_keyword}&trk=public_jobs_jobs-search-bar_search-submit&position=1&pageNum=0"
-    browser = setup_browser()
-    job_listings = []
+    query = {"keywords": keyword, **(params or {}),
+             "trk": "public_jobs_jobs-search-bar_search-submit", "position": 1, "pageNum": 0}
+    if page:
+        query["start"] = page * RESULTS_PAGE_SIZE
+    return f"{base_url}?{urlencode(query, quote_via=quote)}"
 
-    try:
-        browser.get(url)
-        print("Page loaded successfully.")
-        time.sleep(5)
+def parse_card_metadata(card):
+    """
+    Turn the raw card dict returned by JS_CARD_METADATA into a job record
 
-        close_modal_if_present(browser)
+    Returns:
+        dict: title, company, url, job_id, location and date_posted, or None
+            for a card without a title or company
+    """
+    if not card.get("title") or not card.get("company"):
+        return None
+    return {
+        "title": card["title"],
+        "company": card["company"],
+        "url": card.get("url"),
+        # Job ID from the card's URN, falling back to its link
+        "job_id": parse_job_id(card.get("urn")) or parse_job_id(card.get("url")),
+        "location": card.get("location") or "Location not specified",
+        "date_posted": card.get("date_posted") or UNKNOWN_POSTED_DATE
+    }
+
+@tracer.traced("scrape.results_page")
+def load_job_cards(browser, url):
+    """
+    Open a search results page and read every card on it in one script call
+
+    Returns:
+        list: One job record (see parse_card_metadata) or None per card, in
+            page order, so indexes line up with the cards for clicking
+    """
+    open_page(browser, url)
+    print("Page loaded successfully.")
+
+    raw_cards = wait_for(browser, "results", cards_loaded)
+
+    close_modal_if_present(browser)
+    print(f"Number of job cards detected: {len(raw_cards)}")
+    tracer.count("result_cards", len(raw_cards))
+    return [parse_card_metadata(card) for card in raw_cards]
+
+def iter_jobs_serial(pool, keyword, n, store=None, filters=None, start=0, exclude=()):
+    """
+    Scrape up to n jobs from one results page in one browser, clicking each card
+
+    The page is the one holding result `start` (a result offset); cards
+    before it, cards whose job ID is in `exclude`, cards whose posting is
+    already in `store` unchanged and cards failing the filters LinkedIn could
+    not apply are not clicked.
+    """
+    params, card_filters = search_params(**(filters or {}))
+    page, first_card = divmod(start, RESULTS_PAGE_SIZE)
+    browser = pool.acquire()
 
-        job_cards = WebDriverWait(browser, 10).until(
-            EC.presence_of_all_elements_located((By.CLASS_NAME, "base-card"))
-        )
-        print(f"Number of job cards detected: {len(job_cards)}")
+    try:
+        job_cards = load_job_cards(browser, build_search_url(keyword, page, params))
+        for idx, job in enumerate(job_cards):
+            if job is not None:
+                job["search_rank"] = page * RESULTS_PAGE_SIZE + idx + 1
+        # Keep card indexes, since cards are clicked by their position on the page
+        selected = []
+        for idx, job in enumerate(job_cards[first_card:], start=first_card):
+            if job is not None and job["job_id"] in exclude:
+                continue
+            if job is not None and not card_matches(job, card_filters):
+                tracer.count("cards_filtered")
+                continue
+            selected.append((idx, job))
+        selected = selected[:n]
+        known = store.known_descriptions([job for _, job in selected]) if store is not None else {}
 
-        for idx, card in enumerate(job_cards[:n]):
+        for idx, job_data in selected:
             try:
                 print(f"\nProcessing Job Card {idx + 1}...")
+                if job_data is None:
+                    raise ValueError("card has no title or company")
 
-                job_data = {
-                    "title": card.find_element(By.CLASS_NAME, "base-search-card__title").text.strip(),
-                    "company": card.find_element(By.CLASS_NAME, "base-search-card__subtitle").find_element(By.TAG_NAME, "a").text.strip()
-                }
+                if job_data["job_id"] in known:
+                    tracer.count("descriptions_reused")
+                    job_data["description"] = known[job_data["job_id"]]
+                    print(f"Reusing stored description for job: {job_data['title']}")
+                    yield job_data
+                    continue
 
                 close_modal_if_present(browser)
-                job_data["description"] = extract_job_description(browser, card)
-
-                # Extract location if available
-                try:
-                    job_data["location"] = card.find_element(By.CLASS_NAME, "job-search-card__location").text.strip()
-                except:
-                    job_data["location"] = "Location not specified"
-                
-                # Extract date posted if available
-                try:
-                    job_data["date_posted"] = card.find_element(By.CSS_SELECTOR, "time.job-search-card__listdate").get_attribute("datetime")
-                except:
-                    job_data["date_posted"] = "Recently posted"
-
-                job_listings.append(job_data)
+                job_data["description_html"] = extract_job_description(browser, idx)
+
                 print(f"Successfully processed job: {job_data['title']}")
 
             except Exception as e:
                 print(f"Error processing job card {idx + 1}: {e}")
+                job_data = None
+
+            if job_data:
+                yield job_data
 
-            time.sleep(2)
+            if CARD_DELAY:
+                time.sleep(CARD_DELAY)
 
     except Exception as e:
         print(f"An error occurred: {e}")
     finally:
-        browser.quit()
+        pool.release(browser)
+
+def scrape_results_page(pool, keyword, page, params=None):
+    """Collect card metadata (without descriptions) from one results page"""
+    try:
+        with pool.browser() as browser:
+            job_cards = load_job_cards(browser, build_search_url(keyword, page, params))
+    except Exception as e:
+        print(f"Error loading results page {page}: {e}")
+        return []
+    jobs = []
+    for idx, job in enumerate(job_cards):
+        if job is not None:
+            job["search_rank"] = page * RESULTS_PAGE_SIZE + idx + 1
+            jobs.append(job)
+    return jobs
 
-    filename = f"linkedin_jobs.json"
+def fetch_descriptions(pool, jobs, done=None):
+    """
+    Read the description markup of each job from its own page, using one browser
 
+    Each job is put on the `done` queue, if given, once its markup is read
+    (see finish_description).
+    """
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(job_listings, f, indent=2, ensure_ascii=False)
-        print(f"\nJob listings saved to {filename}")
+        with pool.browser() as browser:
+            for job in jobs:
+                if job.get("url"):
+                    job["description_html"] = fetch_job_description(browser, job["url"])
+                    print(f"Successfully processed job: {job['title']}")
+                else:
+                    job["description"] = NO_DESCRIPTION
+                if done is not None:
+                    done.put(job)
     except Exception as e:
-        print(f"Error saving to JSON: {e}")
+        print(f"An error occurred: {e}")
+        for job in jobs:
+            if "description" not in job and "description_html" not in job:
+                job["description"] = NO_DESCRIPTION
+                if done is not None:
+                    done.put(job)
+
+def iter_jobs_parallel(pool, keyword, n, workers, store=None, filters=None, start=0, exclude=()):
+    """
+    Scrape up to n jobs across several results pages and browser workers
+
+    Results pages from the one holding result `start` on are loaded
+    concurrently, then the descriptions are split between `workers`
+    browsers, each opening its jobs' pages directly. Jobs already in `store`
+    unchanged keep their stored description and are not opened, nor are
+    cards before `start`, cards in `exclude` or cards failing the filters
+    LinkedIn could not apply. The pool bounds how many browsers run at once
+    across all searches. Jobs are yielded in the order they appear in the
+    search results, each as soon as it and every job before it are complete.
+    """
+    params, card_filters = search_params(**(filters or {}))
+    pages = range(start // RESULTS_PAGE_SIZE, math.ceil((start + n) / RESULTS_PAGE_SIZE))
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    try:
+        page_results = list(executor.map(
+            propagate(lambda page: scrape_results_page(pool, keyword, page, params)), pages
+        ))
+
+        # Consecutive results pages can overlap
+        job_listings = []
+        seen = set()
+        for jobs in page_results:
+            for job in jobs:
+                key = job.get("job_id") or job.get("url")
+                if key and key in seen:
+                    continue
+                seen.add(key)
+                if job["search_rank"] <= start or job["job_id"] in exclude:
+                    continue
+                if not card_matches(job, card_filters):
+                    tracer.count("cards_filtered")
+                    continue
+                job_listings.append(job)
+        job_listings = job_listings[:n]
+
+        done = queue.Queue()
+        known = store.known_descriptions(job_listings) if store is not None else {}
+        to_fetch = []
+        tracer.count("descriptions_reused", len(known))
+        for job in job_listings:
+            if job["job_id"] in known:
+                job["description"] = known[job["job_id"]]
+                done.put(job)
+            else:
+                to_fetch.append(job)
+        print(f"Fetching {len(to_fetch)} job descriptions with {workers} workers ({len(known)} reused)")
+
+        futures = [
+            executor.submit(propagate(fetch_descriptions), pool, to_fetch[i::workers], done)
+            for i in range(workers) if to_fetch[i::workers]
+        ]
+
+        position = {id(job): idx for idx, job in enumerate(job_listings)}
+        finished = set()
+        next_idx = 0
+        while next_idx < len(job_listings):
+            try:
+                finished.add(position[id(done.get(timeout=WORKER_POLL_INTERVAL))])
+            except queue.Empty:
+                if not all(future.done() for future in futures):
+                    continue
+                # Every worker has stopped, so jobs still missing (e.g. from a
+                # worker that died mid-job) will never arrive
+                while not done.empty():
+                    finished.add(position[id(done.get_nowait())])
+                for idx in range(next_idx, len(job_listings)):
+                    if idx not in finished:
+                        job = job_listings[idx]
+                        if "description" not in job and "description_html" not in job:
+                            job["description"] = NO_DESCRIPTION
+                        finished.add(idx)
+                        tracer.count("descriptions_lost")
+            while next_idx in finished:
+                job = job_listings[next_idx]
+                # Drop each job once handed over, so long scrapes stay bounded
+                job_listings[next_idx] = None
+                yield job
+                next_idx += 1
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def save_job(store, job, keyword):
+    try:
+        with tracer.span("scrape.save"):
+            store.upsert_jobs([job], keyword)
+    except Exception as e:
+        print(f"Error saving to job store: {e}")
+
+def stream_job_listings(keyword, n=5, store=None, pool=None, workers=None, backend=None, skip_known=True,
+                        filters=None, start=0, exclude=()):
+    """
+    Scrape LinkedIn for job listings, yielding each one as soon as it is extracted.
+
+    Each job is saved to the store as it arrives. Postings already in the
+    store unchanged reuse their stored description instead of being opened,
+    unless skip_known is False. `filters` is a dict of search filters;
+    `start` (a result offset) and `exclude` (job IDs) skip work a previous
+    run already did. Other arguments are the same as
+    detect_job_cards_with_description.
+
+    Yields:
+        dict: Job listing with details
+    """
+    store = store or get_default_store()
+    known_store = store if skip_known else None
 
+    if (backend or SCRAPE_BACKEND) == "http":
+        scraped = []
+        try:
+            for job in iter_jobs_http(keyword, n, store=known_store, filters=filters, start=start, exclude=exclude):
+                save_job(store, job, keyword)
+                scraped.append(job["job_id"])
+                yield job
+            # Fewer than n jobs here means the results ran out or every card was excluded or filtered
+            return
+        except Exception as e:
+            print(f"HTTP scraping failed: {e}")
+        # The browser scrapes whatever the HTTP backend didn't get to
+        n -= len(scraped)
+        exclude = set(exclude).union(job_id for job_id in scraped if job_id)
+        print(f"Falling back to the browser for the remaining {n} jobs")
+        tracer.count("http_fallbacks")
+
+    pool = pool or get_default_pool()
+    workers = max(1, min(workers or SCRAPE_WORKERS, pool.size))
+
+    if workers == 1 and start % RESULTS_PAGE_SIZE + n <= RESULTS_PAGE_SIZE:
+        jobs = iter_jobs_serial(pool, keyword, n, known_store, filters, start, exclude)
+    else:
+        jobs = iter_jobs_parallel(pool, keyword, n, workers, known_store, filters, start, exclude)
+
+    for job in jobs:
+        finish_description(job)
+        save_job(store, job, keyword)
+        yield job
+
+def detect_job_cards_with_description(keyword, n=5, store=None, pool=None, workers=None, backend=None, **filters):
+    """
+    Scrape LinkedIn for job listings based on search parameters.
+    
+    Filters LinkedIn supports are sent with the search, so excluded jobs are
+    never loaded; the rest are checked on each card before its description
+    is fetched (see search_filters).
+    
+    Args:
+        keyword (str): Job keyword or title to search for
+        n (int): Number of jobs to scrape (default: 5)
+        store (JobStore): Store to save the results to (default: the local job database)
+        pool (BrowserPool): Pool to check browsers out of (default: the shared pool)
+        workers (int): Browsers to scrape with in parallel (default: SAGE_SCRAPE_WORKERS,
+            capped at the pool size)
+        backend (str): "http" or "selenium" (default: SAGE_SCRAPE_BACKEND)
+        **filters: Search filters (location, experience_level, job_type)
+        
+    Returns:
+        list: List of job listings with details
+    """
+    store = store or get_default_store()
+    job_listings = list(stream_job_listings(keyword, n, store, pool, workers, backend, filters=filters))
+    print(f"\nJob listings saved to {store.path}")
     return job_listings
 
 
+def search_cache_key(keyword, n=5, **filters):
+    """
+    Build a cache key from a normalised keyword and search filters
+
+    Filter values are normalised so that e.g. ["Full-time", "Contract"] and
+    ["contract", "full-time"] share an entry.
+    """
+    normalized = []
+    for name, value in sorted(filters.items()):
+        if isinstance(value, (list, tuple, set)):
+            value = tuple(sorted(normalize_keyword(v) for v in value))
+        elif isinstance(value, str):
+            value = normalize_keyword(value)
+        if value:
+            normalized.append((name, value))
+    return (normalize_keyword(keyword), n, tuple(normalized))
+
+def stream_cached_job_search(keyword, n=5, refresh=False, workers=None, **filters):
+    """
+    Yield job listings, reusing results of an identical recent search
+
+    On a cache miss jobs are yielded as they are scraped and the complete
+    result is cached at the end. Arguments are the same as cached_job_search.
+    """
+    key = search_cache_key(keyword, n, **filters)
+    cached = None if refresh else search_cache.get(key)
+
+    # Callers annotate the dicts with match results, so hand out copies
+    if cached is not None:
+        tracer.count("search_cache_hits")
+        for job in cached:
+            yield dict(job)
+        return
+
+    job_listings = []
+    for job in stream_job_listings(keyword, n, workers=workers, filters=filters):
+        job_listings.append(dict(job))
+        yield job
+
+    # Don't pin a failed or empty scrape for the whole TTL
+    if job_listings:
+        search_cache.set(key, job_listings)
+
+def cached_job_search(keyword, n=5, refresh=False, workers=None, **filters):
+    """
+    Scrape job listings, reusing results of an identical recent search
+
+    Args:
+        keyword (str): Job keyword or title to search for
+        n (int): Number of jobs to scrape (default: 5)
+        refresh (bool): Ignore any cached result and scrape again
+        workers (int): Browsers to scrape with in parallel on a cache miss
+        **filters: Search filters (location, experience_level, job_type)
+
+    Returns:
+        list: List of job listings with details
+    """
+    return list(stream_cached_job_search(keyword, n, refresh, workers, **filters))
+
 if __name__ == "__main__":
     detect_job_cards_with_description('Web Developer')
\ No newline at end of file
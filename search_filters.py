@@ -0,0 +1,111 @@
+import re
+
+from job_store import normalize_keyword
+
+# LinkedIn's experience level filter (f_E) codes
+EXPERIENCE_LEVEL_CODES = {
+    "internship": "1",
+    "entry level": "2",
+    "associate": "3",
+    "mid-senior level": "4",
+    "director": "5",
+    "executive": "6",
+}
+
+# LinkedIn's job type filter (f_JT) codes
+JOB_TYPE_CODES = {
+    "full-time": "F",
+    "part-time": "P",
+    "contract": "C",
+    "temporary": "T",
+    "internship": "I",
+    "volunteer": "V",
+    "other": "O",
+}
+
+# Locations meaning "remote", sent as LinkedIn's workplace type filter (f_WT) instead
+REMOTE_LOCATIONS = {"remote", "anywhere", "work from home", "wfh"}
+REMOTE_WORKPLACE_CODE = "2"
+
+
+def _as_list(value):
+    if not value:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _encode(values, codes):
+    """LinkedIn's comma-separated codes for filter labels, or None if any label has no code"""
+    encoded = set()
+    for value in values:
+        code = codes.get(normalize_keyword(value))
+        if code is None:
+            return None
+        encoded.add(code)
+    return ",".join(sorted(encoded))
+
+
+def search_params(location=None, experience_level=None, job_type=None):
+    """
+    Translate search filters into LinkedIn search URL parameters
+
+    Args:
+        location (str): Place name, or e.g. "Remote"
+        experience_level (list): Labels such as "Entry level" or "Mid-Senior level"
+        job_type (list): Labels such as "Full-time" or "Contract"
+
+    Returns:
+        tuple: (params, card_filters) - query parameters to add to the search
+            URL, and the filters LinkedIn cannot apply, to be checked on each
+            card with card_matches(). A filter with any unknown label is
+            checked on the cards as a whole: LinkedIn ORs a filter's labels,
+            so sending only the known ones would AND them with the rest.
+    """
+    params = {}
+    card_filters = {}
+
+    location = " ".join((location or "").split())
+    if normalize_keyword(location) in REMOTE_LOCATIONS:
+        params["f_WT"] = REMOTE_WORKPLACE_CODE
+    elif location:
+        params["location"] = location
+
+    for name, codes, param, values in (
+        ("experience_level", EXPERIENCE_LEVEL_CODES, "f_E", experience_level),
+        ("job_type", JOB_TYPE_CODES, "f_JT", job_type),
+    ):
+        values = _as_list(values)
+        if not values:
+            continue
+        encoded = _encode(values, codes)
+        if encoded is None:
+            card_filters[name] = values
+        else:
+            params[param] = encoded
+    return params, card_filters
+
+
+def card_matches(job, card_filters):
+    """
+    Check a job card's metadata against the filters LinkedIn could not apply
+
+    Cards only carry a title, company, location and date, so each remaining
+    label must appear as a whole phrase in the title (e.g. "Senior" or
+    "Remote"). A card passes when it matches at least one label of every
+    remaining filter.
+
+    Args:
+        job (dict): Card metadata (see parse_card_metadata)
+        card_filters (dict): Filter name -> labels, from search_params()
+
+    Returns:
+        bool: Whether the card is worth fetching
+    """
+    title = normalize_keyword(job.get("title"))
+    for labels in card_filters.values():
+        if not any(
+            re.search(r"(?<!\w)" + re.escape(normalize_keyword(label)) + r"(?!\w)", title)
+            for label in labels
+        ):
+            return False
+    return True
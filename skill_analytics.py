@@ -0,0 +1,222 @@
+import threading
+
+import numpy as np
+import scipy.sparse
+
+from hashed_index import description_digest
+from job_store import get_default_store, job_key, normalize_keyword
+from resume_matcher import SKILL_EXTRACTOR, as_resume_profile
+from tracing import tracer
+
+# Lower-cased skill -> column, in SKILL_SET order
+SKILL_COLUMNS = {skill: i for i, skill in enumerate(SKILL_EXTRACTOR.skills)}
+
+# Display name of each column
+SKILL_NAMES = list(SKILL_EXTRACTOR.skills.values())
+
+# A job counts as matching a resume when they share at least this many skills
+MIN_SHARED_SKILLS = 1
+
+
+class SkillMatrix:
+    """
+    Sparse job x skill incidence matrix over a growing set of postings.
+
+    Row i marks the SKILL_SET skills mentioned by the i-th job added. Jobs are
+    scanned for skills when first added and again only if their description
+    changes; new rows are appended as blocks and changed rows are rewritten,
+    both on first use, so demand, co-occurrence and gap rankings are sparse
+    matrix products rather than set operations per job.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.job_ids = []
+        self._rows = {}
+        self._digests = {}
+        self._blocks = []
+        # Row -> new skill columns of jobs whose description changed
+        self._updates = {}
+        # updated_at of the last stored job added by update_from_store
+        self.synced_through = None
+        self._matrix = scipy.sparse.csr_matrix((0, len(SKILL_NAMES)), dtype=np.int32)
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    def __contains__(self, job_id):
+        return str(job_id) in self._rows
+
+    def add_jobs(self, jobs):
+        """
+        Add the skills of new jobs and rebuild the rows of changed ones
+
+        Args:
+            jobs (iterable): Job listing dicts with a "description"
+
+        Returns:
+            int: Number of jobs added or rebuilt
+        """
+        indptr = [0]
+        columns = []
+        job_ids = []
+        updated = 0
+        with self._lock:
+            for job in jobs:
+                key = job_key(job)
+                description = job.get("description") or ""
+                digest = description_digest(description)
+                if self._digests.get(key) == digest:
+                    continue
+                self._digests[key] = digest
+                job_columns = [SKILL_COLUMNS[skill] for skill in SKILL_EXTRACTOR.extract(description)]
+                if key in self._rows:
+                    self._updates[self._rows[key]] = job_columns
+                    updated += 1
+                    continue
+                self._rows[key] = len(self.job_ids) + len(job_ids)
+                job_ids.append(key)
+                columns.extend(job_columns)
+                indptr.append(len(columns))
+            if job_ids:
+                self._blocks.append(scipy.sparse.csr_matrix(
+                    (np.ones(len(columns), dtype=np.int32), columns, indptr),
+                    shape=(len(job_ids), len(SKILL_NAMES))
+                ))
+                self.job_ids.extend(job_ids)
+        return len(job_ids) + updated
+
+    @property
+    def matrix(self):
+        """The full incidence matrix (csr, one row per job, one column per skill)"""
+        with self._lock:
+            if self._blocks:
+                self._matrix = scipy.sparse.vstack([self._matrix] + self._blocks, format="csr")
+                self._blocks = []
+            if self._updates:
+                n_rows = self._matrix.shape[0]
+                keep = np.ones(n_rows, dtype=np.int32)
+                keep[list(self._updates)] = 0
+                rows = [row for row, job_columns in self._updates.items() for _ in job_columns]
+                columns = [column for job_columns in self._updates.values() for column in job_columns]
+                rebuilt = scipy.sparse.csr_matrix(
+                    (np.ones(len(columns), dtype=np.int32), (rows, columns)), shape=self._matrix.shape
+                )
+                self._matrix = (scipy.sparse.diags(keep, format="csr", dtype=np.int32) @ self._matrix + rebuilt).tocsr()
+                self._matrix.eliminate_zeros()
+                self._updates = {}
+            return self._matrix
+
+    def rows_for(self, job_ids):
+        """Row numbers of the given jobs (jobs not in the matrix are skipped)"""
+        return np.array([self._rows[key] for key in map(str, job_ids) if key in self._rows], dtype=np.int64)
+
+    def _select(self, rows=None):
+        matrix = self.matrix
+        return matrix if rows is None else matrix[rows]
+
+    def demand(self, rows=None):
+        """
+        Number of jobs mentioning each skill
+
+        Args:
+            rows (array): Restrict to these rows (see rows_for); default all jobs
+
+        Returns:
+            numpy.ndarray: Job count per SKILL_NAMES column
+        """
+        return np.asarray(self._select(rows).sum(axis=0)).ravel()
+
+    def cooccurrence(self, rows=None):
+        """
+        Number of jobs mentioning each pair of skills
+
+        Returns:
+            scipy.sparse.csr_matrix: Skill x skill counts; the diagonal is the demand
+        """
+        matrix = self._select(rows)
+        return (matrix.T @ matrix).tocsr()
+
+    def related_skills(self, skill, rows=None, top=10):
+        """
+        Skills most often required together with a skill
+
+        Returns:
+            list: (skill name, jobs needing both) pairs, most frequent first
+        """
+        column = SKILL_COLUMNS[" ".join(skill.lower().split())]
+        matrix = self._select(rows)
+        counts = np.asarray((matrix.T @ matrix[:, column]).todense()).ravel()
+        counts[column] = 0
+        best = np.argsort(-counts, kind="stable")[:top]
+        return [(SKILL_NAMES[i], int(counts[i])) for i in best if counts[i]]
+
+    def skill_gaps(self, resume, rows=None, min_shared=MIN_SHARED_SKILLS, top=20):
+        """
+        Rank the skills a resume lacks by how many matching jobs need them
+
+        Matching jobs are those (among `rows`) sharing at least `min_shared`
+        skills with the resume.
+
+        Args:
+            resume (str or ResumeProfile): Resume text or its precomputed profile
+            rows (array): Restrict to these rows (see rows_for); default all jobs
+            min_shared (int): Skills a job must share with the resume to count
+            top (int): Number of gaps to return
+
+        Returns:
+            tuple: (number of matching jobs, list of dicts with "skill",
+                "jobs" needing it and "share" of matching jobs), biggest gap first
+        """
+        profile = as_resume_profile(resume)
+        has_skill = np.zeros(len(SKILL_NAMES), dtype=np.int32)
+        has_skill[[SKILL_COLUMNS[skill] for skill in profile.skills if skill in SKILL_COLUMNS]] = 1
+
+        with tracer.span("analytics.skill_gaps", jobs=len(self)):
+            matrix = self._select(rows)
+            matching = matrix[(matrix @ has_skill) >= min_shared]
+            demand = np.asarray(matching.sum(axis=0)).ravel() * (1 - has_skill)
+
+        n_matching = matching.shape[0]
+        best = np.argsort(-demand, kind="stable")[:top]
+        return n_matching, [
+            {"skill": SKILL_NAMES[i], "jobs": int(demand[i]), "share": float(demand[i] / n_matching)}
+            for i in best if demand[i]
+        ]
+
+
+def update_from_store(skill_matrix, store):
+    """
+    Add the stored jobs inserted or given a new description since the last update
+
+    Returns:
+        int: Number of jobs added or rebuilt
+    """
+    added = 0
+    for jobs in store.iter_updated(skill_matrix.synced_through):
+        added += skill_matrix.add_jobs(jobs)
+        skill_matrix.synced_through = jobs[-1]["updated_at"]
+    return added
+
+
+def keyword_job_ids(store, keyword):
+    """IDs of the stored jobs found with a search keyword"""
+    rows = store.execute(
+        "SELECT job_id FROM job_keywords WHERE keyword = ?", (normalize_keyword(keyword),)
+    )
+    return [row["job_id"] for row in rows]
+
+
+_default_skill_matrix = None
+_default_skill_matrix_lock = threading.Lock()
+
+
+@tracer.traced("analytics.update")
+def get_skill_matrix(store=None):
+    """Return the process-wide SkillMatrix, brought up to date with the store"""
+    global _default_skill_matrix
+    with _default_skill_matrix_lock:
+        if _default_skill_matrix is None:
+            _default_skill_matrix = SkillMatrix()
+        skill_matrix = _default_skill_matrix
+    update_from_store(skill_matrix, store or get_default_store())
+    return skill_matrix
@@ -0,0 +1,164 @@
+import http.server
+import os
+import sys
+import threading
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+# Tests import the app's modules from the repository root and never write its trace log
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["SAGE_TRACE_LOG"] = ""
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class GuestAPIHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serve recorded LinkedIn guest API responses from tests/fixtures/guest_api.
+
+    Search pages are search-<start>.html (HTTP 400 past the last one, as
+    LinkedIn answers) and postings are posting-<job_id>.html (HTTP 404 when
+    missing). `server.failures` maps a path prefix to a number of HTTP 503
+    responses to give before serving it, to exercise retries.
+    """
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.server.requests.append(self.path)
+
+        for prefix, remaining in self.server.failures.items():
+            if url.path.startswith(prefix) and remaining:
+                self.server.failures[prefix] -= 1
+                self.send_response(503)
+                self.end_headers()
+                return
+
+        if url.path == "/jobs-guest/jobs/api/seeMoreJobPostings/search":
+            name = f"search-{parse_qs(url.query).get('start', ['0'])[0]}.html"
+            missing_status = 400
+        elif url.path.startswith("/jobs-guest/jobs/api/jobPosting/"):
+            name = f"posting-{url.path.rsplit('/', 1)[-1]}.html"
+            missing_status = 404
+        else:
+            name, missing_status = None, 404
+
+        path = os.path.join(FIXTURES_DIR, "guest_api", name) if name else None
+        if path is None or not os.path.exists(path):
+            self.send_response(missing_status)
+            self.end_headers()
+            return
+        with open(path, "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def guest_server():
+    """A local HTTP server answering like LinkedIn's guest job API"""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), GuestAPIHandler)
+    server.requests = []
+    server.failures = {}
+    server.base_url = f"http://127.0.0.1:{server.server_port}"
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def guest_client(guest_server):
+    from http_scraper import LinkedInGuestClient
+    return LinkedInGuestClient(base_url=guest_server.base_url, concurrency=2)
+
+
+@pytest.fixture
+def backoff_sleeps(monkeypatch):
+    """Record urllib3's retry backoff sleeps instead of waiting them out"""
+    sleeps = []
+    monkeypatch.setattr("urllib3.util.retry.time.sleep", sleeps.append)
+    return sleeps
+
+
+class FakeBrowser:
+    """
+    Stands in for a WebDriver session on a LinkedIn results page.
+
+    Answers the scraper's scripts (see scraper.JS_*) for `n_cards` cards
+    titled "Developer <i>" with job IDs 1000000 + i; clicking a card shows its
+    description in the detail pane, and a job's own page shows another.
+    """
+    n_cards = 30
+
+    def __init__(self):
+        self.url = None
+        self.pane = None
+        self.quit_called = False
+        self.healthy = True
+
+    def get(self, url):
+        self.url = url
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+    def execute_script(self, script, *args):
+        import scraper
+        if script == "return 1;":
+            if not self.healthy:
+                raise RuntimeError("session deleted")
+            return 1
+        if script == scraper.JS_CARD_METADATA:
+            return [
+                {
+                    "title": f"Developer {i}",
+                    "company": "Acme",
+                    "location": "New York, NY",
+                    "date_posted": "2025-01-01",
+                    "url": f"https://www.linkedin.com/jobs/view/developer-{1000000 + i}",
+                    "urn": f"urn:li:jobPosting:{1000000 + i}",
+                }
+                for i in range(self.n_cards)
+            ]
+        if script == scraper.JS_CLICK_CARD:
+            previous, self.pane = self.pane, f"<p>Card {args[0]} &amp; more</p><ul><li>Python</li></ul>"
+            return previous
+        if script == scraper.JS_READ_DESCRIPTION:
+            if self.url and "/jobs/view/" in self.url:
+                return {"html": f"<p>Page {self.url.rsplit('-', 1)[-1]}</p>"}
+            return None if self.pane == args[0] else {"html": self.pane}
+        if script == scraper.JS_DISMISS_MODALS:
+            return 0
+        return True
+
+
+@pytest.fixture
+def browser_pool():
+    from browser_pool import BrowserPool
+    pool = BrowserPool(size=2, factory=FakeBrowser)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def store():
+    from job_store import JobStore
+    with JobStore(":memory:") as store:
+        yield store
+
+
+@pytest.fixture(autouse=True)
+def reset_tracer():
+    from tracing import tracer
+    tracer.reset()
+    yield
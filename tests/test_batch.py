@@ -0,0 +1,74 @@
+import csv
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from batch import ResultWriter, find_resumes, load_jobs, run_batch
+from job_store import JobStore
+
+JOBS = [
+    {"job_id": "1", "title": "Backend Engineer", "company": "Acme", "description": "Python, Django and SQL on AWS."},
+    {"job_id": "2", "title": "Frontend Developer", "company": "Beta", "description": "React and JavaScript web apps."},
+    {"job_id": "3", "title": "Nurse", "company": "Clinic", "description": "Night shifts at a busy clinic."},
+]
+
+
+@pytest.fixture
+def resume_dir(tmp_path):
+    resumes = tmp_path / "resumes"
+    (resumes / "nested").mkdir(parents=True)
+    (resumes / "python.txt").write_text("Python developer with Django, SQL and AWS", encoding="utf-8")
+    (resumes / "nested" / "react.TXT").write_text("React and JavaScript frontend developer", encoding="utf-8")
+    (resumes / "notes.md").write_text("not a resume", encoding="utf-8")
+    return resumes
+
+
+@pytest.fixture
+def jobs_path(tmp_path):
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps(JOBS), encoding="utf-8")
+    return path
+
+
+def test_find_resumes_walks_the_directory(resume_dir):
+    found = [Path(p).relative_to(resume_dir) for p in find_resumes(resume_dir)]
+    assert found == [Path("nested", "react.TXT"), Path("python.txt")]
+
+
+def test_run_batch_ranks_jobs_per_resume(resume_dir, jobs_path, tmp_path):
+    output = tmp_path / "results.jsonl"
+    summary = run_batch(str(resume_dir), str(output), jobs_path=str(jobs_path), workers=1, top_k=2)
+
+    assert summary == {"resumes": 2, "jobs": 3, "rows": 4, "failed": 0}
+    rows = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    best = {os.path.basename(row["resume"]): row for row in rows if row["rank"] == 1}
+    assert best["python.txt"]["job_id"] == "1"
+    assert "python" in best["python.txt"]["matched_skills"]
+    assert best["react.TXT"]["job_id"] == "2"
+
+
+def test_csv_output_joins_skill_lists(resume_dir, jobs_path, tmp_path):
+    output = tmp_path / "results.csv"
+    run_batch(str(resume_dir), str(output), jobs_path=str(jobs_path), workers=1, top_k=0)
+
+    with open(output, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 6
+    assert all(isinstance(row["matched_skills"], str) for row in rows)
+
+
+def test_unsupported_output_format():
+    with pytest.raises(ValueError):
+        ResultWriter("results.xlsx")
+
+
+def test_load_jobs_from_the_store_by_keyword(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    store = JobStore(path)
+    store.upsert_jobs(JOBS[:2], keyword="developer")
+    store.upsert_jobs(JOBS[2:], keyword="nurse")
+    store.close()
+
+    assert [job["job_id"] for job in load_jobs(store_path=path, keyword="nurse")] == ["3"]
@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+
+from browser_pool import BrowserPool
+from conftest import FakeBrowser
+from tracing import tracer
+
+
+@pytest.fixture
+def launched():
+    return []
+
+
+@pytest.fixture
+def pool(launched):
+    def factory():
+        browser = FakeBrowser()
+        launched.append(browser)
+        return browser
+    pool = BrowserPool(size=2, max_uses=3, factory=factory)
+    yield pool
+    pool.close()
+
+
+def test_released_session_is_reused(pool, launched):
+    with pool.browser() as first:
+        first.get("https://www.linkedin.com/jobs/search")
+    with pool.browser() as second:
+        pass
+
+    assert second is first
+    assert first.url == "about:blank"
+    assert len(launched) == 1
+    assert tracer.counters()["browser_launches"] == 1
+
+
+def test_unhealthy_idle_session_is_replaced(pool, launched):
+    with pool.browser() as first:
+        pass
+    first.healthy = False
+
+    with pool.browser() as second:
+        assert second is not first
+    assert first.quit_called
+    assert len(launched) == 2
+    assert tracer.counters()["browser_recycles"] == 1
+
+
+def test_session_broken_during_use_is_not_returned(pool, launched):
+    with pool.browser() as first:
+        first.healthy = False
+    assert first.quit_called
+
+    with pool.browser() as second:
+        assert second is not first
+
+
+def test_session_is_recycled_after_max_uses(pool, launched):
+    for _ in range(3):
+        with pool.browser() as browser:
+            pass
+    assert launched[0].quit_called
+
+    with pool.browser() as browser:
+        assert browser is launched[1]
+
+
+def test_callers_beyond_the_pool_size_wait(pool):
+    first = pool.acquire()
+    second = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.05)
+
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire(timeout=5)))
+    waiter.start()
+    pool.release(first)
+    waiter.join(5)
+
+    assert got == [first]
+    pool.release(second)
+    pool.release(got[0])
+
+
+def test_failed_launch_frees_its_slot():
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("chrome failed to start")
+        return FakeBrowser()
+    pool = BrowserPool(size=1, factory=factory)
+
+    with pytest.raises(RuntimeError):
+        pool.acquire(timeout=1)
+    with pool.browser(timeout=1) as browser:
+        assert isinstance(browser, FakeBrowser)
+    pool.close()
+
+
+def test_warm_launches_idle_sessions(pool, launched):
+    pool.warm()
+    assert len(launched) == 2
+
+    with pool.browser() as browser:
+        assert browser in launched
+    assert len(launched) == 2
+
+
+def test_close_quits_idle_sessions_and_sessions_released_later(pool, launched):
+    idle = pool.acquire()
+    busy = pool.acquire()
+    pool.release(idle)
+    pool.close()
+
+    assert idle.quit_called and not busy.quit_called
+    pool.release(busy)
+    assert busy.quit_called
+    with pytest.raises(RuntimeError):
+        pool.acquire(timeout=1)
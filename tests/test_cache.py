@@ -0,0 +1,115 @@
+import pytest
+
+import scraper
+from cache import TTLCache
+from tracing import tracer
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def timer():
+    return FakeTimer()
+
+
+def test_entries_expire_after_the_ttl(timer):
+    cache = TTLCache(maxsize=4, ttl=10, timer=timer)
+    cache.set("a", 1)
+
+    timer.now += 10
+    assert cache.get("a") == 1
+    assert cache.age("a") == 10
+    timer.now += 0.5
+    assert "a" not in cache
+    assert cache.get("a", "missing") == "missing"
+    # An expired entry is dropped when it is looked up
+    assert len(cache) == 0
+
+
+def test_setting_again_restarts_the_ttl(timer):
+    cache = TTLCache(ttl=10, timer=timer)
+    cache.set("a", 1)
+    timer.now += 8
+    cache.set("a", 2)
+    timer.now += 8
+    assert cache.get("a") == 2
+
+
+def test_least_recently_used_entry_is_evicted(timer):
+    cache = TTLCache(maxsize=2, ttl=None, timer=timer)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_no_ttl_never_expires(timer):
+    cache = TTLCache(ttl=None, timer=timer)
+    cache.set("a", 1)
+    timer.now += 10**9
+    assert cache.get("a") == 1
+
+
+def test_pop_and_clear(timer):
+    cache = TTLCache(timer=timer)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.pop("a") == 1
+    assert cache.pop("a", "gone") == "gone"
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_search_cache_key_normalizes_filters():
+    assert scraper.search_cache_key(" Web  Developer ", 5, job_type=["Full-time", "Contract"], location="") == \
+        scraper.search_cache_key("web developer", 5, job_type=["contract", "FULL-TIME"])
+    assert scraper.search_cache_key("web developer", 5) != scraper.search_cache_key("web developer", 10)
+
+
+@pytest.fixture
+def scrapes(monkeypatch, timer):
+    calls = []
+
+    def stream_job_listings(keyword, n, workers=None, filters=None):
+        calls.append((keyword, n, filters))
+        for i in range(n if keyword != "nothing" else 0):
+            yield {"job_id": str(i), "title": f"Job {i}"}
+
+    monkeypatch.setattr(scraper, "stream_job_listings", stream_job_listings)
+    monkeypatch.setattr(scraper, "search_cache", TTLCache(ttl=60, timer=timer))
+    return calls
+
+
+def test_identical_search_is_served_from_the_cache(scrapes, timer):
+    first = scraper.cached_job_search("developer", 2, location="Remote")
+    first[0]["similarity_score"] = 0.5
+    second = scraper.cached_job_search("Developer", 2, location="remote")
+
+    assert len(scrapes) == 1
+    assert second == [{"job_id": "0", "title": "Job 0"}, {"job_id": "1", "title": "Job 1"}]
+    assert tracer.counters()["search_cache_hits"] == 1
+
+    timer.now += 61
+    scraper.cached_job_search("developer", 2, location="Remote")
+    assert len(scrapes) == 2
+
+
+def test_refresh_scrapes_again(scrapes):
+    scraper.cached_job_search("developer", 2)
+    scraper.cached_job_search("developer", 2, refresh=True)
+    assert len(scrapes) == 2
+
+
+def test_empty_results_are_not_cached(scrapes):
+    assert scraper.cached_job_search("nothing", 2) == []
+    scraper.cached_job_search("nothing", 2)
+    assert len(scrapes) == 2
@@ -0,0 +1,72 @@
+import numpy as np
+
+from dedupe import NUM_PERM, DuplicateGrouper, dedupe_jobs, find_duplicate_clusters, minhash, shingle_hashes
+from description_cleaner import NO_DESCRIPTION
+from tracing import tracer
+
+BASE = (
+    "We are looking for a senior backend engineer to design and build scalable APIs in Python "
+    "and Django, own our PostgreSQL schema, mentor junior developers and improve our CI pipeline. "
+    "You will work closely with product managers and designers in a friendly remote first team."
+)
+REPOST = BASE.replace("friendly remote first team", "friendly and fully remote team")
+OTHER = (
+    "Registered nurse wanted for night shifts on a busy surgical ward. Administer medication, "
+    "monitor patients after operations, keep accurate records and support the families of patients."
+)
+OTHER_REPOST = OTHER.replace("busy surgical ward", "busy surgical ward in Leeds")
+
+
+def test_shingles_and_signatures():
+    assert len(shingle_hashes("one two three four")) == 2
+    assert len(shingle_hashes("just two")) == 1
+    assert len(shingle_hashes("...")) == 0
+    assert minhash("...") is None
+
+    signature = minhash(BASE)
+    assert signature.shape == (NUM_PERM,) and signature.dtype == np.uint32
+    # Case and punctuation don't change the signature
+    assert np.array_equal(signature, minhash(BASE.upper().replace(",", " ")))
+
+
+def test_near_duplicates_are_clustered_transitively_in_input_order():
+    texts = [BASE, OTHER, REPOST, "Completely unrelated text about gardening tools", OTHER_REPOST]
+    assert find_duplicate_clusters(texts) == [[0, 2], [1, 4], [3]]
+
+
+def test_missing_texts_are_never_grouped():
+    assert find_duplicate_clusters([None, "", None, BASE]) == [[0], [1], [2], [3]]
+
+
+def test_threshold_one_only_groups_identical_shingles():
+    assert find_duplicate_clusters([BASE, REPOST, BASE], threshold=1.0) == [[0, 2], [1]]
+
+
+def test_incremental_grouping_matches_grouping_all_at_once():
+    texts = [BASE, OTHER, REPOST, None, OTHER_REPOST, BASE]
+    grouper = DuplicateGrouper()
+    for start in range(0, len(texts), 2):
+        grouper.add(texts[start:start + 2])
+
+    assert len(grouper) == len(texts)
+    assert grouper.clusters() == find_duplicate_clusters(texts)
+
+
+def test_dedupe_jobs_keeps_the_first_posting_with_its_variants():
+    jobs = [
+        {"job_id": "1", "title": "Backend Engineer", "company": "Acme", "description": BASE},
+        {"job_id": "2", "title": "Nurse", "company": "Clinic", "description": OTHER},
+        {"job_id": "3", "title": "Backend Engineer (Remote)", "company": "Acme Jobs", "description": REPOST},
+        {"job_id": "4", "title": "Unknown", "description": NO_DESCRIPTION},
+        {"job_id": "5", "title": "Unknown too", "description": NO_DESCRIPTION},
+    ]
+    grouped = dedupe_jobs(jobs)
+
+    assert [job["job_id"] for job in grouped] == ["1", "2", "4", "5"]
+    assert grouped[0]["variants"] == [{
+        "job_id": "3", "title": "Backend Engineer (Remote)", "company": "Acme Jobs",
+        "location": None, "date_posted": None, "url": None,
+    }]
+    assert all(job["variants"] == [] for job in grouped[1:])
+    assert "variants" not in jobs[0]
+    assert tracer.counters()["duplicates_grouped"] == 1
@@ -0,0 +1,68 @@
+from description_cleaner import (
+    NO_DESCRIPTION, clean_description, clean_descriptions, extract_description, renormalize_store
+)
+
+
+def test_markup_becomes_text_with_line_breaks_and_bullets():
+    markup = (
+        "<p>We&#39;re hiring &amp; growing.</p>"
+        "<p><strong>You   will</strong>:<br>build things</p>"
+        "<ul><li>Python</li><li>SQL &lt;3</li></ul>"
+    )
+    assert clean_description(markup) == "We're hiring & growing.\nYou will:\nbuild things\n\n• Python\n• SQL <3"
+
+
+def test_scripts_styles_and_comments_are_dropped():
+    markup = "<style>p {color: red}</style><p>Hello<!-- hidden --></p><script>alert('<p>x</p>')</script>"
+    assert clean_description(markup) == "Hello"
+
+
+def test_blank_lines_are_collapsed():
+    assert clean_description("<p>One</p><p></p><p> </p><br><br><p>Two</p>") == "One\n\nTwo"
+
+
+def test_stray_angle_bracket_is_kept():
+    assert clean_description("<p>5 < 6</p>") == "5 < 6"
+
+
+def test_non_strings_pass_through():
+    assert clean_description(None) is None
+
+
+def test_extract_description_reads_only_the_first_container():
+    page = (
+        "<html><body><div class='nav'>Menu</div>"
+        '<div class="description show-more-less-html__markup">'
+        "<div><p>Nested <b>div</b></p></div><p>Body</p></div>"
+        '<div class="show-more-less-html__markup">Second</div>'
+        "</body></html>"
+    )
+    markup, text = extract_description(page)
+
+    assert markup == "<div><p>Nested <b>div</b></p></div><p>Body</p>"
+    assert text == "Nested div\nBody"
+
+
+def test_extract_description_without_a_container():
+    assert extract_description("<p>No container here</p>") == (None, "")
+
+
+def test_unclosed_container_runs_to_the_end():
+    markup, text = extract_description('<div class="show-more-less-html__markup"><p>Cut off')
+    assert markup == "<p>Cut off"
+    assert text == "Cut off"
+
+
+def test_empty_descriptions_get_the_placeholder():
+    assert clean_descriptions(["<p>Text</p>", "<p> </p>"]) == ["Text", NO_DESCRIPTION]
+
+
+def test_renormalize_store_recleans_jobs_with_markup(store):
+    store.upsert_jobs([
+        {"job_id": "1", "description": "old text", "description_html": "<ul><li>Python</li></ul>"},
+        {"job_id": "2", "description": "• SQL", "description_html": "<ul><li>SQL</li></ul>"},
+        {"job_id": "3", "description": "imported from JSON"},
+    ])
+
+    assert renormalize_store(store, batch_size=1) == 1
+    assert [job["description"] for job in store.get_jobs(["1", "2", "3"])] == ["• Python", "• SQL", "imported from JSON"]
@@ -0,0 +1,161 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from description_cleaner import NO_DESCRIPTION, renormalize_store
+from hashed_index import HashedIndex, index_store
+from job_search import JobSearchIndex
+from job_store import JobStore
+
+N_FEATURES = 2**12
+
+
+def make_jobs(n):
+    topics = ["python django", "react javascript", "sql postgresql", "java spring", "aws docker",
+              "golang grpc", "swift ios", "scala spark", "php laravel", "ruby rails"]
+    return [
+        {"job_id": str(100 + i), "title": f"Job {i}", "description": f"Engineer {i} using {topics[i % len(topics)]}"}
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def make_index(tmp_path):
+    def make_index(name="index", chunk_size=4):
+        return HashedIndex(str(tmp_path / name), n_features=N_FEATURES, chunk_size=chunk_size)
+    return make_index
+
+
+def assert_same_index(index, expected):
+    assert len(index) == len(expected)
+    assert sorted(index.job_ids) == sorted(expected.job_ids)
+    assert np.array_equal(index.frequencies.counts, expected.frequencies.counts)
+    assert index.search("python django engineer", top_k=3) == pytest.approx(
+        expected.search("python django engineer", top_k=3)
+    )
+
+
+def test_unchanged_jobs_are_not_indexed_again(make_index):
+    index = make_index()
+    assert index.add_jobs(make_jobs(6)) == 6
+    assert index.add_jobs(make_jobs(6)) == 0
+    assert len(index) == 6
+
+
+def test_changed_description_is_reindexed(make_index):
+    jobs = make_jobs(6)
+    index = make_index()
+    index.add_jobs([dict(job, description=NO_DESCRIPTION) if job["job_id"] == "100" else job for job in jobs])
+    assert [job_id for job_id, score in index.search("django") if score] == []
+
+    assert index.add_jobs([jobs[0]]) == 1
+    expected = make_index("expected")
+    expected.add_jobs(jobs)
+    assert_same_index(index, expected)
+    assert index.search("django")[0][0] == "100"
+
+
+def test_repeated_key_in_one_call_keeps_the_last_description(make_index):
+    index = make_index()
+    index.add_jobs([{"job_id": "1", "description": "python"}, {"job_id": "1", "description": "react"}])
+    assert len(index) == 1
+    assert [job_id for job_id, score in index.search("react") if score] == ["1"]
+    assert [job_id for job_id, score in index.search("python") if score] == []
+
+
+def test_small_chunks_are_merged(make_index):
+    jobs = make_jobs(10)
+    index = make_index()
+    for job in jobs:
+        index.add_jobs([job])
+
+    # Without merging there would be one chunk per call
+    assert len(index.chunks) < 6
+    assert sum(2 * chunk["size"] <= 4 for chunk in index.chunks) <= 1
+    assert sum(chunk["size"] for chunk in index.chunks) == 10
+    expected = make_index("expected")
+    expected.add_jobs(jobs)
+    assert_same_index(index, expected)
+
+
+def test_index_reloads_from_disk(make_index):
+    jobs = make_jobs(9)
+    index = make_index()
+    index.add_jobs(jobs)
+    index.add_jobs([dict(jobs[2], description="rust embedded firmware")])
+
+    reopened = make_index()
+    assert reopened.generation == index.generation
+    assert_same_index(reopened, index)
+    assert reopened.add_jobs(jobs[3:]) == 0
+
+
+def test_search_index_picks_up_reindexed_jobs(make_index):
+    jobs = make_jobs(8)
+    index = make_index()
+    index.add_jobs(jobs)
+    search_index = JobSearchIndex(index)
+    assert "101" not in [job_id for job_id, _ in search_index.search("kotlin android")]
+
+    index.add_jobs([dict(jobs[1], description="kotlin android apps")])
+    hits = search_index.search("kotlin android")
+    assert [job_id for job_id, _ in hits] == ["101"]
+    assert len(search_index) == 8
+
+
+def test_index_store_reads_only_updated_jobs(make_index, store):
+    jobs = make_jobs(6)
+    store.upsert_jobs([dict(job, description=NO_DESCRIPTION) if job["job_id"] == "100" else job for job in jobs])
+    index = make_index()
+    assert index_store(store, index) == 6
+    assert index.synced_through is not None
+    # Only the jobs updated in the same second as the last sync are read again, and none changed
+    assert index_store(store, index) == 0
+
+    # A placeholder replaced by the real description is re-indexed
+    store.upsert_jobs([jobs[0]])
+    assert index_store(store, index) == 1
+    assert index.search("django")[0][0] == "100"
+    assert len(index) == 6
+
+
+def test_store_sets_updated_at_only_when_the_description_changes(store):
+    job = make_jobs(1)[0]
+    store.upsert_jobs([job])
+    store.execute("UPDATE jobs SET updated_at = '2000-01-01T00:00:00'")
+
+    store.upsert_jobs([dict(job, description=NO_DESCRIPTION)])
+    store.upsert_jobs([dict(job, title="Renamed")])
+    assert store.get_job(job["job_id"])["updated_at"] == "2000-01-01T00:00:00"
+
+    store.upsert_jobs([dict(job, description="New text")])
+    assert store.get_job(job["job_id"])["updated_at"] > "2000-01-01T00:00:00"
+    assert [j["job_id"] for batch in store.iter_updated("2001-01-01") for j in batch] == [job["job_id"]]
+
+
+def test_old_database_gets_updated_at_from_last_seen(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE jobs (job_id TEXT PRIMARY KEY, title TEXT, company TEXT, location TEXT, date_posted TEXT,"
+        " description TEXT, url TEXT, first_seen TEXT NOT NULL, last_seen TEXT NOT NULL)"
+    )
+    conn.execute("INSERT INTO jobs VALUES ('1', 'Dev', 'Acme', NULL, NULL, 'Python', NULL, '2024-01-01', '2024-02-01')")
+    conn.commit()
+    conn.close()
+
+    with JobStore(path) as store:
+        assert store.get_job("1")["updated_at"] == "2024-02-01"
+
+
+def test_recleaned_descriptions_are_reindexed(make_index, store):
+    store.upsert_jobs([{"job_id": "1", "description": "stale text", "description_html": "<p>Kotlin &amp; Android</p>"}])
+    index = make_index()
+    index_store(store, index)
+    store.execute("UPDATE jobs SET updated_at = '2000-01-01T00:00:00'")
+    index.synced_through = "2000-01-01T00:00:01"
+
+    assert renormalize_store(store) == 1
+    assert index_store(store, index) == 1
+    assert [job_id for job_id, score in index.search("kotlin") if score] == ["1"]
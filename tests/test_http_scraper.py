@@ -0,0 +1,141 @@
+import os
+
+import pytest
+
+from conftest import FIXTURES_DIR
+from description_cleaner import NO_DESCRIPTION
+from http_scraper import parse_job_cards, parse_job_description
+from tracing import tracer
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, "guest_api", name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_parse_job_cards_reads_every_card_field():
+    jobs = parse_job_cards(read_fixture("search-0.html"))
+
+    assert [job["job_id"] for job in jobs] == [
+        "3912345601", "3912345602", "3912345603", "3912345604", "3912345605"
+    ]
+    assert jobs[0] == {
+        "title": "Web Developer",
+        "company": "Acme Corp",
+        "url": "https://www.linkedin.com/jobs/view/web-developer-at-acme-corp-3912345601"
+               "?position=1&pageNum=0&refId=tYc3k0XYwqP2Wm8mG7pz0A%3D%3D&trackingId=5lq0S0bP3qWkM9p1xq8Y2g%3D%3D",
+        "job_id": "3912345601",
+        "location": "New York, NY",
+        "date_posted": "2025-01-06",
+    }
+    # Entities are decoded and whitespace collapsed
+    assert jobs[2]["title"] == "Frontend Engineer (React & TypeScript)"
+
+
+def test_parse_job_cards_takes_the_job_id_of_a_link_card_from_its_url():
+    job = parse_job_cards(read_fixture("search-0.html"))[-1]
+
+    assert job["job_id"] == "3912345605"
+    assert job["company"] == "Hooli"
+    assert job["url"].startswith("https://www.linkedin.com/jobs/view/python-developer-at-hooli-3912345605?")
+
+
+def test_parse_job_cards_skips_a_card_without_a_company():
+    jobs = parse_job_cards(read_fixture("search-5.html"))
+
+    # The last card (3912345608) has an empty company line, as parse_card_metadata would reject
+    assert [job["job_id"] for job in jobs] == ["3912345606", "3912345602", "3912345607"]
+    assert all(job["company"] for job in jobs)
+
+
+def test_parse_job_description_keeps_only_the_description():
+    text = parse_job_description(read_fixture("posting-3912345601.html"))
+
+    assert text.startswith("About the role\nAcme is hiring a web developer")
+    assert "• JavaScript, HTML & CSS" in text
+    assert "• React\nor Vue" in text
+    assert "Salary: $90k–$110k" in text
+    assert "Show more" not in text
+    assert "Seniority level" not in text
+    assert "pageInstance" not in text
+
+
+def test_parse_job_description_of_a_closed_posting():
+    assert parse_job_description(read_fixture("posting-3912345606.html")) == NO_DESCRIPTION
+
+
+def test_search_pages_until_results_run_out(guest_client, guest_server):
+    jobs = guest_client.search("web developer", 20)
+
+    # Five cards on the first page, three on the next (one repeated), then HTTP 400
+    assert [job["job_id"] for job in jobs] == [
+        "3912345601", "3912345602", "3912345603", "3912345604", "3912345605", "3912345606", "3912345607"
+    ]
+    assert [job["search_rank"] for job in jobs] == [1, 2, 3, 4, 5, 6, 8]
+    searches = [path for path in guest_server.requests if "/search?" in path]
+    assert [path.rsplit("start=", 1)[1] for path in searches] == ["0", "5", "8"]
+
+
+def test_search_fetches_descriptions(guest_client):
+    jobs = {job["job_id"]: job for job in guest_client.search("web developer", 7)}
+
+    assert "• Kubernetes & Docker" in jobs["3912345602"]["description"]
+    assert "show-more-less-html__markup" not in jobs["3912345602"]["description_html"]
+    assert "<li>Python</li>" in jobs["3912345602"]["description_html"]
+    assert jobs["3912345606"]["description"] == NO_DESCRIPTION
+    assert "description_html" not in jobs["3912345606"]
+
+
+def test_search_stops_at_n_jobs(guest_client, guest_server):
+    jobs = guest_client.search("web developer", 3)
+
+    assert len(jobs) == 3
+    assert len([path for path in guest_server.requests if "/search?" in path]) == 1
+    assert len([path for path in guest_server.requests if "/jobPosting/" in path]) == 3
+
+
+def test_search_reuses_stored_descriptions(guest_client, guest_server, store):
+    store.upsert_jobs(guest_client.search("web developer", 2))
+    guest_server.requests.clear()
+
+    jobs = guest_client.search("web developer", 3, store=store)
+
+    assert len(jobs) == 3
+    assert [path for path in guest_server.requests if "/jobPosting/" in path] == [
+        "/jobs-guest/jobs/api/jobPosting/3912345603"
+    ]
+    assert tracer.counters()["descriptions_reused"] == 2
+
+
+def test_rate_limited_requests_are_retried(guest_client, guest_server, backoff_sleeps):
+    guest_server.failures = {"/jobs-guest/jobs/api/seeMoreJobPostings/search": 2, "/jobs-guest/jobs/api/jobPosting/": 1}
+
+    jobs = guest_client.search("web developer", 1)
+
+    assert jobs[0]["description"].startswith("About the role")
+    assert tracer.counters()["http_retries"] == 3
+    # The first retry of a request is immediate, the second backs off
+    assert backoff_sleeps == [1.0]
+
+
+def test_first_search_page_failing_after_retries_raises(guest_client, guest_server, backoff_sleeps):
+    guest_server.failures = {"/jobs-guest/jobs/api/seeMoreJobPostings/search": 10}
+
+    with pytest.raises(Exception):
+        guest_client.search("web developer", 5)
+    # The first attempt and three retries
+    assert len(guest_server.requests) == 4
+    assert backoff_sleeps == [1.0, 2.0]
+
+
+def test_description_failing_after_retries_falls_back_to_placeholder(guest_client, guest_server, backoff_sleeps):
+    guest_server.failures = {"/jobs-guest/jobs/api/jobPosting/3912345601": 10}
+
+    jobs = guest_client.search("web developer", 2)
+
+    assert jobs[0]["description"] == NO_DESCRIPTION
+    assert jobs[1]["description"].startswith("Design and run backend services")
+
+
+def test_missing_posting_falls_back_to_placeholder(guest_client):
+    assert guest_client.fetch_description({"job_id": "1"}) == NO_DESCRIPTION
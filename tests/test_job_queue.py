@@ -0,0 +1,150 @@
+import threading
+import time
+
+import pytest
+
+import job_queue
+from job_queue import CANCELLED, DONE, FAILED, QUEUED, RUNNING, ScrapeQueue
+
+
+def make_job(i):
+    return {"job_id": str(1000 + i), "title": f"Developer {i}", "company": "Acme", "description": f"Job {i}"}
+
+
+class FakeSearch:
+    """Stands in for stream_cached_job_search; each job waits for a release"""
+    def __init__(self, n_jobs=5, fail_after=None):
+        self.n_jobs = n_jobs
+        self.fail_after = fail_after
+        self.release = threading.Semaphore(0)
+        self.calls = []
+        self.closed = threading.Event()
+
+    def __call__(self, keyword, n, refresh=False, workers=None, **filters):
+        self.calls.append((keyword, n, filters))
+        try:
+            for i in range(min(n, self.n_jobs)):
+                if i == self.fail_after:
+                    raise RuntimeError("browser crashed")
+                # Never blocks past a test, so worker threads can always exit
+                if not self.release.acquire(timeout=5):
+                    return
+                yield make_job(i)
+        finally:
+            self.closed.set()
+
+
+@pytest.fixture
+def search(monkeypatch):
+    search = FakeSearch()
+    monkeypatch.setattr(job_queue, "stream_cached_job_search", search)
+    return search
+
+
+@pytest.fixture
+def queue(store, search):
+    queue = ScrapeQueue(store=store, max_workers=1)
+    yield queue
+    # Let running tasks finish while the fake search is still in place
+    search.release.release(100)
+    queue.shutdown()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_task_runs_to_completion(queue, search):
+    task_id = queue.submit("web developer", 3, location="Remote")
+    search.release.release(3)
+    wait_for(lambda: queue.status(task_id)["status"] == DONE)
+
+    task = queue.status(task_id)
+    assert task["progress"] == 3
+    assert task["result_ids"] == ["1000", "1001", "1002"]
+    assert search.calls == [("web developer", 3, {"location": "Remote"})]
+    assert [job["job_id"] for job in queue.result(task_id)] == ["1000", "1001", "1002"]
+
+
+def test_result_returns_only_jobs_after_start(queue, search):
+    task_id = queue.submit("web developer", 5)
+    search.release.release(2)
+    wait_for(lambda: queue.status(task_id)["progress"] == 2)
+
+    assert queue.status(task_id)["status"] == RUNNING
+    assert [job["job_id"] for job in queue.result(task_id)] == ["1000", "1001"]
+    assert [job["job_id"] for job in queue.result(task_id, start=1)] == ["1001"]
+    assert queue.result(task_id, start=2) == []
+
+
+def test_cancel_stops_a_running_task_and_closes_its_scrape(queue, search):
+    task_id = queue.submit("web developer", 5)
+    search.release.release()
+    wait_for(lambda: queue.status(task_id)["progress"] == 1)
+
+    assert queue.cancel(task_id)
+    # The job being scraped when the task was cancelled is still kept
+    search.release.release()
+    wait_for(lambda: queue.status(task_id)["status"] == CANCELLED)
+
+    assert search.closed.is_set()
+    assert queue.status(task_id)["result_ids"] == ["1000", "1001"]
+    assert not queue.cancel(task_id)
+
+
+def test_cancel_a_queued_task(queue, search):
+    running = queue.submit("web developer", 1)
+    queued = queue.submit("data scientist", 1)
+    assert queue.status(queued)["status"] == QUEUED
+
+    assert queue.cancel(queued)
+    assert queue.status(queued)["status"] == CANCELLED
+
+    search.release.release()
+    wait_for(lambda: queue.status(running)["status"] == DONE)
+    # The cancelled task never starts scraping
+    assert [call[0] for call in search.calls] == ["web developer"]
+    assert queue.status(queued)["status"] == CANCELLED
+
+
+def test_identical_search_joins_the_active_task(queue, search):
+    first = queue.submit("Web  Developer", 2)
+    assert queue.submit("web developer", 2) == first
+    assert queue.submit("web developer", 2, refresh=True) != first
+
+
+def test_failed_scrape_is_reported(queue, search):
+    search.fail_after = 1
+    task_id = queue.submit("web developer", 3)
+    search.release.release()
+    wait_for(lambda: queue.status(task_id)["status"] == FAILED)
+
+    assert queue.status(task_id)["error"] == "browser crashed"
+
+
+def test_results_of_evicted_tasks_are_read_from_the_store(queue, search, store, monkeypatch):
+    monkeypatch.setattr(job_queue, "MAX_RESULTS_IN_MEMORY", 0)
+    task_id = queue.submit("web developer", 2)
+    search.release.release(2)
+    wait_for(lambda: queue.status(task_id)["status"] == DONE)
+    store.upsert_jobs([make_job(0), make_job(1)])
+
+    assert [job["job_id"] for job in queue.result(task_id, start=1)] == ["1001"]
+
+
+def test_restart_marks_unfinished_tasks_failed(queue, search, store):
+    running = queue.submit("web developer", 1)
+    queued = queue.submit("data scientist", 1)
+    wait_for(lambda: queue.status(running)["status"] == RUNNING)
+
+    restarted = ScrapeQueue(store=store, max_workers=1)
+    try:
+        for task_id in (running, queued):
+            task = restarted.status(task_id)
+            assert task["status"] == FAILED
+            assert task["error"] == "Interrupted by a restart"
+    finally:
+        restarted.shutdown()
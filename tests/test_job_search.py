@@ -0,0 +1,77 @@
+import pytest
+
+from hashed_index import HashedIndex
+from job_search import JobSearchIndex, search_job_history, skill_coverage
+from resume_matcher import SKILL_EXTRACTOR, get_resume_profile
+
+RESUME = "Python developer: Django, SQL and AWS, some React"
+
+JOBS = [
+    {"job_id": "1", "title": "Backend", "description": "Python and Django APIs with SQL, deployed on AWS."},
+    {"job_id": "2", "title": "Frontend", "description": "React and TypeScript single page applications."},
+    {"job_id": "3", "title": "Data", "description": "SQL reporting in Excel and Tableau for finance."},
+    {"job_id": "4", "title": "Nurse", "description": "Night shifts at a busy clinic, patient care."},
+    {"job_id": "5", "title": "Backend (repost)", "description": "Python and Django APIs with SQL, deployed on AWS."},
+]
+
+
+@pytest.fixture
+def search_index(tmp_path):
+    return JobSearchIndex(HashedIndex(str(tmp_path / "index"), n_features=2**14, chunk_size=2))
+
+
+@pytest.fixture
+def filled_store(store):
+    store.upsert_jobs(JOBS)
+    return store
+
+
+def test_skill_coverage_lifts_a_job_over_slightly_higher_similarity(store, search_index):
+    store.upsert_jobs([
+        {"job_id": "1", "title": "Backend", "description": (
+            "Python developer and Django developer for SQL work with Java, Kubernetes, Docker and Terraform."
+        )},
+        {"job_id": "2", "title": "Backend", "description": "Django and SQL services deployed on AWS."},
+    ])
+    profile = get_resume_profile(RESUME)
+    results = search_job_history(profile, store, search_index, top_k=2, group_duplicates=False)
+    hits = dict(search_index.search(profile, 2))
+
+    # Job 1 is closer as text but the resume covers only 3 of its 7 skills, against all of job 2's
+    assert hits["1"] > hits["2"]
+    assert [job["job_id"] for job in results] == ["2", "1"]
+    assert [job["similarity_score"] for job in results] == [hits["2"], hits["1"]]
+    assert [skill_coverage(job) for job in results] == [1.0, 3 / 7]
+
+
+def test_results_list_matched_and_missing_skills(filled_store, search_index):
+    profile = get_resume_profile(RESUME)
+    results = search_job_history(profile, filled_store, search_index, top_k=5, group_duplicates=False)
+
+    for job in results:
+        job_skills = SKILL_EXTRACTOR.extract(job["description"])
+        assert sorted(job["matched_skills"]) == sorted(job_skills & profile.skills)
+        assert sorted(job["missing_skills"]) == sorted(job_skills - profile.skills)
+
+
+def test_duplicates_are_grouped_before_taking_top_k(filled_store, search_index):
+    results = search_job_history(RESUME, filled_store, search_index, top_k=2)
+
+    assert len(results) == 2
+    assert results[0]["job_id"] in ("1", "5")
+    assert [variant["job_id"] for variant in results[0]["variants"]] == [
+        job_id for job_id in ("1", "5") if job_id != results[0]["job_id"]
+    ]
+    assert "5" not in [job["job_id"] for job in results[1:]]
+
+
+def test_changed_description_is_searched_again(filled_store, search_index):
+    search_job_history(RESUME, filled_store, search_index)
+    filled_store.upsert_jobs([dict(JOBS[3], description="Kotlin and Android mobile apps")])
+
+    results = search_job_history("Kotlin Android developer", filled_store, search_index, top_k=1)
+    assert [job["job_id"] for job in results] == ["4"]
+
+
+def test_blank_resume_finds_nothing(filled_store, search_index):
+    assert search_job_history("", filled_store, search_index) == []
@@ -0,0 +1,94 @@
+from description_cleaner import NO_DESCRIPTION
+from job_store import UNKNOWN_POSTED_DATE, job_key
+
+JOBS = [
+    {"job_id": "1", "title": "Web Developer", "company": "Acme", "location": "New York, NY",
+     "date_posted": "2025-01-06", "description": "React and CSS"},
+    {"job_id": "2", "title": "Backend Engineer", "company": "ACME", "location": "Remote",
+     "date_posted": "2025-01-10", "description": "Python and SQL"},
+    {"job_id": "3", "title": "Data Analyst", "company": "Globex", "location": "New York City",
+     "date_posted": UNKNOWN_POSTED_DATE, "description": "Excel"},
+    {"job_id": "4", "title": "Nurse", "company": "Clinic", "location": "Newark, NJ",
+     "date_posted": "2024-12-20", "description": "Night shifts"},
+]
+
+
+def ids(jobs):
+    return [job["job_id"] for job in jobs]
+
+
+def test_upsert_replaces_the_row_and_bumps_updated_at(store):
+    store.upsert_jobs([JOBS[0]])
+    store.execute("UPDATE jobs SET first_seen = '2000-01-01T00:00:00', updated_at = '2000-01-01T00:00:00'")
+
+    store.upsert_jobs([dict(JOBS[0], title="Senior Web Developer", description="React, CSS and Node.js")])
+
+    job = store.get_job("1")
+    assert store.count() == 1
+    assert job["title"] == "Senior Web Developer"
+    assert job["description"] == "React, CSS and Node.js"
+    assert job["first_seen"] == "2000-01-01T00:00:00"
+    assert job["updated_at"] > "2000-01-01T00:00:00"
+
+
+def test_placeholder_or_missing_description_keeps_the_stored_one(store):
+    store.upsert_jobs([JOBS[0]])
+    store.upsert_jobs([dict(JOBS[0], description=NO_DESCRIPTION)])
+    store.upsert_jobs([dict(JOBS[0], description=None)])
+    assert store.get_job("1")["description"] == "React and CSS"
+
+    # With nothing stored yet, the placeholder is kept
+    store.upsert_jobs([dict(JOBS[1], description=NO_DESCRIPTION)])
+    assert store.get_job("2")["description"] == NO_DESCRIPTION
+
+
+def test_job_without_an_id_is_keyed_by_its_content(store):
+    job = {"title": "Web Developer", "company": "Acme", "description": "React"}
+    store.upsert_jobs([job, dict(job)])
+
+    assert store.count() == 1
+    assert job_key(job).startswith("sha1:")
+    assert store.get_job(job_key(job))["title"] == "Web Developer"
+
+
+def test_query_filters(store):
+    store.upsert_jobs(JOBS)
+
+    assert ids(store.query(company="acme")) == ["2", "1"]
+    assert ids(store.query(location="New York")) == ["1", "3"]
+    assert ids(store.query(location="New%")) == []
+    assert ids(store.query(limit=2, offset=1)) == ["1", "4"]
+
+
+def test_jobs_without_a_posting_date_sort_last_and_never_match_posted_since(store):
+    store.upsert_jobs(JOBS + [{"job_id": "5", "title": "Porter", "description": "Lifting"}])
+
+    jobs = ids(store.query())
+    assert jobs[:3] == ["2", "1", "4"]
+    assert sorted(jobs[3:]) == ["3", "5"]
+    assert ids(store.query(posted_since="2025-01-01")) == ["2", "1"]
+
+
+def test_query_by_keyword_joins_the_keywords_each_job_was_found_with(store):
+    store.upsert_jobs(JOBS[:2], keyword="Developer")
+    store.upsert_jobs(JOBS[1:3], keyword="  python   developer ")
+
+    assert ids(store.query(keyword="developer")) == ["2", "1"]
+    assert ids(store.query(keyword="Python Developer")) == ["2", "3"]
+    assert ids(store.query(keyword="python developer", company="Globex")) == ["3"]
+    assert store.query(keyword="nurse") == []
+
+
+def test_known_descriptions_only_for_unchanged_postings(store):
+    store.upsert_jobs(JOBS)
+    store.upsert_jobs([dict(JOBS[3], job_id="5", description=NO_DESCRIPTION)])
+
+    cards = [
+        {key: job[key] for key in ("job_id", "title", "company", "location", "date_posted")} for job in JOBS
+    ]
+    cards[1]["date_posted"] = "2025-01-11"
+    cards.append(dict(cards[3], job_id="5"))
+    cards.append(dict(cards[0], job_id="6"))
+
+    # Job 2 was reposted, job 5 has only the placeholder and job 6 is new
+    assert store.known_descriptions(cards + [None]) == {"1": "React and CSS", "3": "Excel", "4": "Night shifts"}
@@ -0,0 +1,117 @@
+import pytest
+from sklearn.metrics.pairwise import cosine_similarity
+
+import resume_matcher
+from cache import TTLCache
+from resume_matcher import (
+    SKILL_EXTRACTOR, SKILL_SET, BatchResumeMatcher, IncrementalMatcher, ResumeMatcher, ResumeProfile,
+    SkillExtractor, as_resume_profile, get_resume_profile, iter_match_results
+)
+from tracing import tracer
+
+RESUME = "Python developer with React, SQL and AWS experience building web applications"
+
+JOBS = [
+    {"description": "Backend engineer: Python, Django and PostgreSQL services on AWS."},
+    {"description": "Frontend developer building React applications with TypeScript and CSS."},
+    {"description": "Data analyst using SQL and Excel to report on sales."},
+    {"description": "Nurse needed for night shifts at a busy clinic."},
+]
+
+# Worded so that no skill appears inside a longer word, where the substring loop matches and the extractor doesn't
+POSTING = (
+    "Senior engineer (Python, Flask, SQL) to build REST APIs and microservices on AWS with Docker and "
+    "Kubernetes. You will own our CI/CD pipeline, mentor juniors and care about HIPAA Compliance, "
+    "Stakeholder Management and Agile Methodologies. Bonus: C++, C#, Node.js, HTML/CSS and Machine Learning."
+)
+
+
+def test_skills_with_punctuation_are_found():
+    assert SKILL_EXTRACTOR.extract("C++ and C#, some Node.js; HTML/CSS.") == {"c++", "c#", "node.js", "html/css"}
+
+
+def test_skills_must_sit_on_word_boundaries():
+    assert SKILL_EXTRACTOR.extract("JavaScript at Google with PySpark") == {"javascript", "pyspark"}
+    assert SKILL_EXTRACTOR.extract("Java, Go and Spark") == {"java", "go", "spark"}
+
+
+def test_overlapping_skills_are_all_found():
+    assert SKILL_EXTRACTOR.find("Knows HIPAA  Compliance") == [
+        ("hipaa compliance", 6, 23), ("compliance", 13, 23)
+    ]
+    assert SKILL_EXTRACTOR.extract("machine\n learning") == {"machine learning"}
+
+
+def test_extractor_agrees_with_the_substring_loop_it_replaced():
+    assert SKILL_EXTRACTOR.extract(POSTING) == {skill.lower() for skill in SKILL_SET if skill.lower() in POSTING.lower()}
+    assert SKILL_EXTRACTOR.extract(", ".join(SKILL_SET)) == {skill.lower() for skill in SKILL_SET}
+
+
+def test_only_the_longest_skill_starting_at_a_word_is_reported():
+    # No SKILL_SET entry is a whole-word prefix of another, so this never differs from the substring loop there
+    assert SkillExtractor(["Data Science", "Data"]).extract("data  science, data") == {"data", "data science"}
+    assert SkillExtractor(["Data Science", "Data"]).find("data science") == [("data science", 0, 12)]
+
+
+def test_incremental_scores_equal_batch_scores_over_the_same_jobs():
+    incremental = IncrementalMatcher(RESUME).match_jobs(JOBS)
+    batch = BatchResumeMatcher([job["description"] for job in JOBS]).match_resume(RESUME)
+
+    for streamed, final in zip(incremental, batch):
+        assert streamed["similarity_score"] == pytest.approx(final["similarity_score"])
+        assert sorted(streamed["matched_skills"]) == sorted(final["matched_skills"])
+        assert sorted(streamed["missing_skills"]) == sorted(final["missing_skills"])
+
+
+def test_streamed_scores_share_idf_across_jobs():
+    matcher = IncrementalMatcher(RESUME)
+    streamed = [result for _, result in iter_match_results(JOBS, RESUME, matcher)]
+    final = BatchResumeMatcher([job["description"] for job in JOBS]).match_resume(RESUME)
+
+    assert matcher.n_docs == len(JOBS) + 1
+    # The last job is scored with the IDF of the whole set
+    assert streamed[-1]["similarity_score"] == pytest.approx(final[-1]["similarity_score"])
+    ranking = sorted(range(len(JOBS)), key=lambda i: -streamed[i]["similarity_score"])
+    assert ranking == sorted(range(len(JOBS)), key=lambda i: -final[i]["similarity_score"])
+
+
+def test_blank_resume_or_description_scores_zero():
+    assert IncrementalMatcher("").match_jobs(JOBS)[0]["similarity_score"] == 0.0
+    assert IncrementalMatcher(RESUME).match_jobs([{"description": "the and of"}])[0]["similarity_score"] == 0.0
+
+
+@pytest.fixture
+def profile_cache(monkeypatch):
+    cache = TTLCache(maxsize=4, ttl=None)
+    monkeypatch.setattr(resume_matcher, "_profile_cache", cache)
+    return cache
+
+
+def test_same_resume_text_returns_the_cached_profile(profile_cache):
+    profile = get_resume_profile(RESUME)
+
+    # Whitespace differences don't make it another resume
+    assert get_resume_profile("  " + RESUME.replace(" ", "\n ")) is profile
+    assert as_resume_profile(RESUME) is profile
+    assert as_resume_profile(profile) is profile
+    assert tracer.counters()["profile_cache_hits"] == 2
+    assert get_resume_profile(RESUME + " and Docker") is not profile
+    assert len(profile_cache) == 2
+
+
+def test_scores_from_a_profile_match_scores_from_the_text(profile_cache):
+    profile = ResumeProfile(RESUME)
+    descriptions = [job["description"] for job in JOBS]
+
+    for description in descriptions:
+        matcher = ResumeMatcher(description)
+        from_profile = matcher.match_resume(profile)
+        from_text = matcher.match_resume(RESUME)
+        assert from_profile["similarity_score"] == pytest.approx(from_text["similarity_score"])
+        assert sorted(from_profile["matched_skills"]) == sorted(from_text["matched_skills"])
+        # And both match what the vectorizer itself makes of the text
+        expected = cosine_similarity(matcher.job_tfidf, matcher.vectorizer.transform([RESUME]))[0][0]
+        assert from_profile["similarity_score"] == pytest.approx(expected)
+
+    batch = BatchResumeMatcher(descriptions)
+    assert batch.match_resume(profile) == batch.match_resume(RESUME)
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from scrape_checkpoint import ScrapeCheckpoint, scrape_to_ndjson
+
+
+@pytest.fixture
+def scrape(browser_pool, store, tmp_path):
+    path = str(tmp_path / "jobs.ndjson")
+
+    def scrape(n, resume=False, keyword="developer"):
+        return scrape_to_ndjson(keyword, n, path, resume=resume, store=store, pool=browser_pool,
+                                workers=1, backend="selenium")
+    scrape.path = path
+    return scrape
+
+
+def written_ids(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["job_id"] for line in f]
+
+
+def expected_ids(n):
+    return [str(1000000 + i) for i in range(n)]
+
+
+def test_scrape_writes_jobs_and_a_complete_checkpoint(scrape):
+    assert scrape(4) == {"jobs": 4, "new": 4, "resumed": False}
+
+    assert written_ids(scrape.path) == expected_ids(4)
+    state = ScrapeCheckpoint(scrape.path).load()
+    assert state["written"] == 4
+    assert (state["page"], state["card"]) == (0, 3)
+    assert state["complete"]
+
+
+def test_resume_carries_on_after_the_last_job(scrape):
+    scrape(3)
+
+    assert scrape(6, resume=True) == {"jobs": 6, "new": 3, "resumed": True}
+    assert written_ids(scrape.path) == expected_ids(6)
+
+
+def test_resume_drops_a_partly_written_line(scrape):
+    scrape(3)
+    with open(scrape.path, "a", encoding="utf-8") as f:
+        f.write('{"job_id": "10000')
+
+    assert scrape(5, resume=True)["new"] == 2
+    assert written_ids(scrape.path) == expected_ids(5)
+
+
+def test_resume_checks_the_file_rather_than_trusting_the_checkpoint(scrape):
+    scrape(4)
+    # The file lost its last two jobs after the checkpoint counted them
+    with open(scrape.path, encoding="utf-8") as f:
+        lines = f.readlines()
+    with open(scrape.path, "w", encoding="utf-8") as f:
+        f.writelines(lines[:2])
+
+    assert scrape(4, resume=True) == {"jobs": 4, "new": 2, "resumed": True}
+    assert written_ids(scrape.path) == expected_ids(4)
+
+
+def test_resume_of_a_full_file_scrapes_nothing(scrape):
+    scrape(3)
+
+    assert scrape(3, resume=True) == {"jobs": 3, "new": 0, "resumed": True}
+    assert written_ids(scrape.path) == expected_ids(3)
+
+
+@pytest.mark.parametrize("checkpoint", [None, "other search"])
+def test_resume_never_overwrites_a_file_without_its_checkpoint(scrape, checkpoint):
+    if checkpoint:
+        scrape(2, keyword="data scientist")
+    else:
+        with open(scrape.path, "w", encoding="utf-8") as f:
+            f.write('{"job_id": "1"}\n')
+    with open(scrape.path, encoding="utf-8") as f:
+        before = f.read()
+
+    with pytest.raises(FileExistsError):
+        scrape(3, resume=True)
+    with open(scrape.path, encoding="utf-8") as f:
+        assert f.read() == before
+
+
+def test_without_resume_the_file_is_started_over(scrape):
+    scrape(3)
+
+    assert scrape(2) == {"jobs": 2, "new": 2, "resumed": False}
+    assert written_ids(scrape.path) == expected_ids(2)
@@ -0,0 +1,130 @@
+import pytest
+
+import http_scraper
+import scraper
+from tracing import tracer
+
+
+def test_serial_scrape_clicks_cards_by_position(browser_pool, store):
+    jobs = list(scraper.iter_jobs_serial(browser_pool, "developer", 3, store))
+
+    assert [job["job_id"] for job in jobs] == ["1000000", "1000001", "1000002"]
+    assert [job["search_rank"] for job in jobs] == [1, 2, 3]
+    assert jobs[1]["description_html"] == "<p>Card 1 &amp; more</p><ul><li>Python</li></ul>"
+
+
+def test_serial_scrape_counts_each_filtered_card(browser_pool, store):
+    # Cards already stored are reused rather than clicked, and are not filtered
+    known = list(scraper.iter_jobs_serial(browser_pool, "developer", 12, store))
+    store.upsert_jobs([scraper.finish_description(job) for job in known])
+    tracer.reset()
+
+    jobs = list(scraper.iter_jobs_serial(
+        browser_pool, "developer", 25, store, filters={"job_type": ["Developer 3", "Developer 20"]}, start=2
+    ))
+
+    assert [job["title"] for job in jobs] == ["Developer 3", "Developer 20"]
+    counters = tracer.counters()
+    assert counters["descriptions_reused"] == 1
+    # Cards from index 2 to the end of the page (30 cards), except the two that match
+    assert counters["cards_filtered"] == 26
+
+
+def test_serial_scrape_skips_excluded_cards_without_counting_them(browser_pool):
+    jobs = list(scraper.iter_jobs_serial(browser_pool, "developer", 3, exclude={"1000000", "1000002"}))
+
+    assert [job["job_id"] for job in jobs] == ["1000001", "1000003", "1000004"]
+    assert "cards_filtered" not in tracer.counters()
+
+
+def test_parallel_scrape_yields_jobs_in_result_order(browser_pool, store):
+    jobs = list(scraper.iter_jobs_parallel(browser_pool, "developer", 30, 2, store))
+
+    assert [job["search_rank"] for job in jobs] == list(range(1, 31))
+    assert jobs[-1]["description_html"] == "<p>Page 1000029</p>"
+
+
+class WorkerKilled(BaseException):
+    """Escapes the workers' exception handling, like a thread dying mid-job"""
+
+
+def test_parallel_scrape_does_not_wait_forever_for_a_dead_worker(browser_pool, monkeypatch):
+    monkeypatch.setattr(scraper, "WORKER_POLL_INTERVAL", 0.05)
+    fetch_job_description = scraper.fetch_job_description
+
+    def dies_on_job_4(browser, url):
+        if url.endswith("-1000004"):
+            raise WorkerKilled()
+        return fetch_job_description(browser, url)
+    monkeypatch.setattr(scraper, "fetch_job_description", dies_on_job_4)
+
+    jobs = list(scraper.iter_jobs_parallel(browser_pool, "developer", 10, 2))
+
+    assert [job["search_rank"] for job in jobs] == list(range(1, 11))
+    # The dead worker had jobs 4, 6 and 8 left; the other worker finished its share
+    lost = [job["job_id"] for job in jobs if job.get("description") == scraper.NO_DESCRIPTION]
+    assert lost == ["1000004", "1000006", "1000008"]
+    assert jobs[9]["description_html"] == "<p>Page 1000009</p>"
+    assert tracer.counters()["descriptions_lost"] == 3
+
+
+@pytest.fixture
+def http_backend(monkeypatch, guest_client):
+    """Point the HTTP backend of stream_job_listings at the local guest API server"""
+    def iter_jobs_http(keyword, n, **kwargs):
+        return http_scraper.iter_jobs_http(keyword, n, client=guest_client, **kwargs)
+    monkeypatch.setattr(scraper, "iter_jobs_http", iter_jobs_http)
+
+
+def stream(browser_pool, store, n, **kwargs):
+    return list(scraper.stream_job_listings("web developer", n, store, browser_pool, workers=1, backend="http", **kwargs))
+
+
+def test_http_results_that_are_all_filtered_out_do_not_fall_back(http_backend, browser_pool, store):
+    assert stream(browser_pool, store, 5, filters={"job_type": ["Astronaut"]}) == []
+    assert tracer.counters()["cards_filtered"] == 7
+    assert "http_fallbacks" not in tracer.counters()
+
+
+def test_resumed_http_search_past_the_last_page_does_not_fall_back(http_backend, browser_pool, store):
+    # A resumed run that had already read every result
+    assert stream(browser_pool, store, 5, start=8) == []
+    assert "http_fallbacks" not in tracer.counters()
+
+
+def test_fewer_http_results_than_asked_for_do_not_fall_back(http_backend, browser_pool, store):
+    jobs = stream(browser_pool, store, 20)
+
+    assert len(jobs) == 7
+    assert "http_fallbacks" not in tracer.counters()
+
+
+def test_failed_http_search_falls_back_to_the_browser(http_backend, guest_server, browser_pool, store, backoff_sleeps):
+    guest_server.failures = {http_scraper.SEARCH_PATH: 10}
+    jobs = stream(browser_pool, store, 3)
+
+    assert [job["job_id"] for job in jobs] == ["1000000", "1000001", "1000002"]
+    assert tracer.counters()["http_fallbacks"] == 1
+
+
+def test_http_search_without_job_cards_falls_back_to_the_browser(http_backend, guest_client, browser_pool, store,
+                                                                 monkeypatch):
+    # e.g. LinkedIn changed its card markup
+    monkeypatch.setattr(guest_client, "search_page", lambda keyword, start, params: [])
+
+    assert len(stream(browser_pool, store, 2)) == 2
+    assert tracer.counters()["http_fallbacks"] == 1
+
+
+def test_browser_scrapes_the_rest_after_a_partial_http_failure(monkeypatch, browser_pool, store):
+    def iter_jobs_http(keyword, n, **kwargs):
+        yield {"job_id": "1000000", "title": "Developer 0", "description": "Scraped over HTTP"}
+        raise ConnectionError("connection reset")
+    monkeypatch.setattr(scraper, "iter_jobs_http", iter_jobs_http)
+
+    jobs = stream(browser_pool, store, 3)
+
+    # The job already scraped over HTTP isn't scraped again
+    assert [job["job_id"] for job in jobs] == ["1000000", "1000001", "1000002"]
+    assert jobs[0]["description"] == "Scraped over HTTP"
+    assert tracer.counters()["http_fallbacks"] == 1
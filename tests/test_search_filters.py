@@ -0,0 +1,44 @@
+from search_filters import card_matches, search_params
+
+
+def test_known_labels_are_pushed_down_together():
+    params, card_filters = search_params(experience_level=["Entry level", "Mid-Senior level"], job_type="Full-time")
+
+    assert params == {"f_E": "2,4", "f_JT": "F"}
+    assert card_filters == {}
+
+
+def test_one_unknown_label_keeps_the_whole_filter_on_the_cards():
+    params, card_filters = search_params(experience_level=["Entry level", "Senior"], job_type=["Contract"])
+
+    # Sending f_E=2 would drop the "Senior" jobs the OR of both labels should keep
+    assert "f_E" not in params
+    assert params["f_JT"] == "C"
+    assert card_filters == {"experience_level": ["Entry level", "Senior"]}
+
+
+def test_card_filter_keeps_or_semantics_within_a_dimension():
+    _, card_filters = search_params(experience_level=["Entry level", "Senior"])
+
+    assert card_matches({"title": "Senior Python Developer"}, card_filters)
+    assert card_matches({"title": "Entry Level Analyst"}, card_filters)
+    assert not card_matches({"title": "Python Developer"}, card_filters)
+
+
+def test_card_filters_and_across_dimensions():
+    _, card_filters = search_params(experience_level=["Senior"], job_type=["Remote", "Freelance"])
+
+    assert card_matches({"title": "Senior Developer (Remote)"}, card_filters)
+    assert not card_matches({"title": "Senior Developer"}, card_filters)
+    assert not card_matches({"title": "Freelance Developer"}, card_filters)
+
+
+def test_labels_are_normalized_and_deduplicated():
+    params, _ = search_params(job_type=["full-TIME", " Full-time ", "Part-time"])
+    assert params == {"f_JT": "F,P"}
+
+
+def test_location():
+    assert search_params(location="  New   York ")[0] == {"location": "New York"}
+    assert search_params(location="Remote")[0] == {"f_WT": "2"}
+    assert search_params() == ({}, {})
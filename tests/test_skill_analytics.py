@@ -0,0 +1,75 @@
+import numpy as np
+
+from description_cleaner import NO_DESCRIPTION
+from skill_analytics import SKILL_COLUMNS, SKILL_NAMES, SkillMatrix, update_from_store
+
+JOBS = [
+    {"job_id": "1", "title": "Backend", "description": "Python, Django and SQL on AWS."},
+    {"job_id": "2", "title": "Frontend", "description": "React and JavaScript."},
+    {"job_id": "3", "title": "Data", "description": NO_DESCRIPTION},
+]
+
+
+def demand(skill_matrix, skill):
+    return int(skill_matrix.demand()[SKILL_COLUMNS[skill]])
+
+
+def test_jobs_are_added_once():
+    skill_matrix = SkillMatrix()
+    assert skill_matrix.add_jobs(JOBS) == 3
+    assert skill_matrix.add_jobs(JOBS) == 0
+    assert len(skill_matrix) == 3
+    assert skill_matrix.matrix.shape == (3, len(SKILL_NAMES))
+    assert skill_matrix.matrix.dtype == np.int32
+    assert demand(skill_matrix, "python") == 1
+
+
+def test_changed_description_rebuilds_its_row():
+    skill_matrix = SkillMatrix()
+    skill_matrix.add_jobs(JOBS)
+    assert demand(skill_matrix, "sql") == 1
+
+    changed = [dict(JOBS[0], description="Java and Spring"), dict(JOBS[2], description="SQL and Docker")]
+    assert skill_matrix.add_jobs(changed) == 2
+    assert len(skill_matrix) == 3
+    assert demand(skill_matrix, "python") == 0
+    assert demand(skill_matrix, "java") == 1
+    assert demand(skill_matrix, "sql") == 1
+    row = skill_matrix.rows_for(["3"])
+    assert skill_matrix.matrix[row].nnz == 2
+
+
+def test_rows_added_and_changed_before_the_matrix_is_built():
+    skill_matrix = SkillMatrix()
+    skill_matrix.add_jobs(JOBS[:1])
+    skill_matrix.add_jobs([dict(JOBS[0], description="React")])
+
+    assert np.flatnonzero(skill_matrix.demand()).tolist() == [SKILL_COLUMNS["react"]]
+
+
+def test_update_from_store_picks_up_new_descriptions(store):
+    store.upsert_jobs(JOBS)
+    skill_matrix = SkillMatrix()
+    assert update_from_store(skill_matrix, store) == 3
+    assert update_from_store(skill_matrix, store) == 0
+
+    store.upsert_jobs([dict(JOBS[2], description="Kubernetes and SQL reporting")])
+    assert update_from_store(skill_matrix, store) == 1
+    assert demand(skill_matrix, "kubernetes") == 1
+    assert len(skill_matrix) == 3
+
+
+def test_skill_gaps_rank_missing_skills_of_matching_jobs():
+    skill_matrix = SkillMatrix()
+    skill_matrix.add_jobs([
+        {"job_id": "1", "description": "Python and Docker"},
+        {"job_id": "2", "description": "Python, Docker and Kubernetes"},
+        {"job_id": "3", "description": "Nursing"},
+    ])
+    n_matching, gaps = skill_matrix.skill_gaps("Python developer")
+
+    assert n_matching == 2
+    assert [gap["skill"] for gap in gaps][:2] == [
+        SKILL_NAMES[SKILL_COLUMNS["docker"]], SKILL_NAMES[SKILL_COLUMNS["kubernetes"]]
+    ]
+    assert gaps[0]["share"] == 1.0
@@ -0,0 +1,96 @@
+import json
+import threading
+
+import pytest
+
+import tracing
+from tracing import Tracer, propagate
+
+
+def test_spans_nest_and_share_a_trace():
+    tracer = Tracer(log_path=None)
+    with tracer.span("outer", keyword="python") as outer:
+        with tracer.span("inner"):
+            tracer.count("cards", 2)
+
+    inner, finished_outer = tracer.recent_spans()
+    assert finished_outer is outer
+    assert inner["parent_id"] == outer["span_id"]
+    assert inner["trace_id"] == outer["trace_id"]
+    assert inner["counters"] == {"cards": 2}
+    assert outer["attrs"] == {"keyword": "python"}
+    assert tracer.counters() == {"cards": 2}
+
+
+def test_propagate_nests_spans_from_other_threads():
+    tracer = Tracer(log_path=None)
+
+    def work():
+        with tracer.span("worker"):
+            pass
+
+    with tracer.span("outer") as outer:
+        thread = threading.Thread(target=propagate(work))
+        thread.start()
+        thread.join()
+
+    worker = tracer.recent_spans()[0]
+    assert worker["name"] == "worker"
+    assert worker["parent_id"] == outer["span_id"]
+
+
+def test_failed_span_records_the_error():
+    tracer = Tracer(log_path=None)
+    with pytest.raises(ValueError):
+        with tracer.span("failing"):
+            raise ValueError("bad page")
+    assert tracer.recent_spans()[0]["error"] == "ValueError: bad page"
+
+
+def test_duration_samples_are_bounded(monkeypatch):
+    monkeypatch.setattr(tracing, "MAX_DURATION_SAMPLES", 10)
+    tracer = Tracer(log_path=None, max_spans=5)
+    for _ in range(100):
+        with tracer.span("stage"):
+            pass
+
+    assert len(tracer._stats["stage"]["recent"]) == 10
+    assert len(tracer.recent_spans()) == 5
+    summary = tracer.summary()["stage"]
+    assert summary["count"] == 100
+    assert summary["mean"] == pytest.approx(summary["total"] / 100)
+    assert summary["p50"] <= summary["max"]
+
+
+def test_trace_log_is_off_by_default(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    assert tracing.TRACE_LOG_PATH is None
+    tracer = Tracer()
+    with tracer.span("stage"):
+        pass
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_trace_log_is_written_and_rotated(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(log_path=str(path), max_log_bytes=1000)
+    for i in range(20):
+        with tracer.span("stage", i=i):
+            pass
+
+    rotated = tmp_path / "traces.jsonl.1"
+    assert rotated.stat().st_size >= 1000
+    current = path.read_text().splitlines() if path.exists() else []
+    assert sum(len(line) + 1 for line in current) < 1000
+    lines = rotated.read_text().splitlines() + current
+    assert json.loads(lines[-1])["attrs"] == {"i": 19}
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(log_path=None)
+    with tracer.disabled():
+        with tracer.span("stage"):
+            tracer.count("cards")
+    assert tracer.enabled
+    assert tracer.summary() == {}
+    assert tracer.counters() == {}
@@ -0,0 +1,64 @@
+import sys
+
+from streamlit.testing.v1 import AppTest
+
+from ui_components import job_card_html, page_bounds
+
+JOB = {
+    "title": "<script>alert('x')</script> Engineer",
+    "company": "Smith & Sons",
+    "location": "Remote",
+    "description": "<b>Bold</b> claims",
+    "url": "https://www.linkedin.com/jobs/view/123?a=1&b='2'",
+    "similarity_score": 0.75,
+    "matched_skills": ["c++"],
+    "missing_skills": ["<img>"],
+}
+
+
+def test_card_escapes_the_job_fields():
+    card = job_card_html(JOB, show_match=True)
+
+    assert "<script>" not in card
+    assert "&lt;script&gt;alert(&#x27;x&#x27;)&lt;/script&gt; Engineer" in card
+    assert "Smith &amp; Sons" in card
+    assert "&lt;img&gt;" in card
+    assert "href='https://www.linkedin.com/jobs/view/123?a=1&amp;b=&#x27;2&#x27;'" in card
+    # The description is only sent when its toggle is opened
+    assert "Bold" not in card
+
+
+def test_apply_link_only_with_a_url():
+    assert "Apply Now</a>" in job_card_html(JOB)
+    assert "apply-link" not in job_card_html(dict(JOB, url=None))
+    assert "apply-link" not in job_card_html(dict(JOB, url=""))
+
+
+def test_page_bounds_cover_the_last_partial_page():
+    assert page_bounds(23, 1, 10) == (1, 0, 10)
+    assert page_bounds(23, 3, 10) == (3, 20, 23)
+    # A page past the end (the list shrank or the page size grew) shows the last one
+    assert page_bounds(23, 5, 10) == (3, 20, 23)
+    assert page_bounds(23, 2, 25) == (1, 0, 23)
+    assert page_bounds(0, 1, 10) == (1, 0, 0)
+
+
+def results_app():
+    import streamlit as st
+
+    from ui_components import render_job_list
+
+    jobs = [{"job_id": str(i), "title": f"Job {i}", "company": "Acme", "url": None} for i in range(23)]
+    st.session_state.setdefault("results_page", 3)
+    render_job_list(jobs, page_size=10)
+
+
+def test_render_job_list_shows_the_last_partial_page(monkeypatch):
+    # AppTest leaves its script as __main__, which spawned processes (the PDF pool) would then import
+    monkeypatch.setitem(sys.modules, "__main__", sys.modules["__main__"])
+    app = AppTest.from_function(results_app).run()
+
+    cards = [block.value for block in app.markdown if "job-card" in block.value]
+    assert [card.split("job-title'>")[1].split("<")[0] for card in cards] == ["Job 20", "Job 21", "Job 22"]
+    assert app.caption[0].value == "Showing 21–23 of 23 jobs"
+    assert len(app.toggle) == 3
@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+import utils
+from cache import TTLCache
+from tracing import tracer
+
+
+class Upload:
+    """Stands in for a Streamlit UploadedFile"""
+    def __init__(self, data, type):
+        self.data = data
+        self.type = type
+
+    def getvalue(self):
+        return self.data
+
+
+def make_pdf(n_pages):
+    """A minimal PDF whose page i (from 1) reads "Page i" """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(n_pages))
+        + b"] /Count %d >>" % n_pages,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i in range(n_pages):
+        content = b"BT /F1 12 Tf 72 720 Td (Page %d) Tj ET" % (i + 1)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >>"
+            b" /Contents %d 0 R >>" % (5 + 2 * i)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    """Give each test an empty text cache and record the extractions that really run"""
+    monkeypatch.setattr(utils, "_text_cache", TTLCache(ttl=None))
+    monkeypatch.setattr(utils, "EXTRACT_CACHE_DIR", None)
+    calls = []
+    extract = utils._extract
+
+    def recording_extract(data, file_type):
+        calls.append(file_type)
+        return extract(data, file_type)
+    monkeypatch.setattr(utils, "_extract", recording_extract)
+    return calls
+
+
+def test_repeated_upload_is_served_from_the_cache(extractions):
+    assert utils.extract_text_from_file(Upload(b"Python developer", "text/plain")) == "Python developer"
+    assert utils.extract_text_from_file(Upload(b"Python developer", "text/plain")) == "Python developer"
+
+    assert extractions == ["text/plain"]
+    assert tracer.counters()["extract_cache_hits"] == 1
+    # Other content, or the same bytes as another type, is extracted again
+    utils.extract_text_from_file(Upload(b"Java developer", "text/plain"))
+    utils.extract_text_from_file(Upload(make_pdf(1), utils.PDF_TYPE))
+    assert extractions == ["text/plain", "text/plain", utils.PDF_TYPE]
+
+
+def test_paths_and_uploads_share_the_cache(extractions, tmp_path):
+    path = tmp_path / "resume.txt"
+    path.write_bytes(b"SQL analyst")
+
+    assert utils.extract_text_from_file(str(path)) == "SQL analyst"
+    assert utils.extract_text_from_file(Upload(b"SQL analyst", "text/plain")) == "SQL analyst"
+    assert len(extractions) == 1
+
+
+def test_disk_cache_survives_a_restart(extractions, monkeypatch, tmp_path):
+    cache_dir = tmp_path / "extract_cache"
+    monkeypatch.setattr(utils, "EXTRACT_CACHE_DIR", str(cache_dir))
+    pdf = make_pdf(2)
+
+    text = utils.extract_text_from_file(Upload(pdf, utils.PDF_TYPE))
+    assert [name.endswith(".txt") for name in os.listdir(cache_dir)] == [True]
+
+    # A new process starts with an empty in-memory cache
+    monkeypatch.setattr(utils, "_text_cache", TTLCache(ttl=None))
+    assert utils.extract_text_from_file(Upload(pdf, utils.PDF_TYPE)) == text
+    assert extractions == [utils.PDF_TYPE]
+
+
+@pytest.fixture
+def pdf_pool(monkeypatch):
+    monkeypatch.setattr(utils, "PDF_WORKERS", 2)
+    yield
+    if utils._pdf_executor is not None:
+        utils._pdf_executor.shutdown()
+        utils._pdf_executor = None
+
+
+def test_long_pdf_is_split_across_worker_processes_in_page_order(pdf_pool, monkeypatch):
+    pdf = make_pdf(utils.PARALLEL_PDF_PAGES + 1)
+
+    text = utils._extract_pdf(pdf)
+    assert utils._pdf_executor is not None
+
+    monkeypatch.setattr(utils, "PDF_WORKERS", 1)
+    assert text == utils._extract_pdf(pdf)
+    pages = [text.index(f"Page {i}") for i in range(1, utils.PARALLEL_PDF_PAGES + 2)]
+    assert pages == sorted(pages)
+
+
+def test_short_pdf_is_extracted_in_process(pdf_pool):
+    assert utils._extract_pdf(make_pdf(3)) == "Page 1Page 2Page 3"
+    assert utils._pdf_executor is None
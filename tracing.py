@@ -0,0 +1,211 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from functools import wraps
+
+# Set SAGE_TRACE_LOG to a file path to append finished spans to it as JSON lines (off by default)
+TRACE_LOG_PATH = os.environ.get("SAGE_TRACE_LOG") or None
+
+# The log is rotated to "<path>.1" once it grows past this many bytes
+TRACE_LOG_MAX_BYTES = int(os.environ.get("SAGE_TRACE_LOG_MAX_BYTES", 10 * 2**20))
+
+# Finished spans kept in memory for the app's performance panel
+MAX_RECENT_SPANS = 2000
+
+# Durations kept per span name for percentiles; counts, totals and maxima cover every span
+MAX_DURATION_SAMPLES = 1000
+
+_current_span = contextvars.ContextVar("sage_current_span", default=None)
+
+
+class Tracer:
+    """
+    Lightweight, thread-safe tracing of nested spans and counters.
+
+    A span times one stage of the pipeline; spans opened inside it (on the
+    same thread, or on threads started through propagate()) become its
+    children and share its trace ID. Counters are process-wide totals that are
+    also attributed to the innermost open span. Finished spans are kept in
+    memory for summaries, within fixed bounds, and written to `log_path` as
+    JSON lines if one is set. A disabled tracer records nothing.
+    """
+    def __init__(self, log_path=TRACE_LOG_PATH, max_spans=MAX_RECENT_SPANS, max_log_bytes=TRACE_LOG_MAX_BYTES):
+        self.log_path = log_path
+        self.max_log_bytes = max_log_bytes
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self._spans = deque(maxlen=max_spans)
+        self._stats = {}
+        self._counters = Counter()
+        self._log = None
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """
+        Time the enclosed block as a span
+
+        Args:
+            name (str): Stage name, e.g. "scrape.page_load"
+            **attrs: JSON-serialisable details to record with the span
+
+        Yields:
+            dict: The span, whose "attrs" can still be added to
+        """
+        if not self.enabled:
+            yield {"name": name, "attrs": attrs, "counters": {}}
+            return
+        parent = _current_span.get()
+        span = {
+            "name": name,
+            "span_id": uuid.uuid4().hex[:16],
+            "parent_id": parent["span_id"] if parent else None,
+            "trace_id": parent["trace_id"] if parent else uuid.uuid4().hex[:16],
+            "thread": threading.current_thread().name,
+            "start": time.time(),
+            "attrs": attrs,
+            "counters": {},
+        }
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span["duration"] = time.perf_counter() - start
+            _current_span.reset(token)
+            self._finish(span)
+
+    def traced(self, name=None):
+        """Decorator that runs each call of a function in a span"""
+        def decorator(fn):
+            span_name = name or fn.__qualname__
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def disabled(self):
+        """Record nothing inside the block, e.g. while benchmarking"""
+        enabled, self.enabled = self.enabled, False
+        try:
+            yield
+        finally:
+            self.enabled = enabled
+
+    def count(self, name, value=1):
+        """Add to a counter, e.g. cards processed or WebDriver calls"""
+        if not self.enabled:
+            return
+        span = _current_span.get()
+        with self._lock:
+            self._counters[name] += value
+            if span is not None:
+                span["counters"][name] = span["counters"].get(name, 0) + value
+
+    def _finish(self, span):
+        duration = span["duration"]
+        with self._lock:
+            self._spans.append(span)
+            stats = self._stats.get(span["name"])
+            if stats is None:
+                stats = self._stats[span["name"]] = {
+                    "count": 0, "total": 0.0, "max": 0.0, "recent": deque(maxlen=MAX_DURATION_SAMPLES)
+                }
+            stats["count"] += 1
+            stats["total"] += duration
+            stats["max"] = max(stats["max"], duration)
+            stats["recent"].append(duration)
+        if self.log_path:
+            self._write_log(json.dumps(span, default=str) + "\n")
+
+    def _write_log(self, line):
+        # A lock of its own, so spans finishing on other threads never wait on the disk
+        with self._log_lock:
+            try:
+                if self._log is None:
+                    self._log = open(self.log_path, "a", encoding="utf-8")
+                self._log.write(line)
+                self._log.flush()
+                if self.max_log_bytes and self._log.tell() >= self.max_log_bytes:
+                    self._log.close()
+                    self._log = None
+                    os.replace(self.log_path, self.log_path + ".1")
+            except (OSError, TypeError) as e:
+                print(f"Trace log disabled: {e}")
+                self.log_path = None
+
+    def summary(self):
+        """
+        Summarise the finished spans by name
+
+        Percentiles cover the last MAX_DURATION_SAMPLES spans of each name;
+        the other figures cover every span since the last reset.
+
+        Returns:
+            dict: {name: {"count", "total", "mean", "p50", "max"}} in seconds
+        """
+        with self._lock:
+            stats = {name: dict(stats, recent=sorted(stats["recent"])) for name, stats in self._stats.items()}
+        return {
+            name: {
+                "count": stats["count"],
+                "total": stats["total"],
+                "mean": stats["total"] / stats["count"],
+                "p50": stats["recent"][len(stats["recent"]) // 2],
+                "max": stats["max"],
+            }
+            for name, stats in stats.items()
+        }
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def recent_spans(self, trace_id=None):
+        """Return the finished spans still in memory, oldest first, optionally for one trace"""
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id is not None:
+            spans = [span for span in spans if span["trace_id"] == trace_id]
+        return spans
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._stats.clear()
+            self._counters.clear()
+
+
+def current_span():
+    """Return the innermost open span on this thread, or None"""
+    return _current_span.get()
+
+
+def propagate(fn):
+    """
+    Make fn run inside the caller's current span when called on another thread
+
+    Use when handing work to an executor so its spans nest under the caller's.
+    """
+    context = contextvars.copy_context()
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        # Each call gets its own copy, so concurrent calls don't share a context
+        return context.copy().run(fn, *args, **kwargs)
+    return wrapper
+
+
+tracer = Tracer()
@@ -1,5 +1,15 @@
+import html
+import math
+import os
+import pandas as pd
 import streamlit as st
 
+DEFAULT_PAGE_SIZE = int(os.environ.get("SAGE_RESULTS_PAGE_SIZE", 10))
+PAGE_SIZE_OPTIONS = sorted({10, 25, 50, 100, DEFAULT_PAGE_SIZE})
+
+# Near-duplicate postings named on a card before "and N more"
+MAX_VARIANTS_SHOWN = 3
+
 def apply_custom_styles():
     """Apply custom CSS styling to the Streamlit app"""
     st.markdown("""
@@ -147,6 +157,36 @@ def apply_custom_styles():
         color: #721c24 !important;
     }
     
+    .skill-columns {
+        display: flex !important;
+        gap: 1rem !important;
+    }
+    
+    .skill-column {
+        flex: 1 !important;
+    }
+    
+    .skill-note {
+        color: var(--text-medium) !important;
+        font-style: italic !important;
+    }
+    
+    .job-variants {
+        color: var(--text-medium) !important;
+        font-size: 0.9rem !important;
+    }
+    
+    .apply-link {
+        display: inline-block !important;
+        margin-top: 0.75rem !important;
+        padding: 0.5rem 1.25rem !important;
+        border-radius: 8px !important;
+        background-color: var(--primary) !important;
+        color: white !important;
+        font-weight: 600 !important;
+        text-decoration: none !important;
+    }
+    
     /* Footer */
     footer {
         text-align: center !important;
@@ -158,58 +198,146 @@ def apply_custom_styles():
     </style>
     """, unsafe_allow_html=True)
 
+def build_results_table(job_listings, show_match=False):
+    """
+    Prepare the Table View data for a result set
+    
+    Args:
+        job_listings (list): Job listings, scored if a resume was given
+        show_match (bool): Include the match percentage column
+        
+    Returns:
+        pandas.DataFrame: The columns to display
+    """
+    job_df = pd.DataFrame(job_listings)
+    if "similarity_score" in job_df.columns:
+        job_df["match_percentage"] = job_df["similarity_score"].apply(lambda x: f"{x:.0%}")
+    
+    display_cols = ["title", "company"]
+    if show_match:
+        display_cols.append("match_percentage")
+    return job_df[display_cols]
+
+def _skill_chips(skills, css_class):
+    return "".join(f"<span class='skill-chip {css_class}'>{html.escape(skill)}</span>" for skill in skills)
+
+def job_card_html(job, show_match=False):
+    """
+    Build a job card's complete HTML, so it is sent as a single markdown element
+    
+    Args:
+        job (dict): Job listing information
+        show_match (bool): Include the match score and skill chips
+        
+    Returns:
+        str: The card HTML
+    """
+    parts = [
+        "<div class='job-card'>",
+        f"<h3 class='job-title'>{html.escape(job.get('title') or 'No title')}</h3>",
+        f"<p class='company-name'>🏢 {html.escape(job.get('company') or 'Company not specified')}</p>",
+        f"<p class='job-location'>📍 {html.escape(job.get('location') or 'Location not specified')}</p>",
+    ]
+    
+    if show_match:
+        score = job.get("similarity_score", 0)
+        score_class = "high-match" if score >= 0.7 else "medium-match" if score >= 0.4 else "low-match"
+        parts.append(f"<p class='match-score {score_class}'>📊 Match Score: {score:.0%}</p>")
+        
+        matched = job.get("matched_skills")
+        missing = job.get("missing_skills")
+        parts.append("<div class='skill-columns'><div class='skill-column'>")
+        if matched:
+            parts.append("<p>✅ <strong>Matched Skills:</strong></p>" + _skill_chips(matched, "matched-skill"))
+        else:
+            parts.append("<p class='skill-note'>No skill matches found</p>")
+        parts.append("</div><div class='skill-column'>")
+        if missing:
+            parts.append("<p>⚠️ <strong>Skills to Develop:</strong></p>" + _skill_chips(missing, "missing-skill"))
+        else:
+            parts.append("<p class='skill-note'>You match all required skills!</p>")
+        parts.append("</div></div>")
+    
+    variants = job.get("variants")
+    if variants:
+        shown = "; ".join(
+            html.escape(" — ".join(filter(None, (variant.get("title"), variant.get("location")))) or "Untitled")
+            for variant in variants[:MAX_VARIANTS_SHOWN]
+        )
+        more = f" and {len(variants) - MAX_VARIANTS_SHOWN} more" if len(variants) > MAX_VARIANTS_SHOWN else ""
+        label = "time" if len(variants) == 1 else "times"
+        parts.append(f"<p class='job-variants'>🔁 Also posted {len(variants)} more {label}: {shown}{more}</p>")
+    
+    if job.get("url"):
+        parts.append(f"<a class='apply-link' href='{html.escape(job['url'], quote=True)}' target='_blank'>Apply Now</a>")
+    parts.append("</div>")
+    return "".join(parts)
+
 def render_job_card(job, idx, resume_text=""):
     """
     Render a job listing as a card
     
+    The description is only sent to the browser once the user asks for it.
+    
     Args:
         job (dict): Job listing information
         idx (int): Index for unique keys
         resume_text (str): Resume text if provided
     """
-    with st.container():
-        st.markdown(f"""
-        <div class='job-card'>
-            <h3 class='job-title'>{job.get("title", "No title")}</h3>
-            <p class='company-name'>🏢 {job.get("company", "Company not specified")}</p>
-            <p class='job-location'>📍 {job.get("location", "Location not specified")}</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        score = job.get("similarity_score", 0)
-        score_class = "high-match" if score >= 0.7 else "medium-match" if score >= 0.4 else "low-match"
-        
-        col1, col2 = st.columns([1, 1])
-        with col1:
-            if resume_text:
-                st.markdown(f"<p class='match-score {score_class}'>📊 Match Score: {score:.0%}</p>", unsafe_allow_html=True)
-        with col2:
-            st.button(f"Apply Now", key=f"apply_{idx}", use_container_width=True)
-        
-        with st.expander("📖 View Job Description"):
-            st.write(job.get("description", "No description available"))
-        
-        if resume_text:
-            skill_col1, skill_col2 = st.columns(2)
-            
-            with skill_col1:
-                if job.get("matched_skills"):
-                    st.markdown("✅ **Matched Skills:**")
-                    st.markdown("<div style='margin-top:0.5rem;'>" + 
-                        "".join([f"<span class='skill-chip matched-skill'>{skill}</span>" 
-                                for skill in job["matched_skills"]]) + 
-                        "</div>", unsafe_allow_html=True)
-                else:
-                    st.info("No skill matches found")
-                    
-            with skill_col2:
-                if job.get("missing_skills"):
-                    st.markdown("⚠️ **Skills to Develop:**")
-                    st.markdown("<div style='margin-top:0.5rem;'>" + 
-                        "".join([f"<span class='skill-chip missing-skill'>{skill}</span>" 
-                                for skill in job["missing_skills"]]) + 
-                        "</div>", unsafe_allow_html=True)
-                else:
-                    st.success("You match all required skills!")
-        
-        st.markdown("---")
\ No newline at end of file
+    st.markdown(job_card_html(job, show_match=bool(resume_text)), unsafe_allow_html=True)
+    if st.toggle("📖 View Job Description", key=f"description_{idx}"):
+        st.write(job.get("description") or "No description available")
+
+def page_bounds(n_items, page, page_size):
+    """
+    Clamp a 1-based page number to the pages a list has and locate that page
+
+    Args:
+        n_items (int): Length of the list
+        page (int): Requested page
+        page_size (int): Items per page
+
+    Returns:
+        tuple: (page, first, stop) - the page to show and its slice of the list
+    """
+    pages = max(1, math.ceil(n_items / page_size))
+    page = min(max(page, 1), pages)
+    first = (page - 1) * page_size
+    return page, first, min(first + page_size, n_items)
+
+def render_job_list(job_listings, resume_text="", key="results", page_size=DEFAULT_PAGE_SIZE):
+    """
+    Render one page of job cards with controls to move between pages
+    
+    Args:
+        job_listings (list): Job listings, in display order
+        resume_text (str): Resume text if provided
+        key (str): Prefix for widget keys, unique per list on the page
+        page_size (int): Cards per page until the user picks another size
+    """
+    if not job_listings:
+        return
+    
+    size_key, page_key = f"{key}_page_size", f"{key}_page"
+    if size_key not in st.session_state:
+        st.session_state[size_key] = page_size if page_size in PAGE_SIZE_OPTIONS else PAGE_SIZE_OPTIONS[0]
+    page_size = st.session_state[size_key]
+    page, first, stop = page_bounds(len(job_listings), st.session_state.get(page_key, 1), page_size)
+    if st.session_state.get(page_key, 1) != page:
+        # The list shrank or the page size grew
+        st.session_state[page_key] = page
+    
+    for idx, job in enumerate(job_listings[first:stop], start=first):
+        render_job_card(job, f"{key}_{idx}", resume_text)
+    
+    if len(job_listings) > PAGE_SIZE_OPTIONS[0]:
+        nav_col, page_col, size_col = st.columns([2, 1, 1])
+        with nav_col:
+            st.caption(f"Showing {first + 1}–{stop} of {len(job_listings)} jobs")
+        with page_col:
+            st.number_input("Page", min_value=1, max_value=math.ceil(len(job_listings) / page_size), key=page_key)
+        with size_col:
+            st.selectbox("Jobs per page", PAGE_SIZE_OPTIONS, key=size_key)
+
+# Pages and description toggles rerun only the list, not the whole app
+render_job_list_fragment = st.fragment(render_job_list)
@@ -1,30 +1,137 @@
 ##Not yet working for pdf uploads..some documents have issues
+import hashlib
 import io
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
 import PyPDF2
 import docx2txt
+from cache import TTLCache
+from tracing import tracer
+
+PDF_TYPE = "application/pdf"
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+MIME_TYPES = {".pdf": PDF_TYPE, ".docx": DOCX_TYPE, ".txt": "text/plain"}
+
+# Extracted text is cached by content hash: in memory (LRU) and, if a
+# directory is configured, on disk so it survives restarts
+EXTRACT_CACHE_SIZE = int(os.environ.get("SAGE_EXTRACT_CACHE_SIZE", 32))
+EXTRACT_CACHE_DIR = os.environ.get("SAGE_EXTRACT_CACHE_DIR")
+
+# PDFs with at least this many pages are split across worker processes
+PARALLEL_PDF_PAGES = int(os.environ.get("SAGE_PARALLEL_PDF_PAGES", 20))
+PDF_WORKERS = int(os.environ.get("SAGE_PDF_WORKERS", os.cpu_count() or 1))
+
+_text_cache = TTLCache(maxsize=EXTRACT_CACHE_SIZE, ttl=None)
+_pdf_executor = None
+_pdf_executor_lock = threading.Lock()
+
+
+def _read_file(file):
+    """Return (bytes, MIME type) for an uploaded file object or a path"""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            data = f.read()
+        return data, MIME_TYPES.get(os.path.splitext(str(file))[1].lower(), "text/plain")
+    return file.getvalue(), file.type
+
+
+def _extract_pdf_pages(data, start, stop):
+    """Extract the text of pages [start, stop) of a PDF (runs in a worker process)"""
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return [pdf_reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _get_pdf_executor():
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is None:
+            # spawn, not fork: the Streamlit server is multi-threaded
+            _pdf_executor = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pdf_executor
+
+
+def _extract_pdf(data):
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+    num_pages = len(pdf_reader.pages)
+
+    if num_pages < PARALLEL_PDF_PAGES or PDF_WORKERS < 2:
+        return "".join(page.extract_text() or "" for page in pdf_reader.pages)
+
+    global _pdf_executor
+    executor = _get_pdf_executor()
+    chunk = math.ceil(num_pages / PDF_WORKERS)
+    starts = range(0, num_pages, chunk)
+    stops = [min(start + chunk, num_pages) for start in starts]
+    try:
+        parts = list(executor.map(_extract_pdf_pages, repeat(data), starts, stops))
+    except BrokenProcessPool as e:
+        print(f"PDF worker pool failed, extracting serially: {e}")
+        with _pdf_executor_lock:
+            if _pdf_executor is executor:
+                _pdf_executor = None
+        return "".join(page.extract_text() or "" for page in pdf_reader.pages)
+    return "".join(text for part in parts for text in part)
+
+
+def _extract(data, file_type):
+    if file_type == PDF_TYPE:
+        return _extract_pdf(data)
+    elif file_type == DOCX_TYPE:
+        return docx2txt.process(io.BytesIO(data))
+    else:
+        return data.decode("utf-8")
+
+
+def _disk_cache_path(digest):
+    return os.path.join(EXTRACT_CACHE_DIR, f"{digest}.txt") if EXTRACT_CACHE_DIR else None
+
 
 def extract_text_from_file(file):
     """
     Extract text from various file formats (PDF, DOCX, TXT)
-    
+
+    Results are cached by a hash of the file's content, so re-extracting the
+    same upload on every Streamlit rerun is free.
+
     Args:
-        file: The uploaded file object
-        
+        file: The uploaded file object, or a path to a file
+
     Returns:
         str: Extracted text from the file
     """
-    file_type = file.type
-    
-    if file_type == "application/pdf":
-        pdf_reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
+    data, file_type = _read_file(file)
+    digest = hashlib.sha256(file_type.encode("utf-8") + b"\0" + data).hexdigest()
+
+    text = _text_cache.get(digest)
+    if text is not None:
+        tracer.count("extract_cache_hits")
         return text
-    elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        return docx2txt.process(file)
+
+    cache_path = _disk_cache_path(digest)
+    if cache_path and os.path.exists(cache_path):
+        tracer.count("extract_cache_hits")
+        with open(cache_path, encoding="utf-8") as f:
+            text = f.read()
     else:
-        return io.StringIO(file.getvalue().decode("utf-8")).read()
-    
+        with tracer.span("extract_text", file_type=file_type, size=len(data)):
+            text = _extract(data, file_type)
+        if cache_path:
+            os.makedirs(EXTRACT_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, cache_path)
+
+    _text_cache.set(digest, text)
+    return text
+
 if __name__=='__main__':
-    print(extract_text_from_file('resume.pdf'))
\ No newline at end of file
+    print(extract_text_from_file('resume.pdf'))